@@ -1,12 +1,51 @@
-import { useState } from "react"
+import { useRef, useState } from "react"
 import { useShoppingCart } from "use-shopping-cart"
 import { loadStripe } from "@stripe/stripe-js"
 import React from "react"
 const stripePromise = loadStripe(process.env.NEXT_PUBLIC_STRIPE_PUBLISHABLE_KEY)
 
+// Give up on a hung /api/checkout instead of leaving the button on "Loading..."
+export const CHECKOUT_REQUEST_TIMEOUT_MS = 10000
+// Retries for 429 responses while /api/checkout sheds load
+export const CHECKOUT_MAX_RETRIES = 3
+const RETRY_BASE_DELAY_MS = 500
+
+// Honour Retry-After when present, else back off exponentially; jitter keeps
+// retrying shoppers from arriving in lockstep
+export function retryDelayMs(response, attempt) {
+  const retryAfter = Number(response.headers?.get("Retry-After"))
+  const delay =
+    retryAfter > 0 ? retryAfter * 1000 : RETRY_BASE_DELAY_MS * 2 ** attempt
+  return delay + Math.random() * RETRY_BASE_DELAY_MS
+}
+
+// Identifies this shopper's checkout to /api/checkout, so retries and double
+// clicks reuse one Stripe session without sharing it with other shoppers
+export function newCheckoutKey() {
+  if (globalThis.crypto?.randomUUID) return globalThis.crypto.randomUUID()
+  const random = () => Math.random().toString(36).slice(2)
+  return `${Date.now().toString(36)}-${random()}${random()}`
+}
+
+// Resolves after ms, or rejects as soon as signal aborts
+export const wait = (ms, signal) =>
+  new Promise((resolve, reject) => {
+    const onAbort = () => {
+      clearTimeout(timer)
+      reject(new Error("The operation was aborted"))
+    }
+    // One listener per backoff; drop it once the wait is over
+    const timer = setTimeout(() => {
+      signal.removeEventListener("abort", onAbort)
+      resolve()
+    }, ms)
+    signal.addEventListener("abort", onAbort, { once: true })
+  })
+
 export default function CheckoutButton() {
   const [status, setStatus] = useState("idle")
   const { cartCount, cartDetails } = useShoppingCart()
+  const checkoutKey = useRef(null)
 
   const handleClick = async (event) => {
     event.preventDefault()
@@ -17,13 +56,29 @@ export default function CheckoutButton() {
     }
 
     setStatus("loading")
+    if (!checkoutKey.current) checkoutKey.current = newCheckoutKey()
+
+    const controller = new AbortController()
+    const timeoutId = setTimeout(
+      () => controller.abort(),
+      CHECKOUT_REQUEST_TIMEOUT_MS
+    )
 
     try {
-      const response = await fetch("/api/checkout", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ cartDetails }),
-      })
+      let response
+      for (let attempt = 0; ; attempt++) {
+        response = await fetch("/api/checkout", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+            "Idempotency-Key": checkoutKey.current,
+          },
+          body: JSON.stringify({ cartDetails }),
+          signal: controller.signal,
+        })
+        if (response.status !== 429 || attempt >= CHECKOUT_MAX_RETRIES) break
+        await wait(retryDelayMs(response, attempt), controller.signal)
+      }
 
       if (!response.ok) throw new Error("Failed to create session")
 
@@ -38,6 +93,8 @@ export default function CheckoutButton() {
     } catch (err) {
       console.error("Stripe Redirect Error:", err)
       setStatus("redirect-error")
+    } finally {
+      clearTimeout(timeoutId)
     }
   }
 
@@ -8,6 +8,7 @@ module.exports = {
     "/node_modules/(?!uuid|use-shopping-cart)", // ← ESMモジュールを変換対象に含める
   ],
   moduleNameMapper: {
+    "^@/(.*)$": "<rootDir>/$1",
     "\\.(css|less|scss|sass)$": "identity-obj-proxy",
     "\\.(jpg|jpeg|png|gif|svg)$": "<rootDir>/test/__mocks__/fileMock.js",
   },
@@ -0,0 +1,28 @@
+import { products } from "@/data/products"
+
+// price_id -> catalog entry, built once when the API route module loads
+export const catalog = new Map(products.map((product) => [product.price_id, product]))
+
+// Turn cartDetails into Stripe line items that reference catalog prices.
+// Returns { line_items } or { error } when the cart doesn't match the catalog.
+export function resolveLineItems(cartDetails) {
+  const items = Object.values(cartDetails)
+  if (items.length === 0) return { error: "Cart is empty" }
+
+  const line_items = []
+  for (const item of items) {
+    const priceId = item.price_id || item.id
+    const product = catalog.get(priceId)
+    if (!product) {
+      return { error: `Unknown product: ${priceId}` }
+    }
+    if (item.price !== undefined && item.price !== product.price) {
+      return { error: `Price mismatch for ${product.name}` }
+    }
+    if (!Number.isInteger(item.quantity) || item.quantity < 1) {
+      return { error: `Invalid quantity for ${product.name}` }
+    }
+    line_items.push({ price: priceId, quantity: item.quantity })
+  }
+  return { line_items }
+}
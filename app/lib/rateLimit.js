@@ -0,0 +1,54 @@
+// Token bucket in front of Stripe session creation. A sale-time burst gets
+// 429s with Retry-After instead of turning into a burst of Stripe API calls.
+//
+// The bucket lives in module memory, so it is per server instance. On
+// serverless hosting every warm function instance has its own full bucket,
+// and the global Stripe call rate is up to instances x refill rate. A
+// global bound needs a shared store (e.g. Redis) or Stripe's own limits.
+export class RateLimitError extends Error {
+  constructor(retryAfterMs) {
+    super("Too many checkout requests")
+    this.retryAfterMs = retryAfterMs
+  }
+}
+
+export function createTokenBucket({
+  capacity,
+  refillPerSecond,
+  now = Date.now,
+}) {
+  let tokens = capacity
+  let refilledAt = now()
+
+  const refill = () => {
+    const current = now()
+    tokens = Math.min(
+      capacity,
+      tokens + ((current - refilledAt) / 1000) * refillPerSecond
+    )
+    refilledAt = current
+  }
+
+  // Takes a token or throws RateLimitError saying when one will be available
+  const take = () => {
+    refill()
+    if (tokens >= 1) {
+      tokens -= 1
+      return
+    }
+    throw new RateLimitError(((1 - tokens) / refillPerSecond) * 1000)
+  }
+
+  return {
+    take,
+    get tokens() {
+      refill()
+      return tokens
+    },
+  }
+}
+
+// Retry-After is whole seconds; never tell clients to retry immediately
+export function retryAfterSeconds(retryAfterMs) {
+  return Math.max(1, Math.ceil(retryAfterMs / 1000))
+}
@@ -0,0 +1,34 @@
+import { performance } from "perf_hooks"
+
+// Collects handler phase durations and renders them as a Server-Timing header
+// (https://www.w3.org/TR/server-timing/) so clients can tell handler time
+// apart from network time.
+export function createServerTiming() {
+  const startedAt = performance.now()
+  let lastMark = startedAt
+  const metrics = []
+
+  const mark = (name, description) => {
+    const now = performance.now()
+    metrics.push({ name, duration: now - lastMark, description })
+    lastMark = now
+  }
+
+  const header = () => {
+    const total = { name: "total", duration: performance.now() - startedAt }
+    return [...metrics, total]
+      .map(
+        ({ name, duration, description }) =>
+          `${name};dur=${duration.toFixed(2)}` +
+          (description ? `;desc="${description}"` : "")
+      )
+      .join(", ")
+  }
+
+  const apply = (res) => {
+    res.setHeader("Server-Timing", header())
+    return res
+  }
+
+  return { mark, header, apply }
+}
@@ -0,0 +1,99 @@
+import { createHash } from "crypto"
+
+// Reuses a shopper's Stripe Checkout session for an identical cart so double
+// clicks and retries on "Proceed to checkout" don't each create a new session.
+// Sessions are keyed per client: two shoppers with the same cart must never
+// share a Checkout URL.
+const DEFAULT_TTL_MS = 60 * 1000
+const DEFAULT_MAX_ENTRIES = 500
+// Idempotency-Key values CheckoutButton sends; anything else isn't cached
+const CLIENT_KEY_PATTERN = /^[A-Za-z0-9_-]{16,128}$/
+
+// Hash of the fields that end up in the Stripe session, independent of the
+// key order of cartDetails and of UI-only fields such as emoji.
+export function hashCart(cartDetails) {
+  const entries = Object.entries(cartDetails)
+    .map(([key, item]) => [
+      item.price_id || item.id || key,
+      item.name,
+      item.price,
+      item.quantity,
+    ])
+    .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0))
+  return createHash("sha256").update(JSON.stringify(entries)).digest("hex")
+}
+
+export function isClientKey(value) {
+  return typeof value === "string" && CLIENT_KEY_PATTERN.test(value)
+}
+
+// Cache key for one client's cart
+export function sessionKey(clientKey, cartDetails) {
+  return `${clientKey}:${hashCart(cartDetails)}`
+}
+
+export function createSessionCache({
+  ttlMs = DEFAULT_TTL_MS,
+  maxEntries = DEFAULT_MAX_ENTRIES,
+  now = Date.now,
+} = {}) {
+  // Map iteration order doubles as LRU order: oldest entry first
+  const entries = new Map()
+
+  const isFresh = (entry) => {
+    if (now() - entry.createdAt > ttlMs) return false
+    const expiresAt = entry.session && entry.session.expires_at
+    return !expiresAt || expiresAt * 1000 > now()
+  }
+
+  const remember = (key, entry) => {
+    entries.delete(key)
+    entries.set(key, entry)
+    while (entries.size > maxEntries) {
+      entries.delete(entries.keys().next().value)
+    }
+  }
+
+  // Resolves to { session, cached }. Concurrent calls for the same key share
+  // one in-flight create() call. A session that had already been created
+  // before this call is only reused if isReusable(session) resolves true,
+  // e.g. because it is still open at Stripe rather than completed.
+  const getOrCreate = async (key, create, { isReusable } = {}) => {
+    const existing = entries.get(key)
+    if (existing && isFresh(existing)) {
+      remember(key, existing)
+      const settled = existing.session !== null
+      const session = await existing.promise
+      if (!settled || !isReusable || (await isReusable(session))) {
+        return { session, cached: true }
+      }
+      // Another request may already have replaced the stale session
+      if (entries.get(key) !== existing) {
+        return getOrCreate(key, create, { isReusable })
+      }
+      entries.delete(key)
+    }
+
+    const entry = { createdAt: now(), session: null, promise: null }
+    entry.promise = create().then(
+      (session) => {
+        entry.session = session
+        return session
+      },
+      (error) => {
+        if (entries.get(key) === entry) entries.delete(key)
+        throw error
+      }
+    )
+    remember(key, entry)
+    return { session: await entry.promise, cached: false }
+  }
+
+  return {
+    getOrCreate,
+    clear: () => entries.clear(),
+    get size() {
+      return entries.size
+    },
+  }
+}
@@ -1,6 +1,23 @@
 /** @type {import('next').NextConfig} */
 const nextConfig = {
   reactStrictMode: true,
+  // Prerendered pages get ETags so browsers and CDNs can revalidate with 304s
+  generateEtags: true,
+  // Files in public/ aren't content-hashed like /_next/static, so they get a
+  // day of caching plus background revalidation rather than `immutable`
+  async headers() {
+    return [
+      {
+        source: "/:all*(svg|ico|png)",
+        headers: [
+          {
+            key: "Cache-Control",
+            value: "public, max-age=86400, stale-while-revalidate=604800",
+          },
+        ],
+      },
+    ]
+  },
 }
 
 module.exports = nextConfig
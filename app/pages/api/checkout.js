@@ -1,44 +1,115 @@
 import Stripe from "stripe"
+import { resolveLineItems } from "@/lib/catalog"
+import {
+  RateLimitError,
+  createTokenBucket,
+  retryAfterSeconds,
+} from "@/lib/rateLimit"
+import { createServerTiming } from "@/lib/serverTiming"
+import { createSessionCache, isClientKey, sessionKey } from "@/lib/sessionCache"
+
+// STRIPE_API_HOST/PORT/PROTOCOL point the SDK at a local Stripe stand-in
+// (see test/utils/fake_stripe.py) for deterministic checkout testing.
+const stripeHostOverride = process.env.STRIPE_API_HOST
+  ? {
+      host: process.env.STRIPE_API_HOST,
+      port: Number(process.env.STRIPE_API_PORT || 443),
+      protocol: process.env.STRIPE_API_PROTOCOL || "https",
+    }
+  : {}
 
 const stripe = new Stripe(process.env.STRIPE_SECRET_KEY, {
   apiVersion: "2023-10-16",
+  ...stripeHostOverride,
+})
+
+const sessionCache = createSessionCache({
+  ttlMs: Number(process.env.CHECKOUT_SESSION_TTL_MS || 60 * 1000),
+  maxEntries: Number(process.env.CHECKOUT_SESSION_CACHE_SIZE || 500),
 })
 
+const stripeBudget = createTokenBucket({
+  capacity: Number(process.env.CHECKOUT_RATE_LIMIT_BURST || 20),
+  refillPerSecond: Number(process.env.CHECKOUT_RATE_LIMIT_PER_SECOND || 10),
+})
+
+async function isOpenSession(session) {
+  try {
+    const current = await stripe.checkout.sessions.retrieve(session.id)
+    return current.status === "open"
+  } catch {
+    return false
+  }
+}
+
 export default async function handler(req, res) {
+  const timing = createServerTiming()
+
   if (req.method !== "POST") {
     res.setHeader("Allow", "POST")
-    return res.status(405).end("Method Not Allowed")
+    return timing.apply(res).status(405).end("Method Not Allowed")
   }
 
   try {
     const { cartDetails } = req.body
+    timing.mark("parse", "Request parse")
 
     if (!cartDetails || typeof cartDetails !== "object") {
-      return res.status(400).json({ error: "Invalid cart" })
+      timing.mark("validate", "Validation")
+      return timing.apply(res).status(400).json({ error: "Invalid cart" })
+    }
+    timing.mark("validate", "Validation")
+
+    // Prices come from the catalog, never from the client
+    const { line_items, error } = resolveLineItems(cartDetails)
+    if (error) {
+      timing.mark("line-items", "Line item resolve")
+      return timing.apply(res).status(400).json({ error })
+    }
+    timing.mark("line-items", "Line item resolve")
+
+    const createSession = async () => {
+      // Cache hits are free; only calls that reach Stripe spend a token
+      stripeBudget.take()
+      return stripe.checkout.sessions.create({
+        payment_method_types: ["card"],
+        line_items,
+        mode: "payment",
+        success_url: `${process.env.NEXT_PUBLIC_SITE_URL}/success`,
+        cancel_url: `${process.env.NEXT_PUBLIC_SITE_URL}/cancel`,
+      })
     }
+    // Only the shopper who created a session gets it back, and only while
+    // it can still be paid
+    const clientKey = req.headers["idempotency-key"]
+    const { session, cached } = isClientKey(clientKey)
+      ? await sessionCache.getOrCreate(
+          sessionKey(clientKey, cartDetails),
+          createSession,
+          { isReusable: isOpenSession }
+        )
+      : { session: await createSession(), cached: false }
+    timing.mark(
+      "stripe",
+      cached ? "Stripe session (cached)" : "Stripe session create"
+    )
 
-    const line_items = Object.values(cartDetails).map((item) => ({
-      price_data: {
-        currency: "jpy",
-        product_data: {
-          name: item.name,
-        },
-        unit_amount: item.price, // JPY unit (e.g. 500 = ¥500)
-      },
-      quantity: item.quantity,
-    }))
-
-    const session = await stripe.checkout.sessions.create({
-      payment_method_types: ["card"],
-      line_items,
-      mode: "payment",
-      success_url: `${process.env.NEXT_PUBLIC_SITE_URL}/success`,
-      cancel_url: `${process.env.NEXT_PUBLIC_SITE_URL}/cancel`,
-    })
-
-    return res.status(200).json({ sessionId: session.id })
+    return timing.apply(res).status(200).json({ sessionId: session.id })
   } catch (error) {
+    // Our own limiter and Stripe's both mean "slow down", not a server fault
+    if (error instanceof RateLimitError || error.statusCode === 429) {
+      timing.mark("ratelimit", "Rate limited")
+      res.setHeader(
+        "Retry-After",
+        retryAfterSeconds(error.retryAfterMs || 1000)
+      )
+      return timing
+        .apply(res)
+        .status(429)
+        .json({ error: "Too many checkout requests" })
+    }
     console.error("Stripe error:", error)
-    return res.status(500).json({ error: "Internal Server Error" })
+    timing.mark("error")
+    return timing.apply(res).status(500).json({ error: "Internal Server Error" })
   }
 }
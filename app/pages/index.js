@@ -2,7 +2,13 @@ import Product from "@/components/Product"
 import { products } from "@/data/products"
 import React from "react"
 
-export default function Home() {
+// The catalog is a static import, so the storefront is prerendered at build
+// time and served as cacheable HTML
+export async function getStaticProps() {
+  return { props: { products } }
+}
+
+export default function Home({ products }) {
   return (
     <div className="grid sm:grid-cols-2 md:grid-cols-4 justify-center mx-auto gap-4 place-center flex-wrap w-100 md:max-w-[900px]">
       {products.map((product) => (
@@ -8,19 +8,26 @@ jest.mock("stripe", () => {
         create: jest.fn().mockResolvedValue({
           id: "cs_test_sessionId",
         }),
+        retrieve: jest.fn().mockResolvedValue({
+          id: "cs_test_sessionId",
+          status: "open",
+        }),
       },
     },
   }))
 })
 
+const CLIENT_KEY = "7d1f3c52-5a7e-4bd4-9d53-2f0c8b1e6a90"
+const OTHER_CLIENT_KEY = "c0a8e2d4-91f6-4e3b-8a27-6d5b4f3e2c10"
+
 describe("/api/checkout", () => {
   it("should return sessionId for valid cartDetails", async () => {
     const cartDetails = {
-      price_123: {
+      price_1RUt71LE4wKZaCzDwbJ5rcN5: {
         name: "Sushi",
         price: 120,
         quantity: 2,
-        id: "price_123",
+        id: "price_1RUt71LE4wKZaCzDwbJ5rcN5",
       },
     }
 
@@ -36,6 +43,239 @@ describe("/api/checkout", () => {
     expect(json.sessionId).toBe("cs_test_sessionId")
   })
 
+  it("should report handler phases in a Server-Timing header", async () => {
+    const cartDetails = {
+      price_1RUt71LE4wKZaCzDwbJ5rcN5: {
+        name: "Sushi",
+        price: 120,
+        quantity: 1,
+        id: "price_1RUt71LE4wKZaCzDwbJ5rcN5",
+      },
+    }
+
+    const { req, res } = createMocks({
+      method: "POST",
+      body: { cartDetails },
+    })
+
+    await handler(req, res)
+
+    const serverTiming = res.getHeader("Server-Timing")
+    for (const phase of ["parse", "validate", "line-items", "stripe", "total"]) {
+      expect(serverTiming).toMatch(new RegExp(`${phase};dur=\\d+\\.\\d+`))
+    }
+  })
+
+  it("should send catalog price references to Stripe", async () => {
+    const Stripe = require("stripe")
+    const create = Stripe.mock.results[0].value.checkout.sessions.create
+    const cartDetails = {
+      price_1RUt8wLE4wKZaCzDYiiutmWe: {
+        name: "Pretzel",
+        price: 520,
+        quantity: 4,
+        id: "price_1RUt8wLE4wKZaCzDYiiutmWe",
+      },
+    }
+
+    const { req, res } = createMocks({ method: "POST", body: { cartDetails } })
+    await handler(req, res)
+
+    expect(res._getStatusCode()).toBe(200)
+    expect(create).toHaveBeenLastCalledWith(
+      expect.objectContaining({
+        line_items: [{ price: "price_1RUt8wLE4wKZaCzDYiiutmWe", quantity: 4 }],
+      })
+    )
+  })
+
+  it("should reject carts with tampered prices", async () => {
+    const cartDetails = {
+      price_1RUt8wLE4wKZaCzDYiiutmWe: {
+        name: "Pretzel",
+        price: 1,
+        quantity: 1,
+        id: "price_1RUt8wLE4wKZaCzDYiiutmWe",
+      },
+    }
+
+    const { req, res } = createMocks({ method: "POST", body: { cartDetails } })
+    await handler(req, res)
+
+    expect(res._getStatusCode()).toBe(400)
+    expect(JSON.parse(res._getData()).error).toBe("Price mismatch for Pretzel")
+  })
+
+  it("should reject products missing from the catalog", async () => {
+    const cartDetails = {
+      price_123: { name: "Sushi", price: 120, quantity: 1, id: "price_123" },
+    }
+
+    const { req, res } = createMocks({ method: "POST", body: { cartDetails } })
+    await handler(req, res)
+
+    expect(res._getStatusCode()).toBe(400)
+  })
+
+  it("should reuse one Stripe session for concurrent identical carts", async () => {
+    const Stripe = require("stripe")
+    const create = Stripe.mock.results[0].value.checkout.sessions.create
+    const cartDetails = {
+      price_1RUt5PLE4wKZaCzDUUwUZgdd: {
+        name: "Croissant",
+        price: 200,
+        quantity: 3,
+        id: "price_1RUt5PLE4wKZaCzDUUwUZgdd",
+      },
+    }
+    const callsBefore = create.mock.calls.length
+
+    const requests = [1, 2, 3].map(() =>
+      createMocks({
+        method: "POST",
+        headers: { "idempotency-key": CLIENT_KEY },
+        body: { cartDetails },
+      })
+    )
+    await Promise.all(requests.map(({ req, res }) => handler(req, res)))
+
+    expect(create.mock.calls.length - callsBefore).toBe(1)
+    for (const { res } of requests) {
+      expect(JSON.parse(res._getData()).sessionId).toBe("cs_test_sessionId")
+    }
+  })
+
+  it("should not share sessions between clients with identical carts", async () => {
+    const Stripe = require("stripe")
+    const create = Stripe.mock.results[0].value.checkout.sessions.create
+    const cartDetails = {
+      price_1RUt8XLE4wKZaCzDvjyAWX9y: {
+        name: "Pudding",
+        price: 150,
+        quantity: 2,
+        id: "price_1RUt8XLE4wKZaCzDvjyAWX9y",
+      },
+    }
+    const callsBefore = create.mock.calls.length
+
+    for (const headers of [
+      { "idempotency-key": CLIENT_KEY },
+      { "idempotency-key": OTHER_CLIENT_KEY },
+      {},
+    ]) {
+      const { req, res } = createMocks({ method: "POST", headers, body: { cartDetails } })
+      await handler(req, res)
+      expect(res._getStatusCode()).toBe(200)
+    }
+
+    expect(create.mock.calls.length - callsBefore).toBe(3)
+  })
+
+  it("should not hand out a completed session again", async () => {
+    const Stripe = require("stripe")
+    const { create, retrieve } = Stripe.mock.results[0].value.checkout.sessions
+    const cartDetails = {
+      price_1RUt8XLE4wKZaCzDvjyAWX9y: {
+        name: "Pudding",
+        price: 150,
+        quantity: 5,
+        id: "price_1RUt8XLE4wKZaCzDvjyAWX9y",
+      },
+    }
+    const checkout = async () => {
+      const { req, res } = createMocks({
+        method: "POST",
+        headers: { "idempotency-key": CLIENT_KEY },
+        body: { cartDetails },
+      })
+      await handler(req, res)
+      return JSON.parse(res._getData()).sessionId
+    }
+
+    create.mockResolvedValueOnce({ id: "cs_test_paid" })
+    expect(await checkout()).toBe("cs_test_paid")
+    retrieve.mockResolvedValueOnce({ id: "cs_test_paid", status: "complete" })
+    create.mockResolvedValueOnce({ id: "cs_test_new" })
+
+    expect(await checkout()).toBe("cs_test_new")
+    expect(retrieve).toHaveBeenLastCalledWith("cs_test_paid")
+  })
+
+  it("should return 429 with Retry-After once the Stripe budget is spent", async () => {
+    process.env.CHECKOUT_RATE_LIMIT_BURST = "1"
+    process.env.CHECKOUT_RATE_LIMIT_PER_SECOND = "0.5"
+
+    let limitedHandler
+    jest.isolateModules(() => {
+      limitedHandler = require("../../pages/api/checkout").default
+    })
+    const cartOf = (quantity) => ({
+      price_1RUt7cLE4wKZaCzDe3axLYEm: {
+        name: "Egg",
+        price: 100,
+        quantity,
+        id: "price_1RUt7cLE4wKZaCzDe3axLYEm",
+      },
+    })
+
+    const first = createMocks({ method: "POST", body: { cartDetails: cartOf(1) } })
+    const second = createMocks({ method: "POST", body: { cartDetails: cartOf(2) } })
+    await limitedHandler(first.req, first.res)
+    await limitedHandler(second.req, second.res)
+
+    expect(first.res._getStatusCode()).toBe(200)
+    expect(second.res._getStatusCode()).toBe(429)
+    expect(second.res.getHeader("Retry-After")).toBe(2)
+
+    delete process.env.CHECKOUT_RATE_LIMIT_BURST
+    delete process.env.CHECKOUT_RATE_LIMIT_PER_SECOND
+  })
+
+  it("should pass Stripe rate limit errors on as 429", async () => {
+    const Stripe = require("stripe")
+    const create = Stripe.mock.results[0].value.checkout.sessions.create
+    create.mockRejectedValueOnce(
+      Object.assign(new Error("Rate limited"), { statusCode: 429 })
+    )
+    const cartDetails = {
+      price_1RUt80LE4wKZaCzDRa3pqQz8: {
+        name: "Buritto",
+        price: 390,
+        quantity: 1,
+        id: "price_1RUt80LE4wKZaCzDRa3pqQz8",
+      },
+    }
+
+    const { req, res } = createMocks({ method: "POST", body: { cartDetails } })
+    await handler(req, res)
+
+    expect(res._getStatusCode()).toBe(429)
+    expect(res.getHeader("Retry-After")).toBe(1)
+  })
+
+  it("should point the Stripe SDK at STRIPE_API_HOST when set", () => {
+    process.env.STRIPE_API_HOST = "localhost"
+    process.env.STRIPE_API_PORT = "12111"
+    process.env.STRIPE_API_PROTOCOL = "http"
+
+    jest.isolateModules(() => {
+      require("../../pages/api/checkout")
+      const Stripe = require("stripe")
+      expect(Stripe).toHaveBeenLastCalledWith(
+        process.env.STRIPE_SECRET_KEY,
+        expect.objectContaining({
+          host: "localhost",
+          port: 12111,
+          protocol: "http",
+        })
+      )
+    })
+
+    delete process.env.STRIPE_API_HOST
+    delete process.env.STRIPE_API_PORT
+    delete process.env.STRIPE_API_PROTOCOL
+  })
+
   it("should return 405 for non-POST requests", async () => {
     const { req, res } = createMocks({
       method: "GET",
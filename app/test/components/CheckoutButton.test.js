@@ -33,8 +33,17 @@ global.fetch = jest.fn(() =>
 )
 
 import React from "react"
-import { render, screen, fireEvent, waitFor } from "@testing-library/react"
-import CheckoutButton from "../../components/CheckoutButton"
+import { render, screen, fireEvent, waitFor, act } from "@testing-library/react"
+import CheckoutButton, {
+  CHECKOUT_MAX_RETRIES,
+  CHECKOUT_REQUEST_TIMEOUT_MS,
+  newCheckoutKey,
+  wait,
+} from "../../components/CheckoutButton"
+import { isClientKey } from "../../lib/sessionCache"
+
+const rateLimited = () =>
+  Promise.resolve({ ok: false, status: 429, headers: { get: () => "1" } })
 
 describe("CheckoutButton", () => {
   beforeEach(() => jest.clearAllMocks())
@@ -64,6 +73,105 @@ describe("CheckoutButton", () => {
     })
   })
 
+  it("shows an error when /api/checkout does not respond in time", async () => {
+    jest.useFakeTimers()
+    mockCart.cartCount = 1
+    global.fetch.mockImplementationOnce(
+      (url, { signal }) =>
+        new Promise((resolve, reject) => {
+          signal.addEventListener("abort", () =>
+            reject(new Error("The operation was aborted"))
+          )
+        })
+    )
+    render(<CheckoutButton />)
+
+    fireEvent.click(screen.getByRole("button"))
+    expect(screen.getByText("Loading...")).toBeInTheDocument()
+
+    act(() => jest.advanceTimersByTime(CHECKOUT_REQUEST_TIMEOUT_MS))
+    await waitFor(() =>
+      expect(
+        screen.getByText("Unable to redirect to Stripe checkout page")
+      ).toBeInTheDocument()
+    )
+    expect(mockRedirectToCheckout).not.toHaveBeenCalled()
+    jest.useRealTimers()
+  })
+
+  it("retries after Retry-After when checkout is rate limited", async () => {
+    jest.useFakeTimers()
+    mockCart.cartCount = 1
+    global.fetch.mockImplementationOnce(rateLimited)
+    render(<CheckoutButton />)
+
+    fireEvent.click(screen.getByRole("button"))
+    await waitFor(() => expect(global.fetch).toHaveBeenCalledTimes(1))
+    expect(screen.getByText("Loading...")).toBeInTheDocument()
+
+    await act(async () => jest.advanceTimersByTime(1500))
+    await waitFor(() =>
+      expect(mockRedirectToCheckout).toHaveBeenCalledWith({
+        sessionId: "mock_session_id",
+      })
+    )
+    expect(global.fetch).toHaveBeenCalledTimes(2)
+    const keys = global.fetch.mock.calls.map(
+      ([, options]) => options.headers["Idempotency-Key"]
+    )
+    expect(isClientKey(keys[0])).toBe(true)
+    expect(keys[1]).toBe(keys[0])
+    jest.useRealTimers()
+  })
+
+  it("removes the abort listener once a backoff is over", async () => {
+    jest.useFakeTimers()
+    const controller = new AbortController()
+    const remove = jest.spyOn(controller.signal, "removeEventListener")
+
+    const backoff = wait(100, controller.signal)
+    jest.advanceTimersByTime(100)
+    await backoff
+
+    expect(remove).toHaveBeenCalledWith("abort", expect.any(Function))
+    jest.useRealTimers()
+  })
+
+  it("rejects a backoff when the request is aborted", async () => {
+    const controller = new AbortController()
+    const backoff = wait(60000, controller.signal)
+    controller.abort()
+    await expect(backoff).rejects.toThrow("aborted")
+  })
+
+  it("gives every shopper their own checkout key", () => {
+    const keys = new Set([newCheckoutKey(), newCheckoutKey(), newCheckoutKey()])
+    expect(keys.size).toBe(3)
+    for (const key of keys) expect(isClientKey(key)).toBe(true)
+  })
+
+  it("shows an error once rate limit retries are exhausted", async () => {
+    jest.useFakeTimers()
+    mockCart.cartCount = 1
+    for (let i = 0; i <= CHECKOUT_MAX_RETRIES; i++) {
+      global.fetch.mockImplementationOnce(rateLimited)
+    }
+    render(<CheckoutButton />)
+
+    fireEvent.click(screen.getByRole("button"))
+    for (let i = 0; i < CHECKOUT_MAX_RETRIES; i++) {
+      await act(async () => jest.advanceTimersByTime(1500))
+    }
+    await waitFor(() =>
+      expect(
+        screen.getByText("Unable to redirect to Stripe checkout page")
+      ).toBeInTheDocument()
+    )
+    expect(global.fetch).toHaveBeenCalledTimes(CHECKOUT_MAX_RETRIES + 1)
+    expect(mockRedirectToCheckout).not.toHaveBeenCalled()
+    jest.useRealTimers()
+  })
+
   it("disables button when cart has more than 20 items", () => {
     mockCart.cartCount = 21
     render(<CheckoutButton />)
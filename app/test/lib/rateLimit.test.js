@@ -0,0 +1,49 @@
+import {
+  RateLimitError,
+  createTokenBucket,
+  retryAfterSeconds,
+} from "../../lib/rateLimit"
+
+describe("createTokenBucket", () => {
+  it("should allow a burst up to capacity", () => {
+    const bucket = createTokenBucket({ capacity: 3, refillPerSecond: 1, now: () => 0 })
+
+    bucket.take()
+    bucket.take()
+    bucket.take()
+
+    expect(() => bucket.take()).toThrow(RateLimitError)
+  })
+
+  it("should say how long until the next token", () => {
+    const bucket = createTokenBucket({ capacity: 1, refillPerSecond: 4, now: () => 0 })
+    bucket.take()
+
+    try {
+      bucket.take()
+      throw new Error("expected a RateLimitError")
+    } catch (error) {
+      expect(error).toBeInstanceOf(RateLimitError)
+      expect(error.retryAfterMs).toBe(250)
+    }
+  })
+
+  it("should refill over time without exceeding capacity", () => {
+    let now = 0
+    const bucket = createTokenBucket({ capacity: 2, refillPerSecond: 10, now: () => now })
+    bucket.take()
+    bucket.take()
+
+    now = 100
+    expect(bucket.tokens).toBeCloseTo(1)
+    now = 10000
+    expect(bucket.tokens).toBe(2)
+  })
+})
+
+describe("retryAfterSeconds", () => {
+  it("should round up to whole seconds and never return 0", () => {
+    expect(retryAfterSeconds(0)).toBe(1)
+    expect(retryAfterSeconds(1200)).toBe(2)
+  })
+})
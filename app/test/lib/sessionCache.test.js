@@ -0,0 +1,146 @@
+import {
+  createSessionCache,
+  hashCart,
+  isClientKey,
+  sessionKey,
+} from "../../lib/sessionCache"
+
+const cart = {
+  price_a: { id: "price_a", name: "Sushi", price: 120, quantity: 2, emoji: "🍣" },
+  price_b: { id: "price_b", name: "Onigiri", price: 80, quantity: 1 },
+}
+
+describe("hashCart", () => {
+  it("should ignore key order and UI-only fields", () => {
+    const reordered = {
+      price_b: { ...cart.price_b, emoji: "🍙" },
+      price_a: { ...cart.price_a },
+    }
+    expect(hashCart(reordered)).toBe(hashCart(cart))
+  })
+
+  it("should change when a quantity changes", () => {
+    const changed = { ...cart, price_b: { ...cart.price_b, quantity: 2 } }
+    expect(hashCart(changed)).not.toBe(hashCart(cart))
+  })
+})
+
+describe("sessionKey", () => {
+  it("should differ between clients with identical carts", () => {
+    const a = "7d1f3c52-5a7e-4bd4-9d53-2f0c8b1e6a90"
+    const b = "c0a8e2d4-91f6-4e3b-8a27-6d5b4f3e2c10"
+    expect(sessionKey(a, cart)).not.toBe(sessionKey(b, cart))
+    expect(sessionKey(a, { ...cart })).toBe(sessionKey(a, cart))
+  })
+
+  it("should only accept well-formed client keys", () => {
+    expect(isClientKey("7d1f3c52-5a7e-4bd4-9d53-2f0c8b1e6a90")).toBe(true)
+    expect(isClientKey(undefined)).toBe(false)
+    expect(isClientKey("short")).toBe(false)
+    expect(isClientKey("x".repeat(200))).toBe(false)
+  })
+})
+
+describe("createSessionCache", () => {
+  it("should share one create() call between concurrent requests", async () => {
+    const cache = createSessionCache()
+    const create = jest.fn().mockResolvedValue({ id: "cs_1" })
+
+    const results = await Promise.all([
+      cache.getOrCreate("cart", create),
+      cache.getOrCreate("cart", create),
+      cache.getOrCreate("cart", create),
+    ])
+
+    expect(create).toHaveBeenCalledTimes(1)
+    expect(results.map((result) => result.session.id)).toEqual(["cs_1", "cs_1", "cs_1"])
+    expect(results.map((result) => result.cached)).toEqual([false, true, true])
+  })
+
+  it("should create a new session once the TTL has passed", async () => {
+    let now = 0
+    const cache = createSessionCache({ ttlMs: 1000, now: () => now })
+    const create = jest
+      .fn()
+      .mockResolvedValueOnce({ id: "cs_1" })
+      .mockResolvedValueOnce({ id: "cs_2" })
+
+    await cache.getOrCreate("cart", create)
+    now = 1001
+    const { session, cached } = await cache.getOrCreate("cart", create)
+
+    expect(session.id).toBe("cs_2")
+    expect(cached).toBe(false)
+  })
+
+  it("should evict the least recently used cart when full", async () => {
+    const cache = createSessionCache({ maxEntries: 2 })
+    const create = jest.fn((id) => Promise.resolve({ id }))
+
+    await cache.getOrCreate("a", () => create("cs_a"))
+    await cache.getOrCreate("b", () => create("cs_b"))
+    await cache.getOrCreate("a", () => create("cs_a2"))
+    await cache.getOrCreate("c", () => create("cs_c"))
+
+    expect(cache.size).toBe(2)
+    expect((await cache.getOrCreate("a", () => create("x"))).cached).toBe(true)
+    expect((await cache.getOrCreate("b", () => create("cs_b2"))).cached).toBe(false)
+  })
+
+  it("should replace a cached session that is no longer reusable", async () => {
+    const cache = createSessionCache()
+    const create = jest
+      .fn()
+      .mockResolvedValueOnce({ id: "cs_1" })
+      .mockResolvedValueOnce({ id: "cs_2" })
+    const isReusable = jest.fn().mockResolvedValue(false)
+
+    await cache.getOrCreate("cart", create, { isReusable })
+    const { session, cached } = await cache.getOrCreate("cart", create, { isReusable })
+
+    expect(isReusable).toHaveBeenCalledWith({ id: "cs_1" })
+    expect(session.id).toBe("cs_2")
+    expect(cached).toBe(false)
+  })
+
+  it("should reuse a cached session that is still open", async () => {
+    const cache = createSessionCache()
+    const create = jest.fn().mockResolvedValue({ id: "cs_1" })
+    const isReusable = jest.fn().mockResolvedValue(true)
+
+    await cache.getOrCreate("cart", create, { isReusable })
+    const { session, cached } = await cache.getOrCreate("cart", create, { isReusable })
+
+    expect(session.id).toBe("cs_1")
+    expect(cached).toBe(true)
+    expect(create).toHaveBeenCalledTimes(1)
+  })
+
+  it("should not re-check a session still being created", async () => {
+    const cache = createSessionCache()
+    const create = jest.fn().mockResolvedValue({ id: "cs_1" })
+    const isReusable = jest.fn().mockResolvedValue(false)
+
+    await Promise.all([
+      cache.getOrCreate("cart", create, { isReusable }),
+      cache.getOrCreate("cart", create, { isReusable }),
+    ])
+
+    expect(isReusable).not.toHaveBeenCalled()
+    expect(create).toHaveBeenCalledTimes(1)
+  })
+
+  it("should not cache failed creations", async () => {
+    const cache = createSessionCache()
+    const create = jest
+      .fn()
+      .mockRejectedValueOnce(new Error("Stripe down"))
+      .mockResolvedValueOnce({ id: "cs_1" })
+
+    await expect(cache.getOrCreate("cart", create)).rejects.toThrow("Stripe down")
+    const { session } = await cache.getOrCreate("cart", create)
+
+    expect(session.id).toBe("cs_1")
+    expect(create).toHaveBeenCalledTimes(2)
+  })
+})
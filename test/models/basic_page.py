@@ -1,4 +1,5 @@
 from tests.constants import BASE_URL
+from utils.telemetry import action
 
 
 class BasicPage:
@@ -8,5 +9,6 @@ class BasicPage:
     def __call__(self):
         return self.page
 
-    def navigate(self):
-        self.page.goto(BASE_URL)
+    @action()
+    def navigate(self, url=BASE_URL):
+        self.page.goto(url)
@@ -1,7 +1,12 @@
+import logging
 import re
 
 from models.basic_page import BasicPage
 from playwright.sync_api import expect
+from tests.constants import BASE_URL
+from utils.telemetry import action
+
+logger = logging.getLogger(__name__)
 
 
 class EcommercePage(BasicPage):
@@ -36,6 +41,14 @@ class EcommercePage(BasicPage):
         self.cart_items = page.locator(".cart-item, [data-testid='cart-item']")
         self.remove_item_buttons = page.locator("button:has-text('Remove'), .remove-item")
 
+        # NavBar cart toggle, badge and the ShoppingCart panel it always mounts
+        self.cart_toggle_button = page.locator("nav > button")
+        self.cart_badge = self.cart_toggle_button.locator("div")
+        self.cart_panel = page.locator("nav > div")
+        self.cart_rows = self.cart_panel.locator(
+            "div:has(> button img[alt='delete icon'])"
+        )
+
         # Checkout elements
         self.checkout_button = page.locator(
             "button:has-text('Checkout'), button:has-text('チェックアウト'), [data-testid='checkout'], button:has-text('Buy now'), button:has-text('Purchase')"
@@ -45,28 +58,29 @@ class EcommercePage(BasicPage):
         )
         self.payment_form = page.locator("form[action*='checkout'], .payment-form, #payment-form")
 
-    def navigate_to_app(self):
+    @action()
+    def navigate_to_app(self, url=BASE_URL):
         """Navigate to the app and handle requirements page if present"""
         # First try the requirements page
-        self.page.goto("https://ecommerce-with-stripe-six.vercel.app/")
+        self.page.goto(url)
         self.page.wait_for_load_state("networkidle")
 
         # Check if we're on the requirements page
         try:
             if self.start_qa_button.is_visible():
-                print(
-                    "📋 Requirements page detected, clicking 'Let's start the QA Hackathon' button..."
+                logger.info(
+                    "Requirements page detected, clicking 'Let's start the QA Hackathon' button"
                 )
                 self.start_qa_button.click()
                 # Wait for any content changes
                 self.page.wait_for_timeout(2000)
-                print("✅ Successfully clicked the requirements button!")
+                logger.info("Clicked the requirements button")
             else:
-                print("✅ No requirements page found, navigating to main app...")
-                self.navigate()  # Fall back to main URL
+                logger.info("No requirements page found, navigating to main app")
+                self.navigate(url)  # Fall back to main URL
         except Exception:
-            print("✅ No requirements page found, navigating to main app...")
-            self.navigate()  # Fall back to main URL
+            logger.info("No requirements page found, navigating to main app")
+            self.navigate(url)  # Fall back to main URL
 
         return self
 
@@ -83,39 +97,40 @@ class EcommercePage(BasicPage):
 
     def debug_page_content(self):
         """Debug method to see what's on the page"""
-        print("🔍 Debugging page content...")
+        logger.info("Debugging page content")
 
         # Check page title
         try:
             title = self.page.title()
-            print(f"📄 Page title: {title}")
+            logger.info("Page title: %s", title)
         except Exception as e:
-            print(f"❌ Could not get page title: {e}")
+            logger.warning("Could not get page title: %s", e)
 
         # Check for buttons
         try:
             button_count = self.any_button.count()
-            print(f"🔘 Found {button_count} buttons on the page")
+            logger.info("Found %d buttons on the page", button_count)
 
             if button_count > 0:
                 for i in range(min(button_count, 5)):  # Show first 5 buttons
                     try:
                         button_text = self.any_button.nth(i).text_content()
-                        print(f"  Button {i + 1}: '{button_text}'")
+                        logger.info("Button %d: %r", i + 1, button_text)
                     except Exception:
-                        print(f"  Button {i + 1}: Could not get text")
+                        logger.info("Button %d: could not get text", i + 1)
         except Exception as e:
-            print(f"❌ Could not analyze buttons: {e}")
+            logger.warning("Could not analyze buttons: %s", e)
 
         # Check URL
         try:
             current_url = self.page.url
-            print(f"🌐 Current URL: {current_url}")
+            logger.info("Current URL: %s", current_url)
         except Exception as e:
-            print(f"❌ Could not get URL: {e}")
+            logger.warning("Could not get URL: %s", e)
 
         return self
 
+    @action("start_qa_button")
     def click_start_qa_button(self):
         """Click the 'Let's start the QA Hackathon' button"""
         try:
@@ -126,27 +141,33 @@ class EcommercePage(BasicPage):
             pass
         return self
 
+    @action("page_title")
     def get_page_title(self):
         """Get the main page title"""
         return self.page_title.text_content()
 
+    @action("product_cards")
     def get_product_count(self):
         """Get the number of products displayed"""
         return self.product_cards.count()
 
+    @action("product_titles")
     def get_first_product_title(self):
         """Get the title of the first product"""
         return self.product_titles.first.text_content()
 
+    @action("product_prices")
     def get_first_product_price(self):
         """Get the price of the first product"""
         return self.product_prices.first.text_content()
 
+    @action("add_to_cart_buttons")
     def add_first_product_to_cart(self):
         """Add the first product to cart"""
         self.add_to_cart_buttons.first.click()
         return self
 
+    @action("cart_counter")
     def get_cart_count(self):
         """Get the cart item count"""
         try:
@@ -154,11 +175,13 @@ class EcommercePage(BasicPage):
         except Exception:
             return "0"
 
+    @action("cart_icon")
     def click_cart_icon(self):
         """Click on the cart icon"""
         self.cart_icon.click()
         return self
 
+    @action("checkout_button")
     def click_checkout_button(self):
         """Click the checkout button"""
         try:
@@ -201,6 +224,7 @@ class EcommercePage(BasicPage):
         except Exception:
             return False
 
+    @action("add_to_cart_buttons")
     def add_product_to_cart_by_index(self, index=0):
         """Add a specific product to cart by index"""
         try:
@@ -212,6 +236,7 @@ class EcommercePage(BasicPage):
             pass
         return False
 
+    @action("add_to_cart_buttons")
     def add_multiple_products_to_cart(self, count=2):
         """Add multiple different products to cart"""
         added_count = 0
@@ -220,10 +245,11 @@ class EcommercePage(BasicPage):
         for i in range(max_products):
             if self.add_product_to_cart_by_index(i):
                 added_count += 1
-                print(f"Added product {i+1} to cart")
+                logger.info("Added product %d to cart", i + 1)
         
         return added_count
 
+    @action("quantity_plus_buttons")
     def increase_product_quantity(self, product_index=0):
         """Increase quantity of a product (if quantity controls exist)"""
         try:
@@ -235,6 +261,38 @@ class EcommercePage(BasicPage):
             pass
         return False
 
+    @action("cart_toggle_button")
+    def open_cart_panel(self):
+        """Open the ShoppingCart panel if it is currently hidden"""
+        if "opacity-0" in (self.cart_panel.get_attribute("class") or ""):
+            self.cart_toggle_button.click()
+        return self
+
+    @action("cart_rows")
+    def increment_cart_row(self, row_index=0):
+        """Click '+' on a cart row without waiting for animations"""
+        self.cart_rows.nth(row_index).locator("button", has_text="+").click()
+        return self
+
+    @action("cart_rows")
+    def decrement_cart_row(self, row_index=0):
+        """Click '-' on a cart row without waiting for animations"""
+        self.cart_rows.nth(row_index).locator("button", has_text="-").click()
+        return self
+
+    @action("cart_rows")
+    def remove_cart_row(self, row_index=0):
+        """Click the trash button on a cart row"""
+        self.cart_rows.nth(row_index).locator("button:has(img[alt='delete icon'])").click()
+        return self
+
+    @action("cart_badge")
+    def get_cart_badge_count(self):
+        """Get the NavBar badge count as an integer"""
+        text = (self.cart_badge.text_content() or "").strip()
+        return int(text) if text.isdigit() else 0
+
+    @action("cart_items")
     def get_cart_items_count(self):
         """Get the number of items in cart"""
         try:
@@ -244,27 +302,30 @@ class EcommercePage(BasicPage):
 
     def debug_checkout_elements(self):
         """Debug method to see checkout-related elements"""
-        print("🔍 Debugging checkout elements...")
+        logger.info("Debugging checkout elements")
         
         # Check for checkout buttons
         all_buttons = self.page.locator("button")
         button_count = all_buttons.count()
-        print(f"Found {button_count} total buttons:")
+        logger.info("Found %d total buttons", button_count)
         
         for i in range(min(button_count, 10)):
             try:
                 btn_text = all_buttons.nth(i).text_content()
                 is_visible = all_buttons.nth(i).is_visible()
                 is_enabled = not all_buttons.nth(i).is_disabled()
-                print(f"  Button {i+1}: '{btn_text}' (visible: {is_visible}, enabled: {is_enabled})")
+                logger.info(
+                    "Button %d: %r (visible: %s, enabled: %s)", i + 1, btn_text, is_visible, is_enabled
+                )
             except Exception:
-                print(f"  Button {i+1}: Could not analyze")
+                logger.info("Button %d: could not analyze", i + 1)
         
         # Check current URL
-        print(f"Current URL: {self.page.url}")
+        logger.info("Current URL: %s", self.page.url)
         
         return self
 
+    @action("product_cards")
     def check_page_loaded(self):
         """Verify the page has loaded properly"""
         expect(self.page).to_have_url(re.compile("ecommerce-with-stripe"))
@@ -0,0 +1,49 @@
+import copy
+import random
+
+import pytest
+from playwright.sync_api import Error, Playwright
+from tests.constants import API_BASE_URL
+
+
+@pytest.fixture(scope="session")
+def api_context(playwright: Playwright):
+    """HTTP client for the app's API routes"""
+    context = playwright.request.new_context(base_url=API_BASE_URL)
+    yield context
+    context.dispose()
+
+
+@pytest.fixture
+def cart_details():
+    """A cartDetails payload shaped like the one CheckoutButton posts"""
+    return {
+        "price_1RUsWlLE4wKZaCzDwKfoy9Gz": {
+            "id": "price_1RUsWlLE4wKZaCzDwKfoy9Gz",
+            "price_id": "price_1RUsWlLE4wKZaCzDwKfoy9Gz",
+            "name": "Onigiri",
+            "price": 120,
+            "quantity": 2,
+            "emoji": "🍙",
+        }
+    }
+
+
+@pytest.fixture
+def stripe_backed_api(api_context, fake_stripe, cart_details):
+    """api_context for an app whose Stripe calls reach the fake_stripe server.
+
+    Skips when API_BASE_URL is not a local app started with
+    ``fake_stripe_server.app_env()``.
+    """
+    probe = copy.deepcopy(cart_details)
+    for item in probe.values():
+        item["quantity"] = random.randint(1000, 999_999)
+    try:
+        response = api_context.post("/api/checkout", data={"cartDetails": probe})
+    except Error as error:
+        pytest.skip(f"{API_BASE_URL} is not reachable: {error}")
+    if response.status != 200 or not fake_stripe.session_creations():
+        pytest.skip(f"{API_BASE_URL} is not pointed at the fake Stripe API on {fake_stripe.url}")
+    fake_stripe.reset()
+    return api_context
@@ -0,0 +1,126 @@
+import copy
+import json
+import random
+import secrets
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from tests.constants import API_BASE_URL
+from utils.server_timing import parse_server_timing
+
+CONCURRENT_REQUESTS = 8
+
+
+def unique_cart(cart_details):
+    """Same products, with quantities no earlier run has cached"""
+    cart = copy.deepcopy(cart_details)
+    for item in cart.values():
+        item["quantity"] = random.randint(1000, 999_999)
+    return cart
+
+
+def client_key():
+    """An Idempotency-Key like the one CheckoutButton sends for one shopper"""
+    return secrets.token_urlsafe(24)
+
+
+def post_checkout(cart, key=None):
+    # Plain urllib: Playwright's sync request context can't be shared by threads
+    headers = {"Content-Type": "application/json"}
+    if key is not None:
+        headers["Idempotency-Key"] = key
+    request = urllib.request.Request(
+        f"{API_BASE_URL.rstrip('/')}/api/checkout",
+        data=json.dumps({"cartDetails": cart}).encode("utf-8"),
+        headers=headers,
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return {
+            "status": response.status,
+            "body": json.loads(response.read()),
+            "server_timing": response.headers.get("Server-Timing", ""),
+        }
+
+
+def post_concurrently(carts, keys):
+    with ThreadPoolExecutor(max_workers=len(carts)) as pool:
+        return list(pool.map(post_checkout, carts, keys))
+
+
+@pytest.mark.api
+class TestCheckoutSessionDedup:
+    """/api/checkout reuses a client's open Stripe session for an identical, recent cart"""
+
+    def test_concurrent_identical_carts_create_one_session(
+        self, stripe_backed_api, fake_stripe, cart_details
+    ):
+        """Concurrent checkouts of one cart by one client make a single upstream call"""
+        # Slow Stripe down so every request arrives while the first is in flight
+        fake_stripe.configure(latency=0.5)
+        cart = unique_cart(cart_details)
+        key = client_key()
+
+        results = post_concurrently([cart] * CONCURRENT_REQUESTS, [key] * CONCURRENT_REQUESTS)
+
+        assert all(result["status"] == 200 for result in results), results
+        session_ids = {result["body"]["sessionId"] for result in results}
+        assert len(session_ids) == 1, f"Expected one shared session, got {session_ids}"
+        creations = fake_stripe.session_creations()
+        assert len(creations) == 1, f"Expected 1 upstream call, got {len(creations)}"
+        print(f"✅ {CONCURRENT_REQUESTS} concurrent checkouts -> 1 Stripe session")
+
+    def test_repeat_checkout_is_served_from_cache(
+        self, stripe_backed_api, fake_stripe, cart_details
+    ):
+        """A retry of the same cart reuses the session without calling Stripe"""
+        cart = unique_cart(cart_details)
+        key = client_key()
+
+        first = post_checkout(cart, key)
+        second = post_checkout(cart, key)
+
+        assert first["body"]["sessionId"] == second["body"]["sessionId"]
+        assert len(fake_stripe.session_creations()) == 1
+        stripe_timing = parse_server_timing(second["server_timing"]).get("stripe", {})
+        assert "cached" in (stripe_timing.get("desc") or ""), second["server_timing"]
+
+    def test_different_carts_get_their_own_sessions(
+        self, stripe_backed_api, fake_stripe, cart_details
+    ):
+        """Carts that differ only in quantity are not deduplicated"""
+        carts = [unique_cart(cart_details) for _ in range(3)]
+
+        results = post_concurrently(carts, [client_key()] * len(carts))
+
+        session_ids = {result["body"]["sessionId"] for result in results}
+        assert len(session_ids) == len(carts)
+        assert len(fake_stripe.session_creations()) == len(carts)
+
+    def test_shoppers_with_identical_carts_get_their_own_sessions(
+        self, stripe_backed_api, fake_stripe, cart_details
+    ):
+        """The same cart from different clients, or with no key, is never shared"""
+        cart = unique_cart(cart_details)
+
+        results = post_concurrently([cart] * 3, [client_key(), client_key(), None])
+
+        session_ids = {result["body"]["sessionId"] for result in results}
+        assert len(session_ids) == 3, f"Shoppers shared a session: {session_ids}"
+        assert len(fake_stripe.session_creations()) == 3
+
+    def test_completed_session_is_not_reused(
+        self, stripe_backed_api, fake_stripe, cart_details
+    ):
+        """Once a session is paid, the next checkout of that cart gets a fresh one"""
+        cart = unique_cart(cart_details)
+        key = client_key()
+
+        paid = post_checkout(cart, key)["body"]["sessionId"]
+        fake_stripe.complete_session(paid)
+        again = post_checkout(cart, key)["body"]["sessionId"]
+
+        assert again != paid
+        assert len(fake_stripe.session_creations()) == 2
+        print("✅ A completed Stripe session was not handed out again")
@@ -0,0 +1,122 @@
+import random
+
+import pytest
+from tests.constants import CHECKOUT_TIMING_BUDGETS_MS, PRODUCTS
+from utils.fake_stripe import encode_form
+from utils.server_timing import durations
+
+CART_SIZES = [1, 2, 4, len(PRODUCTS)]
+
+
+def catalog_cart(size):
+    """cartDetails with `size` distinct products at catalog prices"""
+    cart = {}
+    for price_id in list(PRODUCTS)[:size]:
+        product = PRODUCTS[price_id]
+        cart[price_id] = {
+            "id": price_id,
+            "price_id": price_id,
+            "name": product["name"],
+            "price": product["price"],
+            # Random quantities keep the session cache from answering
+            "quantity": random.randint(1000, 999_999),
+        }
+    return cart
+
+
+def inline_price_data_bytes(cart, template_params):
+    """Size of the same request built with inline price_data, as before"""
+    line_items = [
+        {
+            "price_data": {
+                "currency": "jpy",
+                "product_data": {"name": item["name"]},
+                "unit_amount": item["price"],
+            },
+            "quantity": item["quantity"],
+        }
+        for item in cart.values()
+    ]
+    return len(encode_form({**template_params, "line_items": line_items}).encode("utf-8"))
+
+
+@pytest.mark.api
+class TestCheckoutLineItems:
+    """/api/checkout resolves prices from the catalog, not the client"""
+
+    @pytest.mark.req("FIXED-PRICING")
+    def test_line_items_reference_catalog_prices(self, stripe_backed_api, fake_stripe):
+        """Stripe receives price references and charges catalog prices"""
+        cart = catalog_cart(3)
+        response = stripe_backed_api.post("/api/checkout", data={"cartDetails": cart})
+        assert response.status == 200, response.text()
+
+        (creation,) = fake_stripe.session_creations()
+        line_items = creation["params"]["line_items"]
+        assert all(set(item) == {"price", "quantity"} for item in line_items), line_items
+        assert {item["price"] for item in line_items} == set(cart)
+
+        session = fake_stripe.sessions[response.json()["sessionId"]]
+        expected_total = sum(item["price"] * item["quantity"] for item in cart.values())
+        assert session["amount_total"] == expected_total
+
+    @pytest.mark.perf
+    def test_payload_and_latency_as_cart_grows(
+        self, stripe_backed_api, fake_stripe, record_property
+    ):
+        """Stripe payload and handler time stay small as carts grow"""
+        rows = []
+        for size in CART_SIZES:
+            fake_stripe.reset()
+            cart = catalog_cart(size)
+            response = stripe_backed_api.post("/api/checkout", data={"cartDetails": cart})
+            assert response.status == 200, response.text()
+
+            (creation,) = fake_stripe.session_creations()
+            template = {key: value for key, value in creation["params"].items() if key != "line_items"}
+            timings = durations(response.headers.get("server-timing"))
+            rows.append(
+                {
+                    "items": size,
+                    "body_bytes": creation["body_bytes"],
+                    "inline_body_bytes": inline_price_data_bytes(cart, template),
+                    "line_items_ms": timings.get("line-items"),
+                    "total_ms": timings.get("total"),
+                }
+            )
+
+        record_property("line_item_scaling", rows)
+        print("📦 items | bytes (price refs) | bytes (price_data) | line-items ms | total ms")
+        for row in rows:
+            print(
+                f"   {row['items']:>5} | {row['body_bytes']:>18} | {row['inline_body_bytes']:>18} "
+                f"| {row['line_items_ms']:>13.2f} | {row['total_ms']:>8.1f}"
+            )
+
+        for row in rows:
+            assert row["body_bytes"] < row["inline_body_bytes"], row
+            assert row["line_items_ms"] <= CHECKOUT_TIMING_BUDGETS_MS["line-items"], row
+
+    @pytest.mark.parametrize(
+        "tamper",
+        [
+            pytest.param({"price": 1}, id="lowered-price"),
+            pytest.param({"price": 0}, id="free"),
+            pytest.param({"id": "price_attacker", "price_id": "price_attacker"}, id="unknown-price"),
+            pytest.param(
+                {"quantity": -3}, id="negative-quantity", marks=pytest.mark.req("QTY-LIMIT")
+            ),
+        ],
+    )
+    @pytest.mark.req("FIXED-PRICING", "UC-005")
+    def test_tampered_cart_is_rejected(self, stripe_backed_api, fake_stripe, tamper):
+        """Carts that disagree with the catalog never reach Stripe"""
+        cart = catalog_cart(2)
+        first = next(iter(cart.values()))
+        first.update(tamper)
+
+        response = stripe_backed_api.post("/api/checkout", data={"cartDetails": cart})
+
+        assert response.status == 400, response.text()
+        assert "error" in response.json()
+        assert not fake_stripe.session_creations(), "Tampered cart reached Stripe"
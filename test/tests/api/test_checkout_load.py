@@ -0,0 +1,63 @@
+import random
+import statistics
+
+import pytest
+from tests.constants import (
+    API_BASE_URL,
+    CHECKOUT_RATE_LIMIT_BURST,
+    CHECKOUT_RATE_LIMIT_PER_SECOND,
+)
+from utils.loadgen import format_load_summary, run_load, summarize_load
+
+OVERLOAD_FACTOR = 5
+DURATION_S = 8
+MAX_ERROR_RATE = 0.01
+
+
+@pytest.mark.api
+@pytest.mark.slow
+@pytest.mark.perf
+class TestCheckoutBackpressure:
+    """/api/checkout sheds overload with 429s instead of failing"""
+
+    def test_throughput_stays_stable_under_overload(
+        self, stripe_backed_api, fake_stripe, cart_details, record_property
+    ):
+        """Offered load far above the limit keeps throughput flat and errors bounded"""
+        fake_stripe.configure(latency=(0.05, 0.2))
+        rate = CHECKOUT_RATE_LIMIT_PER_SECOND * OVERLOAD_FACTOR
+
+        def unique_cart(index):
+            # Distinct carts so the session cache can't absorb the load
+            cart = {key: dict(item) for key, item in cart_details.items()}
+            for item in cart.values():
+                item["quantity"] = random.randint(1000, 999_999)
+            return {"cartDetails": cart}
+
+        results = run_load(
+            f"{API_BASE_URL.rstrip('/')}/api/checkout", unique_cart, rate, DURATION_S
+        )
+        summary = summarize_load(results)
+        record_property("checkout_load", summary)
+        print(f"📈 {rate}/s offered for {DURATION_S}s\n{format_load_summary(summary)}")
+
+        assert summary["error_rate"] <= MAX_ERROR_RATE, (
+            f"{summary['error_rate']:.1%} of requests failed under overload"
+        )
+
+        limited = [result for result in results if result.status == 429]
+        assert limited, "Overload never triggered the rate limiter"
+        assert all(int(result.headers.get("retry-after", 0)) >= 1 for result in limited)
+
+        # After the initial burst drains, each second admits roughly the refill rate
+        steady = [window["ok"] for window in summary["windows"][2:]]
+        assert steady, "Load test too short to reach steady state"
+        assert all(
+            0.5 * CHECKOUT_RATE_LIMIT_PER_SECOND <= ok <= 1.5 * CHECKOUT_RATE_LIMIT_PER_SECOND
+            for ok in steady
+        ), f"Unstable throughput per second: {steady}"
+        assert statistics.pstdev(steady) <= 0.3 * statistics.mean(steady), steady
+
+        # Stripe only ever sees what the bucket lets through
+        upstream_limit = CHECKOUT_RATE_LIMIT_BURST + CHECKOUT_RATE_LIMIT_PER_SECOND * (DURATION_S + 1)
+        assert len(fake_stripe.session_creations()) <= upstream_limit
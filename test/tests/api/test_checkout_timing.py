@@ -0,0 +1,63 @@
+import time
+
+import pytest
+from tests.constants import CHECKOUT_TIMING_BUDGETS_MS
+from utils.server_timing import durations
+
+HANDLER_PHASES = ["parse", "validate", "line-items", "stripe", "total"]
+
+
+@pytest.mark.api
+class TestCheckoutServerTiming:
+    """Server-Timing instrumentation on /api/checkout of a local app backed by the fake Stripe
+
+    The deployed site predates the instrumentation, and its Stripe latency
+    isn't ours to budget, so these skip unless API_BASE_URL is that app.
+    """
+
+    def post_checkout(self, api_context, payload):
+        started = time.perf_counter()
+        response = api_context.post("/api/checkout", data=payload)
+        round_trip_ms = (time.perf_counter() - started) * 1000
+        return response, round_trip_ms
+
+    def test_checkout_reports_handler_phases(self, stripe_backed_api, cart_details):
+        """Every handler phase is reported in the Server-Timing header"""
+        response, _ = self.post_checkout(stripe_backed_api, {"cartDetails": cart_details})
+        assert response.status == 200, f"Checkout failed: {response.text()}"
+
+        timings = durations(response.headers.get("server-timing"))
+        missing = [phase for phase in HANDLER_PHASES if phase not in timings]
+        assert not missing, f"Server-Timing is missing phases {missing}: {timings}"
+        print(f"✅ Server-Timing phases: {timings}")
+
+    def test_checkout_phases_within_budget(self, stripe_backed_api, cart_details):
+        """Handler phases stay within their budgets"""
+        response, round_trip_ms = self.post_checkout(
+            stripe_backed_api, {"cartDetails": cart_details}
+        )
+        assert response.status == 200, f"Checkout failed: {response.text()}"
+
+        timings = durations(response.headers.get("server-timing"))
+        handler_ms = timings.get("total", 0.0)
+        print(
+            f"⏱️ round trip {round_trip_ms:.0f} ms = handler {handler_ms:.0f} ms "
+            f"+ network {round_trip_ms - handler_ms:.0f} ms"
+        )
+
+        over_budget = {
+            phase: f"{timings[phase]:.1f} ms > {budget} ms"
+            for phase, budget in CHECKOUT_TIMING_BUDGETS_MS.items()
+            if phase in timings and timings[phase] > budget
+        }
+        assert not over_budget, f"Checkout phases over budget: {over_budget}"
+
+    def test_invalid_cart_reports_validation_timing(self, stripe_backed_api, fake_stripe):
+        """Rejected requests still report parse and validation timing"""
+        response, _ = self.post_checkout(stripe_backed_api, {})
+        assert response.status == 400
+
+        timings = durations(response.headers.get("server-timing"))
+        assert {"parse", "validate", "total"} <= set(timings), timings
+        assert "stripe" not in timings, "Invalid carts must not reach Stripe"
+        assert not fake_stripe.session_creations()
@@ -0,0 +1,155 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+from utils.fake_stripe import encode_form, parse_form
+
+SECRET_KEY = "sk_test_fake"
+
+
+def session_params(**overrides):
+    params = {
+        "payment_method_types": ["card"],
+        "mode": "payment",
+        "success_url": "http://localhost:3000/success",
+        "cancel_url": "http://localhost:3000/cancel",
+        "line_items": [
+            {
+                "price_data": {
+                    "currency": "jpy",
+                    "product_data": {"name": "Onigiri"},
+                    "unit_amount": 120,
+                },
+                "quantity": 2,
+            }
+        ],
+    }
+    params.update(overrides)
+    return params
+
+
+def stripe_request(server, path, params=None, method="POST", headers=None):
+    data = encode_form(params).encode() if params is not None else None
+    request = urllib.request.Request(
+        server.url + path,
+        data=data,
+        method=method,
+        headers={
+            "Authorization": f"Bearer {SECRET_KEY}",
+            "Content-Type": "application/x-www-form-urlencoded",
+            **(headers or {}),
+        },
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+@pytest.mark.api
+class TestFakeStripe:
+    """The local Stripe stand-in behaves like checkout.sessions.create"""
+
+    def test_form_encoding_round_trip(self):
+        """Bracketed form keys decode back into nested params"""
+        params = session_params()
+        assert parse_form(encode_form(params)) == {
+            **params,
+            "line_items": [
+                {
+                    "price_data": {
+                        "currency": "jpy",
+                        "product_data": {"name": "Onigiri"},
+                        "unit_amount": "120",
+                    },
+                    "quantity": "2",
+                }
+            ],
+        }
+
+    def test_creates_checkout_session(self, fake_stripe):
+        """A valid request returns a realistic Checkout Session"""
+        status, session = stripe_request(fake_stripe, "/v1/checkout/sessions", session_params())
+
+        assert status == 200, session
+        assert session["id"].startswith("cs_test_")
+        assert session["object"] == "checkout.session"
+        assert session["amount_total"] == 240
+        assert session["currency"] == "jpy"
+        assert session["url"].endswith(session["id"])
+        assert len(fake_stripe.session_creations()) == 1
+
+        status, retrieved = stripe_request(
+            fake_stripe, f"/v1/checkout/sessions/{session['id']}", method="GET"
+        )
+        assert status == 200
+        assert retrieved["id"] == session["id"]
+
+    @pytest.mark.parametrize(
+        "line_item, param",
+        [
+            (
+                {"price_data": {"currency": "usd", "product_data": {"name": "Egg"}, "unit_amount": 100}, "quantity": 1},
+                "line_items[0][price_data][currency]",
+            ),
+            (
+                {"price_data": {"currency": "jpy", "product_data": {"name": "Egg"}, "unit_amount": -1}, "quantity": 1},
+                "line_items[0][price_data][unit_amount]",
+            ),
+            (
+                {"price_data": {"currency": "jpy", "product_data": {"name": "Egg"}, "unit_amount": 100}, "quantity": 0},
+                "line_items[0][quantity]",
+            ),
+            (
+                {"price_data": {"currency": "jpy", "product_data": {"name": ""}, "unit_amount": 100}, "quantity": 1},
+                "line_items[0][price_data][product_data][name]",
+            ),
+            ({"quantity": 1}, "line_items[0]"),
+        ],
+    )
+    def test_rejects_invalid_line_items(self, fake_stripe, line_item, param):
+        """Invalid line items are rejected with Stripe's error shape"""
+        status, body = stripe_request(
+            fake_stripe, "/v1/checkout/sessions", session_params(line_items=[line_item])
+        )
+        assert status == 400
+        assert body["error"]["type"] == "invalid_request_error"
+        assert body["error"]["param"] == param
+
+    def test_requires_secret_key(self, fake_stripe):
+        """Requests without a secret key are unauthorized"""
+        status, body = stripe_request(
+            fake_stripe,
+            "/v1/checkout/sessions",
+            session_params(),
+            headers={"Authorization": "Bearer pk_test_public"},
+        )
+        assert status == 401
+        assert "API Key" in body["error"]["message"]
+
+    def test_injected_latency(self, fake_stripe):
+        """Configured latency delays every response"""
+        fake_stripe.configure(latency=0.2)
+        started = time.perf_counter()
+        status, _ = stripe_request(fake_stripe, "/v1/checkout/sessions", session_params())
+        assert status == 200
+        assert time.perf_counter() - started >= 0.2
+
+    @pytest.mark.parametrize("error_status", [500, 429])
+    def test_injected_errors(self, fake_stripe, error_status):
+        """An error rate of 1 fails every request with the configured status"""
+        fake_stripe.configure(error_rate=1.0, error_status=error_status)
+        status, body = stripe_request(fake_stripe, "/v1/checkout/sessions", session_params())
+        assert status == error_status
+        assert "error" in body
+
+    def test_idempotent_replay(self, fake_stripe):
+        """Retries with the same Idempotency-Key get the original session"""
+        headers = {"Idempotency-Key": "retry-1"}
+        _, first = stripe_request(fake_stripe, "/v1/checkout/sessions", session_params(), headers=headers)
+        _, second = stripe_request(fake_stripe, "/v1/checkout/sessions", session_params(), headers=headers)
+        assert first["id"] == second["id"]
+        assert len(fake_stripe.sessions) == 1
@@ -1,6 +1,247 @@
 # tests/conftest.py
+import errno
+import os
+import urllib.error
+import urllib.request
+
 import pytest
 from playwright.sync_api import BrowserContext, Page
+from tests.constants import LOCAL_APP_URL, PRODUCTS
+from utils.browser_server import SharedBrowser, SharedBrowserServer, to_server_options
+from utils.fake_stripe import DEFAULT_PORT, FakeStripeServer
+
+pytest_plugins = [
+    "utils.telemetry",
+    "utils.journey",
+    "utils.results_db",
+    "utils.timeouts",
+    "utils.distributed",
+    "utils.traceability",
+    "utils.trace_capture",
+]
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--shared-browser",
+        choices=["auto", "on", "off"],
+        default="auto",
+        help="Connect every worker to one shared browser server "
+        "(auto: only when running under pytest-xdist)",
+    )
+    parser.addoption(
+        "--stripe-e2e",
+        action="store_true",
+        default=False,
+        help="Also run tests that load the hosted Stripe checkout page",
+    )
+    group = parser.getgroup("soak", "long-session memory soak tests")
+    group.addoption(
+        "--soak",
+        action="store_true",
+        default=False,
+        help="Run soak tests that drive thousands of cart cycles in one page",
+    )
+    group.addoption(
+        "--soak-cycles",
+        type=int,
+        default=2000,
+        help="Number of add/increment/decrement/remove cycles per soak test",
+    )
+    group.addoption(
+        "--soak-sample-every",
+        type=int,
+        default=100,
+        help="Sample heap and DOM node counts every N cycles",
+    )
+    group.addoption(
+        "--soak-heap-threshold-mb",
+        type=float,
+        default=5.0,
+        help="Flag monotonic JS heap growth beyond this many MB",
+    )
+    group.addoption(
+        "--soak-dom-threshold",
+        type=int,
+        default=200,
+        help="Flag monotonic DOM node growth beyond this many nodes",
+    )
+    group = parser.getgroup("cart model", "model-based cart state machine tests")
+    group.addoption(
+        "--cart-model-sequences",
+        type=int,
+        default=300,
+        help="Number of random cart operation sequences to run",
+    )
+    group.addoption(
+        "--cart-model-length",
+        type=int,
+        default=12,
+        help="Operations per random sequence",
+    )
+    group.addoption(
+        "--cart-model-batch",
+        type=int,
+        default=50,
+        help="Sequences executed per page.evaluate call",
+    )
+    group.addoption(
+        "--cart-model-seed",
+        type=int,
+        default=None,
+        help="Seed for sequence generation (random by default; printed to reproduce)",
+    )
+    group = parser.getgroup("visual", "visual regression against data/visual_baselines")
+    group.addoption(
+        "--update-visual-baselines",
+        action="store_true",
+        default=False,
+        help="Record missing visual baselines and overwrite existing ones "
+        "with this run's screenshots",
+    )
+    group = parser.getgroup("accessibility", "cached axe-core audits")
+    group.addoption(
+        "--update-axe-baseline",
+        action="store_true",
+        default=False,
+        help="Add every violation found to data/config/axe_known_violations.json",
+    )
+    group = parser.getgroup("load scenario", "ramped browser-plus-HTTP load with an SLO report")
+    group.addoption(
+        "--load-scenario",
+        action="store_true",
+        default=False,
+        help="Run the sale-day load scenario (utils.load_scenario)",
+    )
+    group.addoption(
+        "--load-ramp",
+        default=None,
+        metavar="SPEC",
+        help="Phases as name:duration_s:http_rate[:browsers],... "
+        "(default: utils.load_scenario.DEFAULT_RAMP)",
+    )
+    group.addoption(
+        "--load-target",
+        default=None,
+        metavar="URL",
+        help="App under load, for HTTP and browser shoppers (default: LOCAL_APP_URL)",
+    )
+    group.addoption(
+        "--load-checkout-ratio",
+        type=float,
+        default=0.3,
+        help="Share of HTTP shoppers that go on to /api/checkout",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # With --dist loadgroup, xdist runs every test of the fake Stripe on the
+    # one worker that can hold FAKE_STRIPE_PORT
+    fake_stripe_group = pytest.mark.xdist_group("fake_stripe")
+    for item in items:
+        if "fake_stripe_server" in item.fixturenames:
+            item.add_marker(fake_stripe_group)
+    if config.getoption("--stripe-e2e"):
+        return
+    skip_stripe = pytest.mark.skip(reason="loads hosted Stripe checkout; run with --stripe-e2e")
+    for item in items:
+        if "stripe_e2e" in item.keywords:
+            item.add_marker(skip_stripe)
+
+
+def use_shared_browser(config):
+    option = config.getoption("--shared-browser")
+    if option == "auto":
+        return bool(os.environ.get("PYTEST_XDIST_WORKER"))
+    return option == "on"
+
+
+def shared_browser_server(config, browser_name, launch_args):
+    # Imported here so pytest_plugins registers utils.telemetry first
+    from utils.telemetry import run_id
+
+    return SharedBrowserServer(run_id(), browser_name, to_server_options(launch_args))
+
+
+def warm_browser(config):
+    """The WarmBrowserPlugin of watch mode (utils.watch), if this run has one"""
+    return config.pluginmanager.get_plugin("warm_browser")
+
+
+def pytest_unconfigure(config):
+    # Only the controller (or a non-distributed run) owns the shared server,
+    # watch mode keeps its server alive between runs, and the nodes of a
+    # utils.distributed run share theirs until the coordinator is done
+    if hasattr(config, "workerinput") or warm_browser(config):
+        return
+    if config.getoption("--dist-coordinator", None):
+        return
+    for browser_name in config.getoption("--browser") or ["chromium"]:
+        server = shared_browser_server(config, browser_name, {})
+        if server.state_path.exists():
+            server.shutdown()
+
+
+@pytest.fixture(scope="session")
+def browser(launch_browser, browser_type, browser_name, browser_type_launch_args, pytestconfig):
+    """Launch a browser, or connect to the shared browser server under xdist"""
+    warm = warm_browser(pytestconfig)
+    if warm is not None:
+        browser = SharedBrowser(warm.server, browser_type)
+        yield browser
+        browser.close()
+        return
+
+    if not use_shared_browser(pytestconfig):
+        browser = launch_browser()
+        yield browser
+        browser.close()
+        return
+
+    server = shared_browser_server(pytestconfig, browser_name, browser_type_launch_args)
+    browser = SharedBrowser(server, browser_type)
+    yield browser
+    browser.close()
+
+
+@pytest.fixture(scope="session")
+def local_app_url():
+    """LOCAL_APP_URL without a trailing slash; skips when no app is listening there"""
+    try:
+        urllib.request.urlopen(LOCAL_APP_URL, timeout=5).close()
+    except urllib.error.HTTPError:
+        pass  # The app answered, just not with a 2xx
+    except OSError as error:
+        pytest.skip(f"No app at {LOCAL_APP_URL}: {error}")
+    return LOCAL_APP_URL.rstrip("/")
+
+
+@pytest.fixture(scope="session")
+def fake_stripe_server():
+    """Fake Stripe API on FAKE_STRIPE_PORT, where a local app under test points.
+
+    Only one process can hold that port. Other xdist workers (or nodes) get a
+    free port instead, which the app doesn't use, so stripe_backed_api skips
+    their tests; ``-n N --dist loadgroup`` keeps them all on one worker.
+    """
+    port = int(os.environ.get("FAKE_STRIPE_PORT", DEFAULT_PORT))
+    known_prices = {price_id: product["price"] for price_id, product in PRODUCTS.items()}
+    try:
+        server = FakeStripeServer(port=port, known_prices=known_prices)
+    except OSError as error:
+        if error.errno != errno.EADDRINUSE:
+            raise
+        server = FakeStripeServer(port=0, known_prices=known_prices)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_stripe(fake_stripe_server):
+    """The shared fake Stripe API, reset to no latency and no errors"""
+    fake_stripe_server.reset()
+    return fake_stripe_server
 
 
 @pytest.fixture(scope="function")
@@ -14,13 +255,17 @@ def browser_context_args(browser_context_args):
 
 
 @pytest.fixture(scope="function")
-def page(context: BrowserContext) -> Page:
+def page(context: BrowserContext, request) -> Page:
     """Create a page with configured timeouts"""
+    # Imported here so pytest_plugins registers utils.timeouts first
+    from utils.timeouts import playwright_timeout_ms
+
     page = context.new_page()
 
-    # Set reasonable timeouts
-    page.set_default_timeout(30000)  # 30 seconds
-    page.set_default_navigation_timeout(30000)  # 30 seconds
+    # 30 seconds, or less when the test's planned timeout is shorter
+    timeout_ms = playwright_timeout_ms(request.node, 30000)
+    page.set_default_timeout(timeout_ms)
+    page.set_default_navigation_timeout(timeout_ms)
 
     yield page
     page.close()
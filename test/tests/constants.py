@@ -1,2 +1,50 @@
+import os
+from pathlib import Path
+
 BASE_URL = "https://ecommerce-with-stripe-six.vercel.app/"
 REQUIREMENTS_URL = "https://ecommerce-with-stripe-six.vercel.app/prd"
+PAGE_ROUTES = ["/", "/success", "/cancel", "/prd"]
+
+# Where API tests send requests; point at a local `next start` to test changes
+API_BASE_URL = os.environ.get("API_BASE_URL", BASE_URL)
+
+# A local production build (`npm run build && npm start`) for cache header checks
+LOCAL_APP_URL = os.environ.get("LOCAL_APP_URL", "http://localhost:3000")
+# Storefront pages that are prerendered at build time
+STATIC_ROUTES = ["/", "/success", "/cancel"]
+# Prerendered HTML from a local server should start arriving within this
+STATIC_TTFB_BUDGET_MS = 100
+
+# Mirror of app/data/products.js: price_id -> catalog entry
+PRODUCTS = {
+    "price_1RUsWlLE4wKZaCzDwKfoy9Gz": {"name": "Onigiri", "price": 120},
+    "price_1RUszjLE4wKZaCzD4uVQPDal": {"name": "Sweet Potato", "price": 290},
+    "price_1RUt5PLE4wKZaCzDUUwUZgdd": {"name": "Croissant", "price": 200},
+    "price_1RUt71LE4wKZaCzDwbJ5rcN5": {"name": "Sushi", "price": 120},
+    "price_1RUt7cLE4wKZaCzDe3axLYEm": {"name": "Egg", "price": 100},
+    "price_1RUt80LE4wKZaCzDRa3pqQz8": {"name": "Buritto", "price": 390},
+    "price_1RUt8XLE4wKZaCzDvjyAWX9y": {"name": "Pudding", "price": 150},
+    "price_1RUt8wLE4wKZaCzDYiiutmWe": {"name": "Pretzel", "price": 520},
+}
+
+# Server-Timing budgets for /api/checkout phases, in milliseconds
+CHECKOUT_TIMING_BUDGETS_MS = {
+    "parse": 5,
+    "validate": 5,
+    "line-items": 10,
+    "stripe": 2500,
+    "total": 3000,
+}
+
+# Defaults of CHECKOUT_RATE_LIMIT_BURST / CHECKOUT_RATE_LIMIT_PER_SECOND in /api/checkout
+CHECKOUT_RATE_LIMIT_BURST = 20
+CHECKOUT_RATE_LIMIT_PER_SECOND = 10
+
+# CheckoutButton gives up on /api/checkout after this long (CHECKOUT_REQUEST_TIMEOUT_MS)
+CHECKOUT_CLIENT_TIMEOUT_MS = 10000
+# Shoppers should see "Loading..." or an error this soon after the UI can know
+CHECKOUT_FEEDBACK_BUDGET_MS = 500
+
+TEST_ROOT = Path(__file__).resolve().parent.parent
+REPORTS_DIR = TEST_ROOT / "reports"
+LOGS_DIR = TEST_ROOT / "logs"
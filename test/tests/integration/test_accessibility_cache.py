@@ -0,0 +1,79 @@
+import pytest
+from utils.accessibility import (
+    AuditCache,
+    KnownViolations,
+    new_violations,
+    state_hash,
+    violation_keys,
+)
+
+VIOLATIONS = [
+    {
+        "id": "color-contrast",
+        "impact": "serious",
+        "help": "Contrast",
+        "targets": ["nav > button", "main h1"],
+    },
+    {"id": "image-alt", "impact": "critical", "help": "Alt text", "targets": ["img.delete"]},
+]
+
+
+
+def dom_state(**changes):
+    """A DOM_STATE_SCRIPT result"""
+    state = {
+        "regions": [["navbar", ["<nav>1</nav>"]], ["cart_panel", []]],
+        "styles": [".cart{color:#111}"],
+        "build": "build-1",
+        "viewport": [1280, 720, 1],
+    }
+    return {**state, **changes}
+
+
+@pytest.mark.integration
+class TestAccessibilityCache:
+    """DOM state hashing, the audit cache and the known-violations baseline"""
+
+    def test_state_hash_follows_the_dom(self):
+        state = dom_state()
+        assert state_hash(state) == state_hash(dom_state())
+        assert state_hash(state) != state_hash(dom_state(regions=[["navbar", ["<nav>2</nav>"]]]))
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            {"styles": [".cart{color:#999}"]},
+            {"build": "build-2"},
+            {"viewport": [375, 667, 2]},
+        ],
+    )
+    def test_state_hash_follows_styles_build_and_viewport(self, change):
+        """The same markup can fail color-contrast under different CSS or at another size"""
+        assert state_hash(dom_state(**change)) != state_hash(dom_state())
+
+    def test_cache_round_trip(self, tmp_path):
+        cache = AuditCache(tmp_path)
+        assert cache.get("abc") is None
+        cache.put("abc", VIOLATIONS)
+        assert cache.get("abc")["violations"] == VIOLATIONS
+        assert [path.name for path in tmp_path.iterdir()] == ["abc.json"]
+
+    def test_old_entries_expire(self, tmp_path):
+        AuditCache(tmp_path).put("abc", VIOLATIONS)
+        assert AuditCache(tmp_path, max_age_s=3600).get("abc") is not None
+        assert AuditCache(tmp_path, max_age_s=-1).get("abc") is None
+
+    def test_only_unknown_nodes_are_new(self):
+        known = {"color-contrast nav > button"}
+        assert new_violations(VIOLATIONS, known) == [
+            {**VIOLATIONS[0], "targets": ["main h1"]},
+            VIOLATIONS[1],
+        ]
+        assert new_violations(VIOLATIONS, violation_keys(VIOLATIONS)) == []
+
+    def test_baseline_update_merges(self, tmp_path):
+        known = KnownViolations(tmp_path / "known.json")
+        assert known.load() == set()
+        known.add(VIOLATIONS[:1])
+        known.add(VIOLATIONS[1:])
+        assert known.load() == violation_keys(VIOLATIONS)
@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+import pytest
+from utils.timeouts import plan_timeout, planned_timeout_key, playwright_timeout_ms
+
+
+@pytest.mark.integration
+class TestAdaptiveTimeouts:
+    """Timeout planning from duration history"""
+
+    def test_new_tests_keep_the_fallback(self):
+        """Tests with too few passing runs get no planned timeout"""
+        assert plan_timeout([1.0, 1.2], min_samples=5) is None
+
+    def test_plans_p99_times_margin(self):
+        """A test's timeout is its p99 duration times the margin"""
+        durations = [4.0] * 98 + [5.0, 9.0]
+        assert plan_timeout(durations, margin=3.0, floor=1.0) == 15.0
+
+    @pytest.mark.parametrize(
+        "durations, expected",
+        [([0.5] * 10, 10.0), ([200.0] * 10, 300.0)],
+        ids=["floor", "ceiling"],
+    )
+    def test_plan_is_clamped(self, durations, expected):
+        """Planned timeouts stay between the floor and the ceiling"""
+        assert plan_timeout(durations, margin=3.0, floor=10.0, ceiling=300.0) == expected
+
+    def test_playwright_timeout_never_exceeds_plan(self):
+        """The page timeout shrinks to the planned test timeout"""
+        item = SimpleNamespace(stash=pytest.Stash())
+        assert playwright_timeout_ms(item, 30000) == 30000
+
+        item.stash[planned_timeout_key] = 12.0
+        assert playwright_timeout_ms(item, 30000) == 12000
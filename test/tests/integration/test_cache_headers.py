@@ -0,0 +1,127 @@
+import http.client
+import re
+import statistics
+import time
+from urllib.parse import urlsplit
+
+import pytest
+from tests.constants import LOCAL_APP_URL, STATIC_ROUTES, STATIC_TTFB_BUDGET_MS
+
+WARM_REQUESTS = 10
+_ASSET = re.compile(r'(?:src|href)="(/_next/static/[^"]+)"')
+
+
+def connect():
+    parts = urlsplit(LOCAL_APP_URL)
+    connection_class = (
+        http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    )
+    return connection_class(parts.hostname, parts.port, timeout=10)
+
+
+def fetch(connection, path, headers=None):
+    """GET path; return (response, body, ms until the response headers arrived)"""
+    started = time.perf_counter()
+    connection.request("GET", path, headers=headers or {})
+    response = connection.getresponse()
+    ttfb_ms = (time.perf_counter() - started) * 1000
+    body = response.read()
+    return response, body, ttfb_ms
+
+
+def cache_directives(header):
+    """Parse Cache-Control into {directive: value or True}"""
+    directives = {}
+    for part in (header or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else True
+    return directives
+
+
+@pytest.fixture(scope="module")
+def app_connection():
+    """Keep-alive connection to a local production build (`npm run build && npm start`)"""
+    connection = connect()
+    try:
+        connection.request("HEAD", "/")
+        connection.getresponse().read()
+    except OSError as error:
+        pytest.skip(f"No app at {LOCAL_APP_URL}: {error}")
+    yield connection
+    connection.close()
+
+
+@pytest.mark.integration
+class TestStorefrontCaching:
+    """Storefront pages are served as prerendered, CDN-cacheable HTML"""
+
+    @pytest.mark.parametrize("route", STATIC_ROUTES)
+    def test_page_is_cdn_cacheable(self, app_connection, route):
+        """Prerendered pages can be cached by a shared cache"""
+        response, body, _ = fetch(app_connection, route)
+
+        assert response.status == 200
+        assert "text/html" in response.getheader("Content-Type", "")
+        directives = cache_directives(response.getheader("Cache-Control"))
+        assert "s-maxage" in directives, f"{route} is not CDN-cacheable: {directives}"
+        assert int(directives["s-maxage"]) > 0
+        assert not {"private", "no-store"} & set(directives), directives
+        assert b"__NEXT_DATA__" in body
+        print(f"✅ {route}: Cache-Control {response.getheader('Cache-Control')}")
+
+    @pytest.mark.parametrize("route", STATIC_ROUTES)
+    def test_page_revalidates_with_etag(self, app_connection, route):
+        """A matching If-None-Match gets an empty 304"""
+        response, _, _ = fetch(app_connection, route)
+        etag = response.getheader("ETag")
+        assert etag, f"{route} has no ETag"
+
+        revalidated, body, _ = fetch(app_connection, route, {"If-None-Match": etag})
+        assert revalidated.status == 304, f"{route} answered {revalidated.status} to If-None-Match"
+        assert body == b""
+
+        changed, _, _ = fetch(app_connection, route, {"If-None-Match": '"stale"'})
+        assert changed.status == 200
+
+    @pytest.mark.parametrize("route", STATIC_ROUTES)
+    def test_build_assets_are_immutable(self, app_connection, route):
+        """Hashed /_next/static assets are cached for a year as immutable"""
+        _, body, _ = fetch(app_connection, route)
+        assets = sorted(set(_ASSET.findall(body.decode("utf-8"))))
+        assert assets, f"No /_next/static assets referenced by {route}"
+
+        for asset in assets:
+            response, _, _ = fetch(app_connection, asset)
+            assert response.status == 200, asset
+            directives = cache_directives(response.getheader("Cache-Control"))
+            assert "immutable" in directives, f"{asset}: {directives}"
+            assert int(directives.get("max-age", 0)) >= 31536000, f"{asset}: {directives}"
+
+    def test_public_assets_are_cacheable(self, app_connection):
+        """Files in public/ are cached by browsers between visits"""
+        for asset in ["/cart.svg", "/trash.svg", "/favicon.ico"]:
+            response, _, _ = fetch(app_connection, asset)
+            assert response.status == 200, asset
+            directives = cache_directives(response.getheader("Cache-Control"))
+            assert int(directives.get("max-age", 0)) > 0, f"{asset}: {directives}"
+
+    @pytest.mark.perf
+    @pytest.mark.parametrize("route", STATIC_ROUTES)
+    def test_cold_and_warm_ttfb(self, app_connection, route, record_property):
+        """Prerendered pages answer quickly once the connection is warm"""
+        # Cold: the first request on a new connection pays for the TCP handshake
+        cold_connection = connect()
+        try:
+            _, _, cold_ms = fetch(cold_connection, route)
+        finally:
+            cold_connection.close()
+
+        warm = [fetch(app_connection, route)[2] for _ in range(WARM_REQUESTS)]
+        warm_ms = statistics.median(warm)
+        record_property("ttfb_ms", {"route": route, "cold": round(cold_ms, 1), "warm_p50": round(warm_ms, 1)})
+        print(f"⏱️ {route}: cold {cold_ms:.1f} ms, warm p50 {warm_ms:.1f} ms")
+
+        assert warm_ms <= STATIC_TTFB_BUDGET_MS, (
+            f"{route} warm TTFB {warm_ms:.1f} ms exceeds {STATIC_TTFB_BUDGET_MS} ms"
+        )
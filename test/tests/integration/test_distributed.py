@@ -0,0 +1,107 @@
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+from tests.constants import TEST_ROOT
+from utils.distributed import WorkQueue, merge_junit, plan_queue, run
+
+NODE_SUITE = '''
+import time
+
+import pytest
+
+
+@pytest.mark.parametrize("index", range(8))
+def test_sleeps(index):
+    time.sleep(0.5)
+
+
+def test_fails():
+    assert False
+'''
+
+
+@pytest.mark.integration
+class TestDistributedQueue:
+    """Work queue planning and merging"""
+
+    def test_longest_tests_go_first(self):
+        """History orders the queue; unknown tests take the median"""
+        history = {"a": [1.0, 1.2], "b": [9.0], "c": [3.0, 5.0]}
+        assert plan_queue(["a", "new", "b", "c"], history) == ["b", "c", "new", "a"]
+
+    def test_dead_node_tests_are_requeued_once(self):
+        """A crashed node's tests go back on the queue, then fail"""
+        queue = WorkQueue()
+        queue.load(["a", "b"], {})
+        assert queue.next("node-0") == "a"
+        assert queue.abandon("node-0") == []
+        assert queue.next("node-1") == "a"
+        assert queue.abandon("node-1") == ["a"]
+        assert queue.next("node-1") == "b"
+
+    def test_fake_stripe_tests_stay_on_one_node(self):
+        """Pinned tests all go to the first node that takes one"""
+        queue = WorkQueue()
+        history = {"s1": [9.0], "a": [8.0], "s2": [7.0], "b": [6.0]}
+        queue.load(["a", "b", "s1", "s2"], history, pinned=["s1", "s2"])
+        assert queue.next("node-1") == "s1"
+        assert queue.next("node-0") == "a"
+        assert queue.next("node-0") == "b"
+        assert queue.next("node-0") is None
+        assert queue.next("node-1") == "s2"
+
+    def test_pinned_tests_move_when_their_node_dies(self):
+        queue = WorkQueue()
+        queue.load(["s1", "s2"], {}, pinned=["s1", "s2"])
+        assert queue.next("node-0") == "s1"
+        assert queue.next("node-1") is None
+        queue.abandon("node-0")
+        assert queue.next("node-1") == "s1"
+        assert queue.next("node-1") == "s2"
+
+    def test_junit_files_merge_into_one_suite(self, tmp_path):
+        """Testcases from every node end up in one testsuite"""
+        for node, body in (("0", "<failure/>"), ("1", "<skipped/>")):
+            (tmp_path / f"{node}.xml").write_text(
+                f'<testsuites><testsuite><testcase name="t{node}">{body}</testcase>'
+                f'<testcase name="ok{node}"/></testsuite></testsuites>'
+            )
+        counts = merge_junit(
+            [tmp_path / "0.xml", tmp_path / "1.xml", tmp_path / "missing.xml"],
+            tmp_path / "junit.xml",
+            1.5,
+        )
+        assert counts == {"tests": 4, "failures": 1, "errors": 0, "skipped": 1}
+        suite = ET.parse(tmp_path / "junit.xml").getroot().find("testsuite")
+        assert suite.get("tests") == "4" and suite.get("time") == "1.500"
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestDistributedRun:
+    """Process nodes share one queue"""
+
+    def test_nodes_split_the_suite_and_merge_results(self, tmp_path, monkeypatch):
+        """Two nodes run nine tests between them and the reports merge"""
+        (tmp_path / "conftest.py").write_text(
+            'pytest_plugins = ["utils.results_db", "utils.distributed"]\n'
+        )
+        (tmp_path / "test_node_suite.py").write_text(NODE_SUITE)
+        monkeypatch.setenv("PYTHONPATH", str(TEST_ROOT))
+
+        exit_code, merged = run(2, ["-p", "no:cacheprovider"], db_path=None, root=tmp_path)
+
+        assert exit_code == 1, "test_fails should fail the run"
+        results = json.loads((merged / "results.json").read_text())["results"]
+        assert len(results) == 9
+        assert {result["node"] for result in results} == {"node-0", "node-1"}
+        failed = [result for result in results if result["outcome"] == "failed"]
+        assert [result["nodeid"] for result in failed] == ["test_node_suite.py::test_fails"]
+        assert "assert False" in failed[0]["longrepr"]
+
+        suite = ET.parse(merged / "junit.xml").getroot().find("testsuite")
+        assert suite.get("tests") == "9"
+        assert suite.get("failures") == "1"
+        # Eight half-second sleeps on two nodes
+        assert float(suite.get("time")) < 4.0 + 3.0
@@ -0,0 +1,148 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from tests.constants import PRODUCTS
+from utils.load_scenario import (
+    LoadScenario,
+    Phase,
+    Slo,
+    format_slo_report,
+    parse_ramp,
+    phase_at,
+    random_cart,
+    slo_report,
+)
+from utils.loadgen import RequestResult
+
+
+@pytest.fixture
+def storefront():
+    """A stand-in app: / is 200, /api/checkout answers with the configured status"""
+    state = {"checkout_status": 200, "checkouts": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self._reply(200, b"<html>shop</html>")
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            with lock:
+                state["checkouts"] += 1
+            self._reply(state["checkout_status"], b"{}")
+
+        def _reply(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", state
+    server.shutdown()
+    server.server_close()
+
+
+def results(*statuses, latency_ms=10.0):
+    return [RequestResult(0.0, latency_ms, status=status) for status in statuses]
+
+
+@pytest.mark.integration
+class TestRamp:
+    """Ramp specs parse into phases laid end to end"""
+
+    def test_parse_ramp(self):
+        phases = parse_ramp("warm-up:30:2:1, spike:10:40")
+        assert phases == [Phase("warm-up", 30, 2, 1), Phase("spike", 10, 40, 0)]
+
+    @pytest.mark.parametrize("spec", ["", "step:60", "step:sixty:10", "step:0:10", "step:5:-1"])
+    def test_invalid_ramps_are_rejected(self, spec):
+        with pytest.raises(ValueError):
+            parse_ramp(spec)
+
+    def test_phase_at(self):
+        phases = parse_ramp("a:10:1,b:5:1")
+        assert phase_at(phases, 0).name == "a"
+        assert phase_at(phases, 10).name == "b"
+        assert phase_at(phases, 99).name == "b"
+
+    def test_random_cart_matches_the_catalog(self):
+        cart = random_cart()
+        assert 1 <= len(cart) <= 3
+        for price_id, item in cart.items():
+            assert item["price"] == PRODUCTS[price_id]["price"]
+
+
+@pytest.mark.integration
+class TestSloReport:
+    """Budget burn counts failures and slow answers, not backpressure"""
+
+    def test_budget_burn(self):
+        slo = Slo(latency_ms=100, latency_target=0.9, availability=0.9)
+        phase = Phase("step", 10, 1)
+        samples = [("step", "page", result) for result in results(*[200] * 8, 500, None)]
+        samples[-1][2].error = "ConnectionRefusedError"
+        samples.append(("step", "page", RequestResult(0.0, 500.0, status=200)))
+        report = slo_report(samples, [phase], {"page": slo})
+
+        stats = report["phases"][0]["kinds"]["page"]
+        assert stats["requests"] == 11 and stats["ok"] == 9 and stats["failed"] == 2
+        assert stats["throughput_per_s"] == 0.9
+        # 2/11 failed against a 10% budget; 1/9 answers slow against a 10% budget
+        assert stats["error_budget_burn"] == pytest.approx(1.82, abs=0.01)
+        assert stats["latency_budget_burn"] == pytest.approx(1.11, abs=0.01)
+        assert not stats["met"] and not report["met"]
+
+    def test_rate_limiting_is_not_an_error(self):
+        samples = [("spike", "checkout", result) for result in results(200, 429, 429)]
+        report = slo_report(samples, [Phase("spike", 1, 3)])
+        stats = report["phases"][0]["kinds"]["checkout"]
+        assert stats["limited"] == 2 and stats["error_budget_burn"] == 0
+        assert report["met"]
+
+    def test_overall_section_spans_all_phases(self):
+        phases = [Phase("a", 1, 1), Phase("b", 3, 1)]
+        samples = [("a", "page", result) for result in results(200, 200)]
+        samples += [("b", "page", result) for result in results(200, 200)]
+        report = slo_report(samples, phases)
+        assert report["overall"]["duration_s"] == 4
+        assert report["overall"]["kinds"]["page"]["throughput_per_s"] == 1.0
+        assert "overall: 4s" in format_slo_report(report)
+
+
+@pytest.mark.integration
+class TestLoadScenario:
+    """HTTP shoppers follow the ramp against a local app"""
+
+    def test_http_shoppers_follow_the_ramp(self, storefront):
+        url, state = storefront
+        scenario = LoadScenario(
+            parse_ramp("warm-up:0.5:10,spike:0.5:40"), url,
+            checkout_ratio=1.0, think_time_s=(0, 0), seed=1,
+        )
+        report = scenario.run()
+
+        by_phase = {phase["name"]: phase["kinds"] for phase in report["phases"]}
+        assert by_phase["warm-up"]["page"]["requests"] == 5
+        assert by_phase["spike"]["page"]["requests"] == 20
+        assert by_phase["spike"]["checkout"]["requests"] == 20
+        assert state["checkouts"] == 25
+        assert report["met"], format_slo_report(report)
+
+    def test_server_errors_burn_the_budget(self, storefront):
+        url, state = storefront
+        state["checkout_status"] = 500
+        scenario = LoadScenario(
+            parse_ramp("step:0.5:10"), url, checkout_ratio=1.0, think_time_s=(0, 0)
+        )
+        report = scenario.run()
+
+        checkout = report["phases"][0]["kinds"]["checkout"]
+        assert checkout["failed"] == 5 and checkout["error_budget_burn"] == 100
+        assert report["phases"][0]["kinds"]["page"]["met"]
+        assert not report["met"]
@@ -0,0 +1,34 @@
+import pytest
+from utils.matrix import build_grid, split_engine
+
+
+@pytest.mark.integration
+class TestCrossBrowserMatrix:
+    """Grouping distributed results by engine"""
+
+    @pytest.mark.parametrize(
+        "nodeid, expected",
+        [
+            ("tests/ui/t.py::TestCart::test_add[webkit]", ("tests/ui/t.py::TestCart::test_add", "webkit")),
+            ("t.py::test_qty[chromium-3]", ("t.py::test_qty[3]", "chromium")),
+            ("t.py::test_qty[3-firefox]", ("t.py::test_qty[3]", "firefox")),
+            ("t.py::test_plain", ("t.py::test_plain", None)),
+        ],
+    )
+    def test_engine_is_split_from_the_test_id(self, nodeid, expected):
+        """pytest-playwright's browser parameter comes off the test ID"""
+        assert split_engine(nodeid) == expected
+
+    def test_grid_has_one_row_per_test(self):
+        """Each test gets a cell per engine and each engine a total"""
+        results = [
+            {"nodeid": "t.py::test_a[chromium]", "outcome": "passed", "duration_s": 1.0},
+            {"nodeid": "t.py::test_a[webkit]", "outcome": "failed", "duration_s": 3.0},
+            {"nodeid": "t.py::test_b[webkit]", "outcome": "error", "duration_s": 0.5},
+            {"nodeid": "t.py::test_b[firefox]", "outcome": "skipped", "duration_s": 0.0},
+        ]
+        grid, totals = build_grid(results)
+        assert sorted(grid) == ["t.py::test_a", "t.py::test_b"]
+        assert set(grid["t.py::test_a"]) == {"chromium", "webkit"}
+        assert totals["webkit"] == {"passed": 0, "failed": 2, "skipped": 0, "duration_s": 3.5}
+        assert totals["firefox"]["skipped"] == 1
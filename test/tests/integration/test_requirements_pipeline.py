@@ -0,0 +1,111 @@
+import pytest
+from utils.requirements_pipeline import RequirementsPipeline, draft_test_cases, split_sections
+
+REQUIREMENTS = """# Requirements
+
+## 1.3 Business Rules
+
+### 1.3.2 Shopping Cart Rules
+
+- **Maximum Items:** 20 items per cart maximum <!-- req: CART-LIMIT -->
+- **Quantity Limits:** 1-99 per product line item
+
+```python
+# not a heading
+```
+
+### 1.3.3 Payment Processing
+
+- **Geographic Restriction:** Japan billing addresses only
+
+#### UC-003: Secure Checkout
+
+1. Customer clicks checkout
+"""
+
+CART_TESTS = '''
+class TestCart:
+    def test_cart_quantity_limits(self, page):
+        """Quantities stay within the line item limits"""
+
+    def test_unrelated_title(self, page):
+        """Covers UC-003 explicitly"""
+'''
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    documents = tmp_path / "documents"
+    documents.mkdir()
+    (documents / "REQUIREMENTS.md").write_text(REQUIREMENTS)
+    tests = tmp_path / "test" / "tests"
+    tests.mkdir(parents=True)
+    (tests / "test_cart.py").write_text(CART_TESTS)
+    drafted = []
+
+    def draft(section):
+        drafted.append(section.title)
+        return draft_test_cases(section)
+
+    pipeline = RequirementsPipeline(
+        documents, ["REQUIREMENTS.md"], tests, tmp_path / "index.json", draft
+    )
+    return pipeline, documents / "REQUIREMENTS.md", tests, drafted
+
+
+@pytest.mark.integration
+class TestRequirementsPipeline:
+    """Sectioning, linking and incremental reruns"""
+
+    def test_sections_split_at_headings_outside_code(self):
+        titles = [section.title for section in split_sections(REQUIREMENTS, "R.md")]
+        assert titles == [
+            "Requirements",
+            "1.3 Business Rules",
+            "1.3.2 Shopping Cart Rules",
+            "1.3.3 Payment Processing",
+            "UC-003: Secure Checkout",
+        ]
+
+    def test_index_links_ids_cases_and_tests(self, workspace):
+        pipeline, _, _, _ = workspace
+        assert pipeline.run()["drafted"] == 5
+
+        (cart_rules,) = pipeline.sections_for("CART-LIMIT").values()
+        assert cart_rules["requirement_ids"] == ["1.3.2", "CART-LIMIT"]
+        assert [case["id"] for case in cart_rules["test_cases"]] == ["1.3.2-TC01", "1.3.2-TC02"]
+        assert cart_rules["tests"] == ["tests/test_cart.py::TestCart::test_cart_quantity_limits"]
+
+        (checkout,) = pipeline.sections_for("UC-003").values()
+        assert checkout["tests"] == ["tests/test_cart.py::TestCart::test_unrelated_title"]
+
+    def test_rerun_only_redoes_changed_sections(self, workspace):
+        pipeline, requirements, _, drafted = workspace
+        pipeline.run()
+        drafted.clear()
+        assert pipeline.run()["unchanged"] == 5 and drafted == []
+
+        requirements.write_text(
+            requirements.read_text().replace("Japan billing", "Japanese billing")
+        )
+        stats = pipeline.run()
+        assert drafted == ["1.3.3 Payment Processing"]
+        assert stats["drafted"] == 1 and stats["unchanged"] == 4
+
+    def test_changed_test_files_are_relinked_without_redrafting(self, workspace):
+        pipeline, _, tests, drafted = workspace
+        pipeline.run()
+        drafted.clear()
+        (tests / "test_payment.py").write_text(
+            "def test_geographic_restriction(page):\n    pass\n"
+        )
+        stats = pipeline.run()
+        assert drafted == [] and stats["relinked"] == 5
+
+        (payment,) = pipeline.sections_for("1.3.3").values()
+        assert payment["tests"] == ["tests/test_payment.py::test_geographic_restriction"]
+
+        (tests / "test_payment.py").unlink()
+        pipeline.run()
+        (payment,) = pipeline.sections_for("1.3.3").values()
+        assert payment["tests"] == []
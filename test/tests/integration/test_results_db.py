@@ -0,0 +1,126 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from utils.results_db import ResultsDB, ResultsRecorder, flatten_metrics
+
+DAY = 24 * 60 * 60
+
+
+def report(nodeid, when, duration, outcome="passed", user_properties=()):
+    return SimpleNamespace(
+        nodeid=nodeid,
+        when=when,
+        duration=duration,
+        passed=outcome == "passed",
+        failed=outcome == "failed",
+        skipped=outcome == "skipped",
+        user_properties=list(user_properties),
+    )
+
+
+def record_test(recorder, nodeid, call_duration, outcome="passed", user_properties=()):
+    recorder.pytest_runtest_logreport(report(nodeid, "setup", 0.01))
+    recorder.pytest_runtest_logreport(
+        report(nodeid, "call", call_duration, outcome, user_properties)
+    )
+    recorder.pytest_runtest_logreport(report(nodeid, "teardown", 0.01))
+
+
+@pytest.fixture
+def results_db(tmp_path):
+    db = ResultsDB(tmp_path / "results.sqlite3")
+    yield db
+    db.close()
+
+
+def seed_runs(db, durations_by_run, started_at=None):
+    """One run per entry of {nodeid: call duration}, oldest first"""
+    started_at = started_at or time.time() - len(durations_by_run) * 60
+    for index, durations in enumerate(durations_by_run):
+        run_id = f"run-{index:03d}"
+        db.start_run(run_id, started_at=started_at + index * 60)
+        recorder = ResultsRecorder(db, run_id)
+        for nodeid, duration in durations.items():
+            record_test(recorder, nodeid, duration)
+        db.finish_run(run_id, 0)
+
+
+@pytest.mark.integration
+class TestResultsDB:
+    """Results history plugin and queries"""
+
+    def test_records_one_row_per_test_with_metrics(self, results_db):
+        """Setup, call and teardown collapse into one row with its metrics"""
+        results_db.start_run("run-1")
+        recorder = ResultsRecorder(results_db, "run-1")
+        record_test(
+            recorder,
+            "tests/ui/test_a.py::test_checkout",
+            1.5,
+            "failed",
+            [
+                ("time_to_loading_ms", 42.0),
+                ("journey_steps", [{"step": "Open cart", "duration_ms": 310.0}]),
+                ("label", "not a number"),
+            ],
+        )
+
+        (row,) = results_db.connection.execute("SELECT * FROM results").fetchall()
+        assert row["outcome"] == "failed"
+        assert row["duration_s"] == pytest.approx(1.52)
+        metrics = dict(
+            results_db.connection.execute("SELECT name, value FROM metrics").fetchall()
+        )
+        assert metrics == {"time_to_loading_ms": 42.0, "journey.Open cart": 310.0}
+
+    def test_flatten_metrics_nested_dicts(self):
+        """Nested numeric properties are stored under dotted names"""
+        assert dict(flatten_metrics("ttfb_ms", {"route": "/", "cold": 12.0, "warm_p50": 3})) == {
+            "ttfb_ms.cold": 12.0,
+            "ttfb_ms.warm_p50": 3.0,
+        }
+
+    def test_slowest_over_recent_runs(self, results_db):
+        """Slowest tests are ranked by mean duration"""
+        seed_runs(results_db, [{"fast": 0.1, "slow": 2.0}, {"fast": 0.2, "slow": 3.0}])
+
+        rows = results_db.slowest(runs=50, limit=1)
+
+        assert [row["nodeid"] for row in rows] == ["slow"]
+        assert rows[0]["mean_s"] == pytest.approx(2.52)
+
+    def test_regressions_compare_recent_with_baseline(self, results_db):
+        """Tests more than 30% slower than their baseline are reported"""
+        baseline = [{"steady": 1.0, "regressed": 1.0}] * 10
+        recent = [{"steady": 1.1, "regressed": 2.0}] * 3
+        seed_runs(results_db, baseline + recent)
+
+        rows = results_db.regressions(threshold=0.3, recent_runs=3, baseline_runs=10)
+
+        assert [row["nodeid"] for row in rows] == ["regressed"]
+
+    def test_p95_of_span_action_by_day(self, results_db):
+        """Span percentiles are grouped per day"""
+        results_db.start_run("run-1")
+        now = time.time()
+        events = [
+            {"type": "span", "action": "EcommercePage.open_cart_panel", "duration_ms": float(ms), "ts": ts}
+            for ms, ts in [(100, now - DAY), (300, now - DAY), (50, now), (70, now)]
+        ] + [{"type": "span", "action": "test", "duration_ms": 999.0, "ts": now}]
+        results_db.add_spans("run-1", events)
+
+        rows = results_db.p95_by_period(action="open_cart_panel", by="day")
+
+        assert [row["p95"] for row in rows] == [300.0, 70.0]
+        assert sum(row["count"] for row in rows) == 4
+
+    def test_flaky_tests(self, results_db):
+        """Tests with mixed outcomes are listed as flaky"""
+        for index, outcome in enumerate(["passed", "failed", "passed"]):
+            results_db.start_run(f"run-{index}")
+            recorder = ResultsRecorder(results_db, f"run-{index}")
+            record_test(recorder, "flaky", 1.0, outcome)
+            record_test(recorder, "stable", 1.0)
+
+        assert [row["nodeid"] for row in results_db.flaky()] == ["flaky"]
@@ -0,0 +1,145 @@
+import logging
+import time
+
+import pytest
+from utils import telemetry
+
+
+class Shop:
+    """A page object whose actions call each other, like EcommercePage"""
+
+    @telemetry.action()
+    def navigate(self):
+        time.sleep(0.05)
+
+    @telemetry.action()
+    def navigate_to_app(self):
+        self.navigate()
+        time.sleep(0.01)
+
+    @telemetry.action()
+    def fail(self):
+        raise RuntimeError("boom")
+
+
+def span_event(action, duration_ms, self_ms=None, outcome="ok", parent=None):
+    event = {
+        "type": "span",
+        "action": action,
+        "duration_ms": duration_ms,
+        "outcome": outcome,
+        "parent": parent,
+    }
+    if self_ms is not None:
+        event["self_ms"] = self_ms
+    return event
+
+
+@pytest.fixture
+def events_dir(tmp_path, monkeypatch):
+    """Telemetry written to tmp_path under a fixed run id"""
+    monkeypatch.setattr(telemetry, "LOGS_DIR", tmp_path)
+    monkeypatch.setenv(telemetry.RUN_ID_ENV, "20260101-000000")
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw0")
+    yield tmp_path
+    telemetry.close()
+
+
+@pytest.mark.integration
+class TestTelemetrySpans:
+    """Spans written by the action decorator and read back per run"""
+
+    def test_nested_actions_record_parent_and_self_time(self, events_dir):
+        Shop().navigate_to_app()
+        telemetry.close()
+
+        spans = {event["action"]: event for event in telemetry.load_events(directory=events_dir)}
+        inner, outer = spans["Shop.navigate"], spans["Shop.navigate_to_app"]
+        assert inner["parent"] == "Shop.navigate_to_app" and outer["parent"] is None
+        assert inner["self_ms"] == inner["duration_ms"]
+        assert outer["self_ms"] == pytest.approx(outer["duration_ms"] - inner["duration_ms"], abs=0.01)
+        assert outer["self_ms"] < inner["self_ms"]
+        assert {event["run"] for event in spans.values()} == {"20260101-000000"}
+        assert {event["worker"] for event in spans.values()} == {"gw0"}
+
+    def test_failed_action_records_its_error(self, events_dir):
+        with pytest.raises(RuntimeError):
+            Shop().fail()
+        telemetry.close()
+
+        (event,) = telemetry.load_events(directory=events_dir)
+        assert event["outcome"] == "error:RuntimeError"
+
+    def test_log_events_name_their_span(self, events_dir):
+        logger = logging.getLogger("telemetry_probe")
+        handler = telemetry.JsonLinesHandler()
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            with telemetry.span("checkout"):
+                logger.warning("inside")
+            logger.warning("outside")
+        finally:
+            logger.removeHandler(handler)
+            logger.propagate = True
+        telemetry.close()
+
+        logs = [event for event in telemetry.load_events(directory=events_dir) if event["type"] == "log"]
+        assert [(event["message"], event["span"]) for event in logs] == [
+            ("inside", "checkout"),
+            ("outside", None),
+        ]
+
+    def test_load_events_defaults_to_the_latest_run(self, tmp_path):
+        for run, worker, action in [
+            ("20260101-000000", "gw0", "old"),
+            ("20260102-000000", "gw0", "a"),
+            ("20260102-000000", "gw1", "b"),
+        ]:
+            (tmp_path / f"events-{run}-{worker}.jsonl").write_text(
+                f'{{"type": "span", "action": "{action}"}}\n\n'
+            )
+        latest = telemetry.load_events(directory=tmp_path)
+        assert sorted(event["action"] for event in latest) == ["a", "b"]
+        assert [event["action"] for event in telemetry.load_events("20260101-000000", tmp_path)] == ["old"]
+        assert telemetry.load_events(directory=tmp_path / "missing") == []
+
+
+@pytest.mark.integration
+class TestTelemetrySummary:
+    """Action ranking by self time"""
+
+    def test_nested_time_is_counted_once(self):
+        """navigate_to_app spends most of its time in navigate, which ranks first"""
+        events = [
+            span_event("navigate_to_app", 1000.0, self_ms=100.0),
+            span_event("navigate", 900.0, self_ms=900.0, parent="navigate_to_app"),
+            span_event("add_to_cart", 300.0, self_ms=300.0),
+        ]
+        rows = telemetry.summarize(events)
+        assert [row["action"] for row in rows] == ["navigate", "add_to_cart", "navigate_to_app"]
+        assert sum(row["self_ms"] for row in rows) == 1300.0
+        assert rows[2]["total_ms"] == 1000.0
+
+    def test_statistics_and_errors(self):
+        events = [span_event("click", float(ms), self_ms=float(ms)) for ms in range(1, 21)]
+        events.append(span_event("click", 50.0, self_ms=50.0, outcome="error:TimeoutError"))
+        events.append(span_event("test", 5000.0))
+        events.append({"type": "log", "message": "ignored"})
+
+        (row,) = telemetry.summarize(events)
+        assert row["count"] == 21 and row["errors"] == 1
+        assert row["max_ms"] == 50.0 and row["p95_ms"] == 20.0
+        assert row["mean_ms"] == pytest.approx(12.4, abs=0.1)
+
+    def test_spans_without_self_time_count_their_duration(self):
+        rows = telemetry.summarize([span_event("legacy", 40.0), span_event("new", 30.0, self_ms=30.0)])
+        assert [(row["action"], row["self_ms"]) for row in rows] == [("legacy", 40.0), ("new", 30.0)]
+
+    def test_limit_and_format(self):
+        events = [span_event(f"action_{index}", float(index), self_ms=float(index)) for index in range(5)]
+        rows = telemetry.summarize(events, limit=2)
+        assert [row["action"] for row in rows] == ["action_4", "action_3"]
+        text = telemetry.format_summary(rows)
+        assert "self ms" in text.splitlines()[0]
+        assert text.splitlines()[2].startswith("action_4")
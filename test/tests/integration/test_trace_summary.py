@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+
+import pytest
+from utils.trace_capture import trace_reason
+from utils.tracing import format_trace_summary, function_self_times, summarize_trace
+
+PID, MAIN, WORKER = 1, 10, 20
+
+
+def complete(name, ts_ms, dur_ms, tid=MAIN):
+    return {"name": name, "ph": "X", "pid": PID, "tid": tid, "ts": ts_ms * 1000, "dur": dur_ms * 1000}
+
+
+def profile_chunk(nodes, samples, deltas_ms):
+    return {
+        "name": "ProfileChunk",
+        "ph": "P",
+        "id": "0x1",
+        "pid": PID,
+        "tid": MAIN,
+        "ts": 0,
+        "args": {
+            "data": {
+                "cpuProfile": {"nodes": nodes, "samples": samples},
+                "timeDeltas": [ms * 1000 for ms in deltas_ms],
+            }
+        },
+    }
+
+
+def node(node_id, function, url="", line=-1):
+    return {
+        "id": node_id,
+        "callFrame": {"functionName": function, "url": url, "lineNumber": line},
+    }
+
+
+@pytest.fixture
+def trace():
+    """One long task where script forces a layout, one short task, and a worker"""
+    return [
+        {"name": "thread_name", "ph": "M", "pid": PID, "tid": MAIN, "args": {"name": "CrRendererMain"}},
+        {"name": "thread_name", "ph": "M", "pid": PID, "tid": WORKER, "args": {"name": "DedicatedWorker thread"}},
+        complete("RunTask", 1000, 120),
+        complete("FunctionCall", 1005, 80),
+        complete("Layout", 1050, 20),
+        complete("UpdateLayoutTree", 1090, 10),
+        complete("RunTask", 1200, 10),
+        {"name": "ParseHTML", "ph": "B", "pid": PID, "tid": MAIN, "ts": 1201_000},
+        {"name": "ParseHTML", "ph": "E", "pid": PID, "tid": MAIN, "ts": 1205_000},
+        complete("FunctionCall", 1000, 500, tid=WORKER),
+    ]
+
+
+@pytest.mark.integration
+class TestTraceSummary:
+    """Main-thread costs, long tasks and profiler self times from raw trace events"""
+
+    def test_self_time_per_category(self, trace):
+        summary = summarize_trace(trace)
+        # FunctionCall 80 ms minus the 20 ms layout it forced; the worker isn't counted
+        assert summary["main_thread_ms"]["scripting"] == 60.0
+        assert summary["main_thread_ms"]["layout"] == 20.0
+        assert summary["main_thread_ms"]["style"] == 10.0
+        assert summary["main_thread_ms"]["parse_html"] == 4.0
+        assert summary["main_thread_ms"]["other"] == 36.0
+        assert summary["duration_ms"] == 210.0
+
+    def test_forced_style_and_layout(self, trace):
+        style_layout = summarize_trace(trace)["style_layout"]
+        assert style_layout["layout"] == {"count": 1, "forced": 1, "ms": 20.0}
+        assert style_layout["style"] == {"count": 1, "forced": 0, "ms": 10.0}
+
+    def test_long_tasks(self, trace):
+        tasks = summarize_trace(trace)["long_tasks"]
+        assert tasks["count"] == 1
+        assert tasks["total_ms"] == 120.0 and tasks["blocking_ms"] == 70.0
+        longest = tasks["longest"][0]
+        assert longest["start_ms"] == 0.0 and longest["duration_ms"] == 120.0
+        assert list(longest["breakdown"]) == ["scripting", "other", "layout", "style"]
+
+    def test_function_self_times_from_profile_chunks(self):
+        nodes = [
+            node(1, "(root)"),
+            node(2, "renderWithHooks", "https://shop.test/_next/static/chunks/framework.js", 41),
+            node(3, "(idle)"),
+            node(4, "(garbage collector)"),
+        ]
+        # Chunks arrive in order; node lists and samples continue across them
+        events = [
+            profile_chunk(nodes[:2], [2, 2, 3], [0, 5, 5]),
+            profile_chunk(nodes[2:], [4, 2], [1, 2]),
+        ]
+        times = function_self_times(events)
+        assert times == {
+            ("renderWithHooks", "https://shop.test/_next/static/chunks/framework.js", 42): 10.0,
+            ("(garbage collector)", "", 0): 2.0,
+        }
+
+    def test_format(self, trace):
+        trace.append(profile_chunk([node(1, "renderWithHooks", "https://shop.test/a.js", 9)], [1, 1], [0, 3]))
+        text = format_trace_summary(summarize_trace(trace))
+        assert "scripting 60 ms" in text
+        assert "layouts: 1 (1 forced) 20 ms" in text
+        assert "Long tasks: 1, 120 ms total, 70 ms blocking" in text
+        assert "renderWithHooks  a.js:10" in text
+
+    def test_empty_trace(self):
+        summary = summarize_trace([])
+        assert summary["long_tasks"]["count"] == 0 and summary["top_functions"] == []
+        assert "idle" in format_trace_summary(summary)
+
+
+@pytest.mark.integration
+class TestTraceReason:
+    """Only slow-marked and over-budget tests are traced"""
+
+    def item(self, slow=False):
+        marker = pytest.mark.slow.mark if slow else None
+        return SimpleNamespace(get_closest_marker=lambda name: marker)
+
+    def test_slow_marker(self):
+        assert trace_reason(self.item(slow=True), None, 15) == "marked slow"
+
+    def test_over_budget_median(self):
+        assert trace_reason(self.item(), [10, 20, 30], 15) == "median 20.0s over the 15s budget"
+
+    def test_within_budget_or_no_history(self):
+        assert trace_reason(self.item(), [10, 12, 40], 15) is None
+        assert trace_reason(self.item(), None, 15) is None
@@ -0,0 +1,112 @@
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+from utils.requirements_pipeline import RequirementsPipeline
+from utils.traceability import (
+    candidate_ranking,
+    changed_requirements,
+    coverage_report,
+    requirement_catalog,
+)
+
+REQUIREMENTS = """# Requirements
+
+### 1.3.2 Shopping Cart Rules
+
+- **Maximum Items:** 20 items per cart maximum <!-- req: CART-LIMIT -->
+- **Minimum Order:** ¥30 minimum purchase requirement <!-- req: MIN-ORDER -->
+
+#### UC-003: Secure Checkout
+
+1. Customer clicks checkout
+"""
+
+
+def item(nodeid, *ids):
+    markers = [SimpleNamespace(args=ids)] if ids else []
+    return SimpleNamespace(nodeid=nodeid, iter_markers=lambda name: iter(markers))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A git repo with documents/REQUIREMENTS.md committed"""
+    documents = tmp_path / "documents"
+    documents.mkdir()
+    (documents / "REQUIREMENTS.md").write_text(REQUIREMENTS)
+    (tmp_path / "tests").mkdir()
+    for command in (["init", "-q"], ["add", "."], ["commit", "-q", "-m", "requirements"]):
+        subprocess.run(
+            ["git", "-c", "user.name=t", "-c", "user.email=t@example.com", *command],
+            cwd=tmp_path,
+            check=True,
+        )
+    return tmp_path
+
+
+def catalog_for(repo):
+    pipeline = RequirementsPipeline(
+        repo / "documents", ["REQUIREMENTS.md"], repo / "tests", repo / "index.json"
+    )
+    pipeline.run()
+    return requirement_catalog(pipeline.load_index())
+
+
+@pytest.mark.integration
+class TestTraceability:
+    """Coverage gaps and impact selection from req markers"""
+
+    def test_gap_report(self, repo):
+        catalog = catalog_for(repo)
+        assert sorted(catalog) == ["1.3.2", "CART-LIMIT", "MIN-ORDER", "UC-003"]
+
+        report = coverage_report(catalog, [
+            item("t.py::test_limit", "CART-LIMIT", "1.3.2"),
+            item("t.py::test_typo", "CART-LIMT"),
+            item("t.py::test_unmarked"),
+        ])
+        assert report["traceable"] == ["CART-LIMIT", "MIN-ORDER", "UC-003"]
+        assert report["covered"] == {
+            "CART-LIMIT": ["t.py::test_limit"],
+            "1.3.2": ["t.py::test_limit"],
+        }
+        assert sorted(report["gaps"]) == ["MIN-ORDER", "UC-003"]
+        assert report["unknown"] == {"CART-LIMT": ["t.py::test_typo"]}
+
+    def test_candidates_come_from_the_requirement_line(self, repo):
+        """Each bullet suggests the tests that match its own text, not its section's"""
+        (repo / "tests" / "test_cart_rules.py").write_text(
+            "def test_cart_item_maximum(page):\n"
+            '    """A 21st item is refused once the cart holds its maximum"""\n'
+            "\n\n"
+            "def test_minimum_purchase_order(page):\n"
+            '    """An order under the minimum purchase is refused"""\n'
+        )
+        catalog = catalog_for(repo)
+        limit = "tests/test_cart_rules.py::test_cart_item_maximum"
+        minimum = "tests/test_cart_rules.py::test_minimum_purchase_order"
+        assert catalog["1.3.2"]["suggested"] == [limit, minimum]
+        assert catalog["CART-LIMIT"]["suggested"] == [limit]
+        assert catalog["MIN-ORDER"]["suggested"] == [minimum]
+
+    def test_candidates_sharing_rare_words_rank_first(self):
+        tests = [
+            {"nodeid": "a", "keywords": ["cart", "session"]},
+            {"nodeid": "b", "keywords": ["cart", "persistence"]},
+            {"nodeid": "c", "keywords": ["cart", "session"]},
+        ]
+        rank = candidate_ranking(tests)
+        assert rank(["a", "b", "c"], ["cart", "persistence", "session"]) == ["b", "a", "c"]
+
+    def test_changed_requirements_since_ref(self, repo):
+        path = repo / "documents" / "REQUIREMENTS.md"
+        assert changed_requirements(catalog_for(repo), "HEAD", repo / "documents") == set()
+
+        path.write_text(path.read_text().replace("¥30 minimum", "¥50 minimum"))
+        changed = changed_requirements(catalog_for(repo), "HEAD", repo / "documents")
+        # The edited line and the section that contains it
+        assert changed == {"MIN-ORDER", "1.3.2"}
+
+    def test_unknown_ref_is_a_usage_error(self, repo):
+        with pytest.raises(pytest.UsageError):
+            changed_requirements(catalog_for(repo), "no-such-ref", repo / "documents")
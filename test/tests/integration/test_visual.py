@@ -0,0 +1,101 @@
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from utils.visual import Region, VisualBaselines, dhash, hamming, read_baseline_hash  # noqa: E402
+
+
+def png(pixels):
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def grid_image():
+    """Four coloured cards on white, like the product grid"""
+    pixels = np.full((200, 400, 3), 255, dtype=np.uint8)
+    for index, colour in enumerate([(200, 30, 30), (30, 200, 30), (30, 30, 200), (200, 200, 30)]):
+        pixels[40:160, 20 + index * 95:100 + index * 95] = colour
+    return pixels
+
+
+@pytest.fixture
+def baselines(tmp_path):
+    return VisualBaselines(tmp_path / "baselines", tmp_path / "diffs")
+
+
+@pytest.fixture
+def recorded(baselines, grid_image):
+    """baselines with grid_image recorded as the "grid" baseline"""
+    VisualBaselines(baselines.directory, baselines.diff_dir, update=True).check(
+        "grid", png(grid_image)
+    )
+    return baselines
+
+
+CARDS = [Region(f"card[{index}]", 20 + index * 95, 40, 80, 120) for index in range(4)]
+
+
+@pytest.mark.integration
+class TestVisualComparison:
+    """Perceptual hash and pixel diff comparisons"""
+
+    def test_missing_baseline_fails(self, baselines, grid_image):
+        """Without a recorded baseline nothing is compared, so the check fails"""
+        result = baselines.check("grid", png(grid_image))
+        assert result.status == "missing" and not result.ok
+        assert "--update-visual-baselines" in result.reason
+        assert not baselines.path("grid").exists()
+
+    def test_update_creates_the_baseline(self, tmp_path, grid_image):
+        """A recorded baseline carries its hash in the PNG metadata"""
+        baselines = VisualBaselines(tmp_path, update=True)
+        result = baselines.check("grid", png(grid_image))
+        assert result.status == "created" and result.ok
+        stored_hash, size = read_baseline_hash(baselines.path("grid"))
+        assert stored_hash == dhash(grid_image) and size == (400, 200)
+
+    def test_identical_screenshot_matches_without_diff_image(self, recorded, grid_image):
+        result = recorded.check("grid", png(grid_image), CARDS)
+        assert result.status == "match" and result.diff_ratio == 0.0
+        assert not recorded.diff_dir.exists()
+
+    def test_small_change_is_pinned_to_its_region(self, recorded, grid_image):
+        """A recoloured patch in one card fails and names that card"""
+        changed = grid_image.copy()
+        changed[60:80, 220:240] = (0, 0, 0)
+
+        result = recorded.check("grid", png(changed), CARDS)
+        assert result.status == "mismatch"
+        assert list(result.changed_regions) == ["card[2]"]
+        assert (recorded.diff_dir / "grid-diff.png").exists()
+
+    def test_layout_change_fails_on_hash_alone(self, recorded, grid_image):
+        """A very different image fails before any pixel diff"""
+        flipped = np.ascontiguousarray(grid_image[::-1, ::-1])
+        assert hamming(dhash(flipped), dhash(grid_image)) > 10
+
+        result = recorded.check("grid", png(flipped), CARDS)
+        assert result.status == "mismatch" and "hash distance" in result.reason
+        assert result.changed_regions == {}
+
+    def test_size_change_fails(self, recorded, grid_image):
+        result = recorded.check("grid", png(grid_image[:, :300]))
+        assert result.status == "mismatch" and "size" in result.reason
+
+    def test_anti_aliasing_noise_is_tolerated(self, recorded, grid_image):
+        """Channel differences under the tolerance are not changes"""
+        noisy = (grid_image.astype(np.int16) - 5).clip(0, 255).astype(np.uint8)
+        assert recorded.check("grid", png(noisy), CARDS).ok
+
+    def test_update_overwrites_the_baseline(self, tmp_path, grid_image):
+        VisualBaselines(tmp_path, update=True).check("grid", png(grid_image))
+        changed = grid_image.copy()
+        changed[0:10] = 0
+        result = VisualBaselines(tmp_path, update=True).check("grid", png(changed))
+        assert result.status == "updated"
+        assert VisualBaselines(tmp_path).check("grid", png(changed)).status == "match"
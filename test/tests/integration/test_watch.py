@@ -0,0 +1,70 @@
+import pytest
+from utils import telemetry
+from utils.watch import affected_tests, import_graph, new_run_id
+
+
+@pytest.fixture
+def project(tmp_path):
+    """A miniature test/ and app/ tree"""
+    test_root, app_root = tmp_path / "test", tmp_path / "app"
+    files = {
+        "pages/main.py": "from models.basic_page import BasePage\n",
+        "models/basic_page.py": "",
+        "utils/cart_model.py": "",
+        "utils/fake_stripe.py": "",
+        "tests/conftest.py": 'pytest_plugins = ["utils.telemetry"]\nfrom utils.fake_stripe import FakeStripeServer\n',
+        "tests/constants.py": "",
+        "tests/ui/conftest.py": "from pages.main import EcommercePage\n",
+        "tests/ui/test_cart.py": "import pytest\n",
+        "tests/ui/test_state.py": "from utils.cart_model import CartModel\n",
+        "tests/api/test_checkout.py": "from tests.constants import API_BASE_URL\n",
+    }
+    for name, source in files.items():
+        path = test_root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+    (app_root / "components").mkdir(parents=True)
+    return test_root, app_root
+
+
+@pytest.mark.integration
+class TestWatchAffectedTests:
+    """Changed files map to the tests that can observe them"""
+
+    def affected(self, project, *names):
+        test_root, app_root = project
+        changed = [
+            (app_root / name[len("app/"):]) if name.startswith("app/") else test_root / name
+            for name in names
+        ]
+        return affected_tests(changed, test_root, app_root, import_graph(test_root))
+
+    def test_changed_test_file_reruns_itself(self, project):
+        assert self.affected(project, "tests/ui/test_cart.py") == ["tests/ui/test_cart.py"]
+
+    def test_helper_change_reruns_importing_tests(self, project):
+        assert self.affected(project, "utils/cart_model.py") == ["tests/ui/test_state.py"]
+
+    def test_page_object_change_reaches_tests_through_conftest(self, project):
+        """models -> pages -> tests/ui/conftest.py -> every UI test"""
+        assert self.affected(project, "models/basic_page.py") == ["tests/ui"]
+
+    def test_root_conftest_dependencies_rerun_everything(self, project):
+        assert self.affected(project, "utils/fake_stripe.py") == ["tests"]
+
+    def test_app_changes_map_to_suites(self, project):
+        assert self.affected(project, "app/components/CartItem.js") == ["tests/ui"]
+        assert self.affected(project, "app/pages/api/checkout.js") == ["tests/api"]
+        assert self.affected(project, "app/test/api/checkout.test.js") == []
+
+
+@pytest.mark.integration
+class TestWatchRuns:
+    """Each in-process rerun is its own telemetry run"""
+
+    def test_reruns_get_new_run_ids(self, monkeypatch):
+        monkeypatch.setenv(telemetry.RUN_ID_ENV, "20260101-000000")
+        first = new_run_id("20260101-000000")
+        second = new_run_id(first)
+        assert len({"20260101-000000", first, second}) == 3
+        assert telemetry.run_id() == second
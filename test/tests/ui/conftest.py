@@ -1,9 +1,91 @@
+import random
+
 import pytest
 from pages.main import EcommercePage
 from playwright.sync_api import Page
+from tests.constants import LOCAL_APP_URL
+from utils.accessibility import AccessibilityAuditor
+from utils.checkout_faults import CheckoutFaultInjector
+from utils.checkout_interceptor import CheckoutInterceptor
+from utils.load_scenario import DEFAULT_RAMP, parse_ramp
 
 
 @pytest.fixture
 def ecommerce_page(page: Page):
     """Create an EcommercePage instance without auto-navigation"""
     return EcommercePage(page)
+
+
+@pytest.fixture
+def checkout_interceptor(page: Page):
+    """Capture /api/checkout and stripe.redirectToCheckout without leaving the app"""
+    return CheckoutInterceptor(page)
+
+
+@pytest.fixture
+def checkout_faults(page: Page):
+    """Inject latency and failures into /api/checkout responses"""
+    return CheckoutFaultInjector(page)
+
+
+@pytest.fixture
+def soak_settings(request):
+    """Soak-test settings from the command line; skips unless --soak is given"""
+    config = request.config
+    if not config.getoption("--soak"):
+        pytest.skip("soak tests only run with --soak")
+    return {
+        "cycles": config.getoption("--soak-cycles"),
+        "sample_every": max(1, config.getoption("--soak-sample-every")),
+        "heap_threshold": config.getoption("--soak-heap-threshold-mb") * 1024 * 1024,
+        "dom_threshold": config.getoption("--soak-dom-threshold"),
+    }
+
+
+@pytest.fixture
+def load_scenario_settings(request):
+    """Load scenario settings from the command line; skips unless --load-scenario is given"""
+    config = request.config
+    if not config.getoption("--load-scenario"):
+        pytest.skip("load scenarios only run with --load-scenario")
+    try:
+        phases = parse_ramp(config.getoption("--load-ramp") or DEFAULT_RAMP)
+    except ValueError as error:
+        raise pytest.UsageError(f"--load-ramp: {error}") from None
+    return {
+        "phases": phases,
+        "target": config.getoption("--load-target") or LOCAL_APP_URL,
+        "checkout_ratio": config.getoption("--load-checkout-ratio"),
+    }
+
+
+@pytest.fixture
+def visual(page: Page, browser_name, request):
+    """Visual regression checks; skips without the visual extra (numpy, Pillow)"""
+    pytest.importorskip("numpy")
+    pytest.importorskip("PIL")
+    from utils.visual import VisualBaselines, VisualChecker
+
+    baselines = VisualBaselines(update=request.config.getoption("--update-visual-baselines"))
+    return VisualChecker(page, browser_name, baselines)
+
+
+@pytest.fixture
+def accessibility_audit(page: Page, request):
+    """axe-core audits of the current DOM state, cached across tests and workers"""
+    return AccessibilityAuditor(
+        page, update_baseline=request.config.getoption("--update-axe-baseline")
+    )
+
+
+@pytest.fixture
+def cart_model_settings(request):
+    """Cart state machine settings from the command line"""
+    config = request.config
+    seed = config.getoption("--cart-model-seed")
+    return {
+        "sequences": config.getoption("--cart-model-sequences"),
+        "length": config.getoption("--cart-model-length"),
+        "batch": max(1, config.getoption("--cart-model-batch")),
+        "seed": seed if seed is not None else random.randrange(2**32),
+    }
@@ -0,0 +1,28 @@
+import pytest
+
+
+@pytest.mark.ui
+class TestAccessibilityAudit:
+    """axe-core finds no violations beyond the known baseline"""
+
+    def test_storefront_on_load(self, ecommerce_page, page, accessibility_audit):
+        """The NavBar and product grid as first rendered"""
+        print("♿ Auditing the storefront...")
+        ecommerce_page.navigate_to_app()
+        page.wait_for_load_state("networkidle")
+        accessibility_audit.assert_no_new_violations()
+
+    def test_cart_panel_with_items(self, ecommerce_page, page, accessibility_audit):
+        """The open cart panel with rows, quantity buttons and checkout"""
+        print("♿ Auditing the cart panel...")
+        ecommerce_page.navigate_to_app()
+        page.wait_for_load_state("networkidle")
+        if not ecommerce_page.add_product_to_cart_by_index(0):
+            pytest.skip("No Add to Cart buttons available")
+        ecommerce_page.open_cart_panel()
+        accessibility_audit.assert_no_new_violations()
+
+        ecommerce_page.increment_cart_row(0)
+        page.wait_for_timeout(100)
+        result = accessibility_audit.assert_no_new_violations()
+        assert result.state_hash != accessibility_audit.results[0].state_hash
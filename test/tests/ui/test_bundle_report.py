@@ -0,0 +1,43 @@
+import pytest
+from tests.constants import BASE_URL, PAGE_ROUTES
+from utils.bundle_report import (
+    diff_reports,
+    format_diff,
+    list_reports,
+    load_report,
+    measure_route,
+    save_report,
+)
+
+
+@pytest.mark.perf
+@pytest.mark.slow
+class TestBundleReport:
+    """Per-route download size and script execution cost report"""
+
+    def test_route_bundle_report(self, browser, browser_name):
+        """Record bytes per resource type and script time for every route"""
+        if browser_name != "chromium":
+            pytest.skip("CDP tracing is only available in Chromium")
+
+        print("📦 Measuring first-load cost per route...")
+        previous = list_reports()
+        routes = {}
+        for route in PAGE_ROUTES:
+            result = measure_route(browser, BASE_URL.rstrip("/") + route)
+            routes[route] = result
+            print(
+                f"  {route}: {result['transferred']:,} B transferred, "
+                f"{result['decoded']:,} B decoded, "
+                f"{result['script_eval_ms']:.1f} ms script eval"
+            )
+            assert result["resources"], f"No resources recorded for {route}"
+
+        path = save_report(routes)
+        print(f"💾 Report saved to {path}")
+
+        if previous:
+            print(f"📊 Diff against {previous[-1].name}:")
+            print(format_diff(diff_reports(load_report(previous[-1]), load_report(path))))
+        else:
+            print("ℹ️ No previous run to diff against")
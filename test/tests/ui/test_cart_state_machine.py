@@ -0,0 +1,73 @@
+import time
+
+import pytest
+from playwright.sync_api import expect
+from utils.cart_model import CartModel, CartStateMachine
+
+# "Cart State Test Scenarios" from documents/TESTCASES.md, built from Onigiri (¥120)
+DOCUMENTED_STATES = [
+    pytest.param([["clear"]], 0, id="empty"),
+    pytest.param([["clear"], ["add", 0, 1]], 120, id="singleItem"),
+    pytest.param([["clear"], ["add", 0, 20]], 2400, id="maxItems"),
+    pytest.param([["clear"], ["add", 0, 20], ["inc", 0]], 2520, id="overLimit"),
+]
+
+
+@pytest.mark.ui
+class TestCartStateMachine:
+    """The cart UI matches a model of use-shopping-cart for any operation sequence"""
+
+    @pytest.fixture
+    def state_machine(self, ecommerce_page, page):
+        ecommerce_page.navigate_to_app()
+        page.wait_for_load_state("networkidle")
+        machine = CartStateMachine(page)
+        if not machine.catalog:
+            pytest.skip("No products available to build a cart model")
+        return machine
+
+    @pytest.mark.parametrize("ops, expected_total", DOCUMENTED_STATES)
+    @pytest.mark.req("CART-LIMIT")
+    def test_documented_cart_states(self, state_machine, ecommerce_page, ops, expected_total):
+        """Documented cart states render the expected totals"""
+        divergences = state_machine.run([ops])
+        assert not divergences, "\n".join(str(divergence) for divergence in divergences)
+
+        model = CartModel(state_machine.catalog)
+        for op in ops:
+            model.apply(op)
+        assert model.total == expected_total
+
+        if model.count:
+            ecommerce_page.open_cart_panel()
+            if model.count > 20:
+                expect(ecommerce_page.page.get_by_text("You cannot have more than 20 items")).to_be_visible()
+                expect(ecommerce_page.checkout_button.first).to_be_disabled()
+            else:
+                expect(ecommerce_page.checkout_button.first).to_be_enabled()
+
+    @pytest.mark.timeout(300)
+    def test_random_sequences_match_model(self, state_machine, cart_model_settings, record_property):
+        """Random add/increment/decrement/remove sequences match the model"""
+        settings = cart_model_settings
+        print(
+            f"🎲 {settings['sequences']} sequences x {settings['length']} ops, "
+            f"seed {settings['seed']} (rerun with --cart-model-seed={settings['seed']})"
+        )
+        sequences = state_machine.random_sequences(
+            settings["sequences"], settings["length"], settings["seed"]
+        )
+
+        started = time.perf_counter()
+        divergences = state_machine.run(sequences, batch_size=settings["batch"])
+        elapsed = time.perf_counter() - started
+
+        record_property("cart_model_seed", settings["seed"])
+        record_property("cart_model_operations", state_machine.operations)
+        print(f"⏱️ {state_machine.operations} operations in {elapsed:.1f}s")
+
+        assert not divergences, (
+            f"Cart diverged from the model (seed {settings['seed']}):\n"
+            + "\n".join(str(divergence) for divergence in divergences)
+        )
+        print("✅ Cart UI matched the model for every operation")
@@ -0,0 +1,67 @@
+import pytest
+from pages.main import EcommercePage
+from playwright.sync_api import expect
+from tests.constants import CHECKOUT_CLIENT_TIMEOUT_MS, CHECKOUT_FEEDBACK_BUDGET_MS
+from utils.checkout_faults import ERROR_TEXT, SCENARIOS
+
+
+@pytest.mark.ui
+class TestCheckoutFaults:
+    """Checkout button behaviour of the app under test when /api/checkout is slow or failing"""
+
+    @pytest.mark.parametrize("scenario", SCENARIOS, ids=str)
+    @pytest.mark.req("ORDER-FEEDBACK", "UC-004")
+    def test_checkout_feedback_under_fault(
+        self, page, checkout_faults, scenario, record_property, local_app_url
+    ):
+        """Shoppers get a loading indicator and, on failure, an error message"""
+        print(f"🧪 Injecting '{scenario.name}' into /api/checkout...")
+        checkout_faults.apply(scenario)
+
+        ecommerce_page = EcommercePage(page)
+        # The client timeout and retries live in this tree's CheckoutButton,
+        # not necessarily in the deployed site
+        ecommerce_page.navigate_to_app(f"{local_app_url}/")
+        page.wait_for_load_state("networkidle")
+
+        if ecommerce_page.add_to_cart_buttons.count() == 0:
+            pytest.skip("No products available to add to cart")
+        ecommerce_page.add_to_cart_buttons.first.click()
+        ecommerce_page.open_cart_panel()
+
+        checkout_button = ecommerce_page.cart_panel.locator("button", has_text="checkout")
+        checkout_button.click()
+
+        if scenario.expect_error:
+            expect(page.get_by_text(ERROR_TEXT)).to_be_visible(
+                timeout=CHECKOUT_CLIENT_TIMEOUT_MS + scenario.delay_ms + 5000
+            )
+        else:
+            page.wait_for_function(
+                "() => (window.__checkoutRedirects || []).length > 0",
+                timeout=scenario.delay_ms + 10000,
+            )
+
+        timings = checkout_faults.ui_timings()
+        for name, value in timings.items():
+            record_property(name, value)
+        print(f"⏱️ {scenario.name}: {timings}")
+
+        assert timings["time_to_loading_ms"] is not None, "Loading indicator never appeared"
+        assert timings["time_to_loading_ms"] <= CHECKOUT_FEEDBACK_BUDGET_MS, (
+            f"Loading indicator took {timings['time_to_loading_ms']} ms"
+        )
+
+        if scenario.expect_error:
+            # The error can't appear before the backend answers (or the client times out)
+            earliest = CHECKOUT_CLIENT_TIMEOUT_MS if scenario.kind == "hang" else scenario.delay_ms
+            assert timings["time_to_error_ms"] is not None
+            assert timings["time_to_error_ms"] <= earliest + CHECKOUT_FEEDBACK_BUDGET_MS + 1000, (
+                f"Error message took {timings['time_to_error_ms']} ms"
+            )
+            expect(checkout_button).to_be_enabled()
+            assert not checkout_faults.redirects(), "Failed checkout must not redirect"
+        else:
+            assert timings["time_to_error_ms"] is None, "Unexpected checkout error"
+            assert checkout_faults.redirects()[-1]["sessionId"] == "cs_test_fault_injection"
+        print("✅ Checkout feedback behaved as expected")
@@ -6,6 +6,7 @@ from playwright.sync_api import expect
 class TestMarketFunctionality:
     """Test suite for market/product functionality"""
 
+    @pytest.mark.req("PRODUCT-CATALOG")
     def test_products_are_displayed(self, page):
         """Test that products are displayed on the page"""
         print("🛍️ Testing products display...")
@@ -21,6 +22,7 @@ class TestMarketFunctionality:
         )
         print(f"✅ Found {product_count} products")
 
+    @pytest.mark.req("PRODUCT-CATALOG")
     def test_minimum_products_available(self, page):
         """Test that minimum expected number of products are available"""
         print("📊 Testing minimum product count...")
@@ -6,9 +6,9 @@ from playwright.sync_api import expect
 class TestPaymentFunctionality:
     """Test suite for payment page and checkout functionality"""
 
-    def test_checkout_button_navigation(self, page):
-        """Test navigation to checkout/payment page"""
-        print("💳 Testing checkout navigation...")
+    def test_checkout_button_navigation(self, page, checkout_interceptor):
+        """Test that checkout hands the cart to /api/checkout and Stripe"""
+        print("💳 Testing checkout hand-off...")
         ecommerce_page = EcommercePage(page)
         ecommerce_page.navigate_to_app()
 
@@ -20,35 +20,34 @@ class TestPaymentFunctionality:
             pytest.skip("No products available to add to cart")
 
         add_buttons.first.click()
-        page.wait_for_timeout(2000)
+        expect(ecommerce_page.cart_badge).to_have_text("1")
 
         # Look for checkout button
         checkout_buttons = page.locator(
             "button:has-text('Checkout'), button:has-text('チェックアウト'), "
             "[data-testid='checkout'], .checkout-btn, [class*='checkout']"
         )
+        if checkout_buttons.count() == 0:
+            pytest.skip("No checkout button available")
 
-        if checkout_buttons.count() > 0:
-            print("✅ Checkout button found")
-            checkout_buttons.first.click()
-            page.wait_for_load_state("networkidle")
+        print("✅ Checkout button found")
+        checkout_buttons.first.click()
+        redirect = checkout_interceptor.wait_for_redirect()
 
-            # Check if we navigated to a checkout page
-            current_url = page.url
-            print(f"🌐 Navigation URL: {current_url}")
+        cart_details = checkout_interceptor.cart_details
+        print(f"🛒 Submitted cartDetails: {cart_details}")
+        assert cart_details, "No cartDetails were posted to /api/checkout"
+        assert sum(item["quantity"] for item in cart_details.values()) == 1
 
-            if any(
-                keyword in current_url.lower()
-                for keyword in ["checkout", "payment", "stripe"]
-            ):
-                print("✅ Successfully navigated to checkout/payment page")
-            else:
-                print("ℹ️ Navigation completed but URL doesn't indicate checkout page")
-        else:
-            print("⚠️ No checkout button found")
+        print(f"🔑 redirectToCheckout called with: {redirect}")
+        assert redirect.get("sessionId") == checkout_interceptor.session_id, (
+            "redirectToCheckout must receive the sessionId returned by /api/checkout"
+        )
+        print("✅ Checkout handed the session to Stripe")
 
-    def test_stripe_integration_presence(self, page):
-        """Test for Stripe payment integration elements"""
+    @pytest.mark.req("STRIPE-CHECKOUT")
+    def test_stripe_integration_presence(self, page, checkout_interceptor):
+        """Test that /api/checkout creates a Stripe Checkout session"""
         print("🔌 Testing Stripe integration...")
         ecommerce_page = EcommercePage(page)
         ecommerce_page.navigate_to_app()
@@ -59,7 +58,6 @@ class TestPaymentFunctionality:
         add_buttons = ecommerce_page.add_to_cart_buttons
         if add_buttons.count() > 0:
             add_buttons.first.click()
-            page.wait_for_timeout(2000)
 
         # Look for checkout button and click it
         checkout_buttons = page.locator(
@@ -69,21 +67,19 @@ class TestPaymentFunctionality:
 
         if checkout_buttons.count() > 0:
             checkout_buttons.first.click()
-            page.wait_for_timeout(3000)
+            checkout_interceptor.wait_for_redirect()
 
-            # Look for Stripe elements
-            stripe_elements = page.locator(
-                "[class*='stripe'], [id*='stripe'], iframe[src*='stripe'], "
-                "[data-stripe], .StripeElement"
+            response = checkout_interceptor.responses[-1]
+            assert response["status"] == 200, f"/api/checkout failed: {response}"
+            session_id = checkout_interceptor.session_id
+            assert session_id and session_id.startswith("cs_"), (
+                f"Expected a Stripe Checkout session id, got {session_id!r}"
             )
-
-            if stripe_elements.count() > 0:
-                print("✅ Stripe payment elements detected")
-            else:
-                print("ℹ️ No obvious Stripe elements found on current page")
+            print(f"✅ Stripe Checkout session created: {session_id}")
         else:
             pytest.skip("No checkout button available")
 
+    @pytest.mark.stripe_e2e
     def test_payment_form_elements(self, page):
         """Test for payment form elements"""
         print("📝 Testing payment form elements...")
@@ -152,6 +148,7 @@ class TestPaymentFunctionality:
         else:
             print("ℹ️ No checkout button visible with empty cart (expected behavior)")
 
+    @pytest.mark.stripe_e2e
     def test_payment_security_indicators(self, page):
         """Test for payment security indicators"""
         print("🔒 Testing payment security indicators...")
@@ -193,6 +190,7 @@ class TestPaymentFunctionality:
         else:
             pytest.skip("No products available")
 
+    @pytest.mark.stripe_e2e
     def test_order_summary_display(self, page):
         """Test order summary display on checkout page"""
         print("📋 Testing order summary display...")
@@ -227,6 +225,7 @@ class TestPaymentFunctionality:
         else:
             pytest.skip("No products available")
 
+    @pytest.mark.stripe_e2e
     def test_japan_region_restriction(self, page):
         """Test Japan region restriction mentioned in documentation"""
         print("🌏 Testing Japan region restriction...")
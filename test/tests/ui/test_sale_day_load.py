@@ -0,0 +1,43 @@
+import time
+
+import pytest
+from utils.load_scenario import LoadScenario, format_slo_report, save_report
+
+
+@pytest.mark.slow
+@pytest.mark.perf
+@pytest.mark.timeout(0)
+class TestSaleDayLoad:
+    """Storefront and checkout under a ramped mix of browser and HTTP shoppers"""
+
+    def test_slos_hold_through_the_ramp(
+        self, load_scenario_settings, browser_name, browser_type_launch_args, record_property
+    ):
+        """Every phase of the ramp stays within its latency and error budgets"""
+        phases = load_scenario_settings["phases"]
+        scenario = LoadScenario(
+            phases,
+            load_scenario_settings["target"],
+            browser_name,
+            browser_type_launch_args,
+            checkout_ratio=load_scenario_settings["checkout_ratio"],
+        )
+        print(
+            f"📈 {' → '.join(phase.name for phase in phases)} over {scenario.duration_s:g}s "
+            f"against {load_scenario_settings['target']}"
+        )
+        report = scenario.run()
+        path = save_report(report, f"{browser_name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        record_property("load_scenario", report)
+        print(format_slo_report(report))
+        print(f"💾 SLO report saved to {path}")
+
+        assert scenario.samples, "The scenario sent no traffic"
+        missed = [
+            f"{phase['name']}/{kind}: error burn {stats['error_budget_burn']}, "
+            f"latency burn {stats['latency_budget_burn']}"
+            for phase in report["phases"]
+            for kind, stats in phase["kinds"].items()
+            if not stats["met"]
+        ]
+        assert not missed, "SLOs missed: " + "; ".join(missed)
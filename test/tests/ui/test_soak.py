@@ -0,0 +1,82 @@
+import json
+import time
+
+import pytest
+from pages.main import EcommercePage
+from playwright.sync_api import expect
+from tests.constants import REPORTS_DIR
+from utils.memory import MemorySampler
+
+
+@pytest.mark.slow
+@pytest.mark.soak
+@pytest.mark.timeout(0)
+class TestShoppingSessionSoak:
+    """Long-session soak tests looking for heap and DOM growth"""
+
+    def test_cart_cycles_do_not_grow_memory(self, page, soak_settings, request):
+        """Drive add/increment/decrement/remove cycles and watch for leaks"""
+        cycles = soak_settings["cycles"]
+        sample_every = soak_settings["sample_every"]
+        print(f"🔁 Soak test: {cycles} cart cycles, sampling every {sample_every}...")
+
+        ecommerce_page = EcommercePage(page)
+        ecommerce_page.navigate_to_app()
+        page.wait_for_load_state("networkidle")
+
+        product_count = ecommerce_page.add_to_cart_buttons.count()
+        if product_count == 0:
+            pytest.skip("No products available to cycle through the cart")
+
+        ecommerce_page.open_cart_panel()
+        sampler = MemorySampler(page)
+        sampler.sample(cycle=0)
+        started = time.perf_counter()
+
+        for cycle in range(1, cycles + 1):
+            ecommerce_page.add_to_cart_buttons.nth(cycle % product_count).click()
+            ecommerce_page.increment_cart_row(0)
+            ecommerce_page.decrement_cart_row(0)
+            ecommerce_page.remove_cart_row(0)
+
+            if cycle % sample_every == 0:
+                expect(ecommerce_page.cart_rows).to_have_count(0)
+                sample = sampler.sample(cycle=cycle)
+                print(
+                    f"📈 cycle {cycle}: heap {sample.js_heap_used / 1024 / 1024:.2f} MB, "
+                    f"{sample.dom_nodes} DOM nodes"
+                )
+
+        elapsed = time.perf_counter() - started
+        print(f"⏱️ {cycles} cycles in {elapsed:.1f}s")
+
+        findings = sampler.check_growth(
+            heap_threshold=soak_settings["heap_threshold"],
+            dom_threshold=soak_settings["dom_threshold"],
+        )
+
+        output_dir = REPORTS_DIR / "soak"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        run_name = f"{request.node.name}-{int(time.time())}"
+        (output_dir / f"{run_name}.json").write_text(
+            json.dumps(
+                {
+                    "cycles": cycles,
+                    "elapsed": elapsed,
+                    "samples": [sample.to_dict() for sample in sampler.samples],
+                    "findings": [str(finding) for finding in findings],
+                },
+                indent=2,
+            )
+        )
+
+        if findings:
+            snapshot = sampler.save_heap_snapshot(output_dir / f"{run_name}.heapsnapshot")
+            if snapshot:
+                print(f"💾 Heap snapshot saved to {snapshot}")
+        sampler.detach()
+
+        assert not findings, "Memory growth detected: " + "; ".join(
+            str(finding) for finding in findings
+        )
+        print("✅ No monotonic heap or DOM growth detected")
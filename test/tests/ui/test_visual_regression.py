@@ -0,0 +1,43 @@
+import pytest
+
+
+@pytest.mark.ui
+class TestVisualRegression:
+    """Storefront regions of the app under test look like their baselines in data/visual_baselines"""
+
+    def test_product_grid(self, ecommerce_page, page, visual, local_app_url):
+        """The product grid renders like its baseline, card by card"""
+        print("🖼️ Comparing the product grid...")
+        ecommerce_page.navigate_to_app(f"{local_app_url}/")
+        page.wait_for_load_state("networkidle")
+
+        grid = page.locator("main div.grid").first
+        if grid.count() == 0:
+            pytest.skip("Product grid not found")
+        visual.assert_matches("product-grid", grid, regions={"card": grid.locator("article")})
+
+    def test_cart_panel_with_items(self, ecommerce_page, page, visual, local_app_url):
+        """The ShoppingCart panel with two rows renders like its baseline"""
+        print("🛒 Comparing the cart panel...")
+        ecommerce_page.navigate_to_app(f"{local_app_url}/")
+        page.wait_for_load_state("networkidle")
+        if ecommerce_page.add_to_cart_buttons.count() < 2:
+            pytest.skip("Not enough products to fill the cart")
+
+        ecommerce_page.add_product_to_cart_by_index(0)
+        ecommerce_page.add_product_to_cart_by_index(1)
+        ecommerce_page.open_cart_panel()
+        visual.assert_matches(
+            "cart-panel",
+            ecommerce_page.cart_panel,
+            regions={"row": ecommerce_page.cart_rows},
+        )
+
+    @pytest.mark.parametrize("route", ["success", "cancel"])
+    @pytest.mark.req("ORDER-FEEDBACK")
+    def test_checkout_result_pages(self, page, visual, local_app_url, route):
+        """The success and cancel pages render like their baselines"""
+        print(f"📄 Comparing /{route}...")
+        page.goto(f"{local_app_url}/{route}")
+        page.wait_for_load_state("networkidle")
+        visual.assert_matches(f"{route}-page", page.locator("body"))
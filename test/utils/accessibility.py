@@ -0,0 +1,243 @@
+"""axe-core accessibility audits cached by DOM state.
+
+Running axe on every test is thorough but slow, and most tests render the
+same few DOM states (the storefront on load, the cart panel with a couple of
+rows, ...). Before each audit the outer HTML of the audited regions (the
+``NavBar``, the product grid and the cart panel) is hashed together with
+what else decides the result: the rules of the loaded stylesheets (rules
+like color-contrast read computed styles), the Next.js build id, the
+viewport and the axe version. If an audit of that exact state is already
+cached in ``data/generated_data/axe_cache/``, its result is reused. axe is
+injected and run only on a cache miss, at most once per document.
+
+The cache is shared by xdist workers and across runs. Entries are written
+atomically so concurrent workers never read a partial file, and expire
+after a week.
+
+Violations listed in ``data/config/axe_known_violations.json`` are reported
+but don't fail: audits assert on *new* violations only. Record the current
+ones with ``--update-axe-baseline``.
+"""
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import time
+import urllib.request
+from dataclasses import dataclass, field
+
+from tests.constants import TEST_ROOT
+from utils.telemetry import action
+
+AXE_VERSION = "4.10.2"
+AXE_URL = f"https://cdnjs.cloudflare.com/ajax/libs/axe-core/{AXE_VERSION}/axe.min.js"
+GENERATED_DIR = TEST_ROOT / "data" / "generated_data"
+AXE_CACHE_DIR = GENERATED_DIR / "axe_cache"
+AXE_SCRIPT_PATH = GENERATED_DIR / f"axe-{AXE_VERSION}.min.js"
+KNOWN_VIOLATIONS_PATH = TEST_ROOT / "data" / "config" / "axe_known_violations.json"
+CACHE_MAX_AGE_S = 7 * 24 * 3600
+
+# Regions of the storefront that are audited and hashed
+AUDIT_REGIONS = {
+    "navbar": "nav",
+    "product_grid": "main div.grid",
+    "cart_panel": "nav > div",
+}
+
+DOM_STATE_SCRIPT = """
+(selectors) => ({
+  regions: Object.entries(selectors).map(([name, selector]) => [
+    name,
+    Array.from(document.querySelectorAll(selector)).map((element) => element.outerHTML),
+  ]),
+  styles: Array.from(document.styleSheets).map((sheet) => {
+    try {
+      return Array.from(sheet.cssRules, (rule) => rule.cssText).join("");
+    } catch {
+      // Cross-origin sheets don't expose their rules; their URL will do
+      return sheet.href;
+    }
+  }),
+  build: window.__NEXT_DATA__ ? window.__NEXT_DATA__.buildId : null,
+  viewport: [window.innerWidth, window.innerHeight, window.devicePixelRatio],
+})
+"""
+
+AXE_RUN_SCRIPT = """
+async (selectors) => {
+  const include = selectors.filter((selector) => document.querySelector(selector));
+  const results = await axe.run(
+    include.length ? { include: include.map((selector) => [selector]) } : document,
+    { resultTypes: ["violations"] }
+  );
+  return results.violations.map((violation) => ({
+    id: violation.id,
+    impact: violation.impact,
+    help: violation.help,
+    targets: violation.nodes.map((node) => node.target.join(" ")),
+  }));
+}
+"""
+
+
+@dataclass
+class AuditResult:
+    state_hash: str
+    cached: bool
+    violations: list
+    new_violations: list = field(default_factory=list)
+    duration_ms: float = 0.0
+
+    def summary(self):
+        source = "cached" if self.cached else "axe"
+        return (
+            f"{len(self.violations)} violations ({len(self.new_violations)} new) "
+            f"from {source} in {self.duration_ms:.0f} ms, state {self.state_hash[:12]}"
+        )
+
+
+def violation_keys(violations):
+    """One "rule target" key per violating node"""
+    return {
+        f"{violation['id']} {target}" for violation in violations for target in violation["targets"]
+    }
+
+
+def new_violations(violations, known):
+    """Violations with only the nodes not already in the known set"""
+    fresh = []
+    for violation in violations:
+        targets = [
+            target for target in violation["targets"] if f"{violation['id']} {target}" not in known
+        ]
+        if targets:
+            fresh.append({**violation, "targets": targets})
+    return fresh
+
+
+def state_hash(state):
+    """Hash of a DOM_STATE_SCRIPT result and the axe version that audits it"""
+    digest = hashlib.sha256(AXE_VERSION.encode("utf-8"))
+    digest.update(json.dumps(state, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _atomic_write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_text(text, encoding="utf-8")
+    os.replace(temporary, path)
+
+
+@contextlib.contextmanager
+def _locked(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class AuditCache:
+    """Audit results on disk, one JSON file per DOM state hash"""
+
+    def __init__(self, directory=AXE_CACHE_DIR, max_age_s=CACHE_MAX_AGE_S):
+        self.directory = directory
+        self.max_age_s = max_age_s
+
+    def get(self, key):
+        try:
+            entry = json.loads((self.directory / f"{key}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created_at", 0) > self.max_age_s:
+            return None
+        return entry
+
+    def put(self, key, violations):
+        entry = {"axe": AXE_VERSION, "created_at": time.time(), "violations": violations}
+        _atomic_write(self.directory / f"{key}.json", json.dumps(entry, indent=2))
+
+
+class KnownViolations:
+    """The accepted-violations baseline in data/config"""
+
+    def __init__(self, path=KNOWN_VIOLATIONS_PATH):
+        self.path = path
+
+    def load(self):
+        try:
+            return set(json.loads(self.path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            return set()
+
+    def add(self, violations):
+        with _locked(self.path):
+            keys = self.load() | violation_keys(violations)
+            _atomic_write(self.path, json.dumps(sorted(keys), indent=2) + "\n")
+
+
+def axe_source(path=AXE_SCRIPT_PATH, url=AXE_URL):
+    """The axe-core script, downloaded once and kept next to the cache"""
+    if not path.exists():
+        with _locked(path):
+            if not path.exists():
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    _atomic_write(path, response.read().decode("utf-8"))
+    return path.read_text(encoding="utf-8")
+
+
+class AccessibilityAuditor:
+    def __init__(self, page, cache=None, known=None, update_baseline=False, regions=None):
+        self.page = page
+        self.cache = cache or AuditCache()
+        self.known = known or KnownViolations()
+        self.update_baseline = update_baseline
+        self.regions = regions or AUDIT_REGIONS
+        self.results = []
+
+    def _ensure_axe(self):
+        # Injected once per document; navigation clears it
+        if not self.page.evaluate("() => typeof window.axe !== 'undefined'"):
+            self.page.add_script_tag(content=axe_source())
+
+    @action()
+    def audit(self):
+        """Audit the current DOM state, reusing a cached result if there is one"""
+        started = time.perf_counter()
+        serialized = self.page.evaluate(DOM_STATE_SCRIPT, self.regions)
+        key = state_hash(serialized)
+        entry = self.cache.get(key)
+        cached = entry is not None
+        if cached:
+            violations = entry["violations"]
+        else:
+            self._ensure_axe()
+            violations = self.page.evaluate(AXE_RUN_SCRIPT, list(self.regions.values()))
+            self.cache.put(key, violations)
+
+        if self.update_baseline:
+            self.known.add(violations)
+        result = AuditResult(
+            key,
+            cached,
+            violations,
+            new_violations(violations, self.known.load()),
+            (time.perf_counter() - started) * 1000,
+        )
+        self.results.append(result)
+        return result
+
+    def assert_no_new_violations(self):
+        result = self.audit()
+        print(f"♿ {result.summary()}")
+        details = "\n".join(
+            f"  {violation['id']} ({violation['impact']}): {violation['help']}\n"
+            + "\n".join(f"    {target}" for target in violation["targets"])
+            for violation in result.new_violations
+        )
+        assert not result.new_violations, f"New accessibility violations:\n{details}"
+        return result
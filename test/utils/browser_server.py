@@ -0,0 +1,175 @@
+"""One Playwright browser server per machine, shared by every xdist worker.
+
+The first worker that needs a browser starts ``playwright launch-server``
+under a file lock and records its websocket endpoint in a state file; the
+other workers connect to that endpoint and only create lightweight contexts.
+If the server dies, the next worker to notice restarts it under the same
+lock. The controller process shuts it down when the run ends.
+"""
+import contextlib
+import fcntl
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+STATE_DIR = Path(tempfile.gettempdir()) / "playwright-shared-browser"
+STARTUP_TIMEOUT = 30.0
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except (OSError, TypeError):
+        return False
+    return True
+
+
+def _port_open(ws_endpoint, timeout=1.0):
+    parsed = urlparse(ws_endpoint)
+    try:
+        with socket.create_connection((parsed.hostname, parsed.port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def to_server_options(launch_args):
+    """Convert pytest-playwright launch args to launchServer JSON options"""
+    options = {}
+    for key, value in launch_args.items():
+        head, *rest = key.split("_")
+        options[head + "".join(part.title() for part in rest)] = value
+    return options
+
+
+class SharedBrowserServer:
+    """Coordinates a single launch-server process between processes"""
+
+    def __init__(self, key, browser_name, launch_options):
+        self.browser_name = browser_name
+        self.launch_options = launch_options
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        self.state_path = STATE_DIR / f"{key}-{browser_name}.json"
+        self.lock_path = STATE_DIR / f"{key}-{browser_name}.lock"
+        self.log_path = STATE_DIR / f"{key}-{browser_name}.log"
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with open(self.lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_state(self):
+        try:
+            return json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def is_healthy(self, state=None):
+        state = state or self._read_state()
+        return bool(
+            state
+            and _process_alive(state.get("pid"))
+            and _port_open(state["ws_endpoint"])
+        )
+
+    def _launch(self):
+        config_path = self.state_path.with_suffix(".config.json")
+        config_path.write_text(json.dumps(self.launch_options))
+        log = open(self.log_path, "w")
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "playwright",
+                "launch-server",
+                "--browser",
+                self.browser_name,
+                "--config",
+                str(config_path),
+            ],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            # Outlive the worker that happened to start it
+            start_new_session=True,
+        )
+        log.close()
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(
+                    f"Browser server exited during startup:\n{self.log_path.read_text()}"
+                )
+            for line in self.log_path.read_text().splitlines():
+                if line.startswith("ws://"):
+                    state = {"pid": process.pid, "ws_endpoint": line.strip()}
+                    self.state_path.write_text(json.dumps(state))
+                    return state
+            time.sleep(0.1)
+        process.kill()
+        raise RuntimeError(f"Browser server did not report an endpoint in {STARTUP_TIMEOUT}s")
+
+    def ensure_running(self):
+        """Return the endpoint of a healthy server, starting one if needed"""
+        with self._locked():
+            state = self._read_state()
+            if self.is_healthy(state):
+                return state["ws_endpoint"]
+            if state and _process_alive(state.get("pid")):
+                self._kill(state["pid"])
+            return self._launch()["ws_endpoint"]
+
+    def shutdown(self):
+        with self._locked():
+            state = self._read_state()
+            if state:
+                self._kill(state.get("pid"))
+            for path in (self.state_path, self.state_path.with_suffix(".config.json")):
+                with contextlib.suppress(OSError):
+                    path.unlink()
+
+    @staticmethod
+    def _kill(pid):
+        with contextlib.suppress(OSError, TypeError):
+            os.killpg(pid, signal.SIGTERM)
+
+
+class SharedBrowser:
+    """Browser proxy that reconnects (restarting the server if needed) when
+    the shared browser has gone away"""
+
+    def __init__(self, server, browser_type):
+        self._server = server
+        self._browser_type = browser_type
+        self._browser = None
+        self.restarts = 0
+        self._connect()
+
+    def _connect(self):
+        endpoint = self._server.ensure_running()
+        self._browser = self._browser_type.connect(endpoint)
+
+    def _ensure_connected(self):
+        if not self._browser.is_connected():
+            self.restarts += 1
+            self._connect()
+        return self._browser
+
+    def __getattr__(self, name):
+        return getattr(self._ensure_connected(), name)
+
+    def close(self):
+        # Only drop this worker's connection; the server is shared
+        if self._browser is not None and self._browser.is_connected():
+            self._browser.close()
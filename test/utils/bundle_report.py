@@ -0,0 +1,185 @@
+"""Per-route download and script execution cost report.
+
+Each run is stored as ``reports/bundle/<timestamp>.json`` so that a new run can
+be diffed against the previous one::
+
+    python -m utils.bundle_report                 # diff the two latest runs
+    python -m utils.bundle_report old.json new.json
+"""
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from tests.constants import REPORTS_DIR
+from utils.tracing import CdpTracer, script_evaluation_ms
+
+BUNDLE_REPORTS_DIR = REPORTS_DIR / "bundle"
+
+
+class NetworkRecorder:
+    """Collects transferred and decoded bytes per resource type over CDP"""
+
+    def __init__(self, cdp):
+        self.requests = {}
+        cdp.on("Network.responseReceived", self._on_response)
+        cdp.on("Network.dataReceived", self._on_data)
+        cdp.on("Network.loadingFinished", self._on_finished)
+        cdp.send("Network.enable")
+        # Measure a cold first load
+        cdp.send("Network.setCacheDisabled", {"cacheDisabled": True})
+
+    def _entry(self, request_id):
+        return self.requests.setdefault(
+            request_id,
+            {"url": "", "type": "Other", "transferred": 0, "decoded": 0},
+        )
+
+    def _on_response(self, params):
+        entry = self._entry(params["requestId"])
+        entry["url"] = params["response"]["url"]
+        entry["type"] = params.get("type", "Other")
+
+    def _on_data(self, params):
+        self._entry(params["requestId"])["decoded"] += params.get("dataLength", 0)
+
+    def _on_finished(self, params):
+        self._entry(params["requestId"])["transferred"] = int(
+            params.get("encodedDataLength", 0)
+        )
+
+    def by_type(self):
+        totals = defaultdict(lambda: {"count": 0, "transferred": 0, "decoded": 0})
+        for entry in self.requests.values():
+            bucket = totals[entry["type"]]
+            bucket["count"] += 1
+            bucket["transferred"] += entry["transferred"]
+            bucket["decoded"] += entry["decoded"]
+        return dict(totals)
+
+    def largest(self, limit=10):
+        entries = sorted(
+            self.requests.values(), key=lambda entry: entry["decoded"], reverse=True
+        )
+        return [entry for entry in entries[:limit] if entry["url"]]
+
+
+def measure_route(browser, url):
+    """Load url in a fresh context and return its resource and script costs"""
+    context = browser.new_context()
+    page = context.new_page()
+    try:
+        tracer = CdpTracer(page)
+        network = NetworkRecorder(tracer.cdp)
+        tracer.start()
+        started = time.perf_counter()
+        page.goto(url, wait_until="networkidle")
+        load_ms = (time.perf_counter() - started) * 1000
+        events = tracer.stop()
+        scripts = script_evaluation_ms(events)
+        tracer.detach()
+    finally:
+        context.close()
+
+    resources = network.by_type()
+    return {
+        "url": url,
+        "load_ms": round(load_ms, 1),
+        "resources": resources,
+        "transferred": sum(bucket["transferred"] for bucket in resources.values()),
+        "decoded": sum(bucket["decoded"] for bucket in resources.values()),
+        "script_eval_ms": round(sum(scripts.values()), 2),
+        "top_scripts": [
+            {"url": script_url, "ms": round(ms, 2)}
+            for script_url, ms in sorted(scripts.items(), key=lambda kv: -kv[1])[:10]
+        ],
+        "largest_resources": network.largest(),
+    }
+
+
+def save_report(routes, directory=BUNDLE_REPORTS_DIR):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(
+        json.dumps({"created": time.time(), "routes": routes}, indent=2),
+        encoding="utf-8",
+    )
+    return path
+
+
+def list_reports(directory=BUNDLE_REPORTS_DIR):
+    return sorted(Path(directory).glob("*.json"))
+
+
+def load_report(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def diff_reports(old, new):
+    """Return per-route deltas of bytes per resource type and script time"""
+    diff = {}
+    for route, current in new["routes"].items():
+        previous = old["routes"].get(route)
+        if previous is None:
+            continue
+        types = set(current["resources"]) | set(previous["resources"])
+        diff[route] = {
+            "transferred": current["transferred"] - previous["transferred"],
+            "decoded": current["decoded"] - previous["decoded"],
+            "script_eval_ms": round(
+                current["script_eval_ms"] - previous["script_eval_ms"], 2
+            ),
+            "resources": {
+                resource_type: {
+                    key: current["resources"].get(resource_type, {}).get(key, 0)
+                    - previous["resources"].get(resource_type, {}).get(key, 0)
+                    for key in ("count", "transferred", "decoded")
+                }
+                for resource_type in sorted(types)
+            },
+        }
+    return diff
+
+
+def format_diff(diff):
+    lines = []
+    for route, delta in diff.items():
+        lines.append(
+            f"{route}: transferred {delta['transferred']:+,d} B, "
+            f"decoded {delta['decoded']:+,d} B, "
+            f"script eval {delta['script_eval_ms']:+.1f} ms"
+        )
+        for resource_type, values in delta["resources"].items():
+            if any(values.values()):
+                lines.append(
+                    f"  {resource_type:<12} count {values['count']:+d}, "
+                    f"transferred {values['transferred']:+,d} B, "
+                    f"decoded {values['decoded']:+,d} B"
+                )
+    return "\n".join(lines) or "No differences"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("reports", nargs="*", help="old and new report paths")
+    args = parser.parse_args(argv)
+
+    if len(args.reports) == 2:
+        old_path, new_path = args.reports
+    else:
+        reports = list_reports()
+        if len(reports) < 2:
+            print("Need at least two stored runs to diff", file=sys.stderr)
+            return 1
+        old_path, new_path = reports[-2], reports[-1]
+
+    print(f"{old_path} -> {new_path}")
+    print(format_diff(diff_reports(load_report(old_path), load_report(new_path))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
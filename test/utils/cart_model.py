@@ -0,0 +1,219 @@
+"""Model-based testing of the cart against a Python model of use-shopping-cart.
+
+Random sequences of add/increment/decrement/remove operations are generated
+from ``CartModel`` and executed in the browser in batches: one
+``page.evaluate`` runs hundreds of operations as DOM clicks and returns a
+snapshot of the ``ShoppingCart`` rows and total and the ``NavBar`` badge after
+every operation. The snapshots are then replayed against the model, so a
+divergence is pinned to the exact operation that caused it.
+
+Operations (JSON lists, so they pass straight into the page):
+
+* ``["clear"]`` - remove every cart row
+* ``["add", product_index, count]`` - set the product card quantity, add to cart
+* ``["inc", row]`` / ``["dec", row]`` / ``["remove", row]`` - cart row buttons
+"""
+import random
+from dataclasses import dataclass
+
+CATALOG_SCRIPT = """
+() => Array.from(document.querySelectorAll("main article")).map((card) => ({
+  name: card.children[1].textContent.trim(),
+  price: Number(card.children[2].textContent.replace(/[^0-9]/g, "")),
+}))
+"""
+
+BATCH_SCRIPT = """
+async (ops) => {
+  const tick = () => new Promise((resolve) => setTimeout(resolve, 0));
+  const panel = document.querySelector("nav > div");
+  const badge = document.querySelector("nav > button > div");
+  const cards = Array.from(document.querySelectorAll("main article"));
+  const rows = () =>
+    Array.from(panel.querySelectorAll("div:has(> button img[alt='delete icon'])"));
+  const button = (root, text) =>
+    Array.from(root.querySelectorAll("button")).find(
+      (candidate) => candidate.textContent.trim() === text
+    );
+  const trash = (row) => row.querySelector("button:has(img[alt='delete icon'])");
+
+  const snapshot = () => {
+    const total = Array.from(panel.querySelectorAll("div")).find(
+      (div) => !div.children.length && div.textContent.startsWith("Total:")
+    );
+    return {
+      badge: badge.textContent.trim(),
+      total: total ? total.textContent.trim() : null,
+      rows: rows().map((row) => {
+        const label = row.children[1];
+        const quantity = label.querySelector("span");
+        return [label.firstChild.textContent.trim(), quantity ? quantity.textContent.trim() : ""];
+      }),
+    };
+  };
+
+  const snapshots = [];
+  for (const [kind, target, count] of ops) {
+    if (kind === "clear") {
+      while (rows().length) {
+        trash(rows()[0]).click();
+        await tick();
+      }
+    } else if (kind === "add") {
+      const card = cards[target];
+      for (let i = 1; i < count; i++) {
+        button(card, "+").click();
+        await tick();
+      }
+      button(card, "Add to cart").click();
+    } else {
+      const row = rows()[target];
+      if (!row) {
+        snapshots.push({ error: `No cart row ${target} for ${kind}`, ...snapshot() });
+        break;
+      }
+      ({ inc: () => button(row, "+"), dec: () => button(row, "-"), remove: () => trash(row) })
+        [kind]()
+        .click();
+    }
+    await tick();
+    snapshots.push(snapshot());
+  }
+  return snapshots;
+}
+"""
+
+
+@dataclass(frozen=True)
+class CatalogItem:
+    name: str
+    price: int
+
+
+class CartModel:
+    """use-shopping-cart semantics as wired up by the app's components"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        # product index -> quantity; dict order mirrors cartDetails key order
+        self.entries = {}
+
+    @property
+    def count(self):
+        return sum(self.entries.values())
+
+    @property
+    def total(self):
+        return sum(self.catalog[index].price * qty for index, qty in self.entries.items())
+
+    def _key(self, row):
+        return list(self.entries)[row]
+
+    def apply(self, op):
+        kind = op[0]
+        if kind == "clear":
+            self.entries.clear()
+        elif kind == "add":
+            _, index, count = op
+            self.entries[index] = self.entries.get(index, 0) + count
+        elif kind == "inc":
+            self.entries[self._key(op[1])] += 1
+        elif kind == "dec":
+            # CartItem removes the row instead of decrementing below 1
+            key = self._key(op[1])
+            if self.entries[key] > 1:
+                self.entries[key] -= 1
+            else:
+                del self.entries[key]
+        elif kind == "remove":
+            del self.entries[self._key(op[1])]
+        else:
+            raise ValueError(f"Unknown cart operation: {op!r}")
+
+    def snapshot(self):
+        """What ShoppingCart and the NavBar badge should render"""
+        return {
+            "badge": str(self.count),
+            "total": f"Total: ￥{self.total}({self.count})" if self.entries else None,
+            "rows": [
+                [self.catalog[index].name, f"({qty})"] for index, qty in self.entries.items()
+            ],
+        }
+
+
+def generate_sequence(rng, catalog, length, max_add_count=3):
+    """A random valid operation sequence starting from an empty cart"""
+    model = CartModel(catalog)
+    ops = [["clear"]]
+    for _ in range(length):
+        rows = len(model.entries)
+        choices = [("add", 3)] + ([("inc", 2), ("dec", 2), ("remove", 1)] if rows else [])
+        kind = rng.choices([kind for kind, _ in choices], [weight for _, weight in choices])[0]
+        if kind == "add":
+            op = ["add", rng.randrange(len(catalog)), rng.randint(1, max_add_count)]
+        else:
+            op = [kind, rng.randrange(rows)]
+        model.apply(op)
+        ops.append(op)
+    return ops
+
+
+@dataclass
+class Divergence:
+    sequence: int
+    step: int
+    ops: list
+    expected: dict
+    actual: dict
+
+    def __str__(self):
+        return (
+            f"sequence {self.sequence}, step {self.step} after {self.ops}:\n"
+            f"  expected {self.expected}\n  actual   {self.actual}"
+        )
+
+
+class CartStateMachine:
+    """Runs operation sequences in the page and compares them with CartModel"""
+
+    def __init__(self, page):
+        self.page = page
+        self.catalog = [CatalogItem(**item) for item in page.evaluate(CATALOG_SCRIPT)]
+        self.operations = 0
+
+    def random_sequences(self, count, length, seed):
+        rng = random.Random(seed)
+        return [generate_sequence(rng, self.catalog, length) for _ in range(count)]
+
+    def run(self, sequences, batch_size=50, max_divergences=5):
+        """Execute sequences batch by batch; return the divergences found"""
+        divergences = []
+        for start in range(0, len(sequences), batch_size):
+            batch = sequences[start:start + batch_size]
+            snapshots = self.page.evaluate(BATCH_SCRIPT, [op for ops in batch for op in ops])
+            self.operations += len(snapshots)
+            divergences += self._compare(batch, snapshots, start)
+            if len(divergences) >= max_divergences:
+                break
+        return divergences[:max_divergences]
+
+    def _compare(self, batch, snapshots, first_sequence):
+        divergences = []
+        position = 0
+        for offset, ops in enumerate(batch):
+            model = CartModel(self.catalog)
+            for step, op in enumerate(ops):
+                if position >= len(snapshots):
+                    return divergences
+                actual = snapshots[position]
+                position += 1
+                model.apply(op)
+                expected = model.snapshot()
+                if actual != expected:
+                    divergences.append(
+                        Divergence(first_sequence + offset, step, ops[:step + 1], expected, actual)
+                    )
+                    # The rest of this sequence starts from a state the model doesn't share
+                    position += len(ops) - step - 1
+                    break
+        return divergences
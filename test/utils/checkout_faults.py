@@ -0,0 +1,167 @@
+"""Fault and latency injection for ``/api/checkout``.
+
+Each scenario replaces the checkout response via ``page.route``. An init
+script timestamps, relative to the checkout click, when the button switches
+to "Loading..." and when the redirect error message appears, so tests can
+check how quickly shoppers get feedback from a slow or failing backend.
+"""
+import json
+import time
+from dataclasses import dataclass
+
+from utils.checkout_interceptor import (
+    REDIRECT_RECORDER_SCRIPT,
+    STRIPE_JS_PATTERN,
+    STRIPE_JS_STUB,
+)
+
+LOADING_TEXT = "Loading..."
+ERROR_TEXT = "Unable to redirect to Stripe checkout page"
+FAKE_SESSION_BODY = json.dumps({"sessionId": "cs_test_fault_injection"})
+
+UI_TIMING_SCRIPT = """
+(() => {
+  const ui = (window.__checkoutUi = {});
+  document.addEventListener(
+    "click",
+    (event) => {
+      const button = event.target.closest && event.target.closest("button");
+      if (button && /checkout/i.test(button.textContent)) {
+        Object.keys(ui).forEach((key) => delete ui[key]);
+        ui.clickedAt = performance.now();
+      }
+    },
+    true
+  );
+  const check = () => {
+    if (!ui.clickedAt || !document.body) return;
+    const text = document.body.textContent;
+    const now = performance.now();
+    if (ui.loadingAt === undefined && text.includes(%(loading)s)) ui.loadingAt = now;
+    if (ui.errorAt === undefined && text.includes(%(error)s)) ui.errorAt = now;
+  };
+  new MutationObserver(check).observe(document, {
+    subtree: true,
+    childList: true,
+    characterData: true,
+  });
+})();
+""" % {"loading": json.dumps(LOADING_TEXT), "error": json.dumps(ERROR_TEXT)}
+
+# A slow-drip body cannot be produced through route.fulfill, so the drip
+# scenario swaps fetch for /api/checkout with a stream that trickles bytes.
+DRIP_FETCH_SCRIPT = """
+(() => {
+  const bytes = new TextEncoder().encode(%(body)s);
+  const pause = %(delay_ms)d / bytes.length;
+  const originalFetch = window.fetch;
+  window.fetch = (input, init) => {
+    const url = typeof input === "string" ? input : input.url;
+    if (!url.includes("/api/checkout")) return originalFetch(input, init);
+    let index = 0;
+    const stream = new ReadableStream({
+      pull(controller) {
+        return new Promise((resolve) =>
+          setTimeout(() => {
+            controller.enqueue(bytes.slice(index, index + 1));
+            index += 1;
+            if (index >= bytes.length) controller.close();
+            resolve();
+          }, pause)
+        );
+      },
+    });
+    return Promise.resolve(
+      new Response(stream, {
+        status: 200,
+        headers: { "Content-Type": "application/json" },
+      })
+    );
+  };
+})();
+"""
+
+
+@dataclass(frozen=True)
+class FaultScenario:
+    name: str
+    kind: str
+    delay_ms: int = 0
+    status: int = 200
+    expect_error: bool = False
+
+    def __str__(self):
+        return self.name
+
+
+SCENARIOS = [
+    FaultScenario("fixed-delay", "delay", delay_ms=3000),
+    FaultScenario("slow-drip", "drip", delay_ms=4000),
+    FaultScenario("timeout", "hang", expect_error=True),
+    FaultScenario("http-500", "status", status=500, expect_error=True),
+    FaultScenario("http-503", "status", status=503, delay_ms=1000, expect_error=True),
+    FaultScenario("malformed-json", "malformed", expect_error=True),
+]
+
+
+class CheckoutFaultInjector:
+    """Applies a FaultScenario to /api/checkout for one page"""
+
+    def __init__(self, page):
+        self.page = page
+        self.scenario = None
+        self.requests = 0
+        page.add_init_script(REDIRECT_RECORDER_SCRIPT)
+        page.add_init_script(UI_TIMING_SCRIPT)
+        page.route(STRIPE_JS_PATTERN, self._fulfill_stripe_js)
+
+    def _fulfill_stripe_js(self, route):
+        route.fulfill(status=200, content_type="application/javascript", body=STRIPE_JS_STUB)
+
+    def apply(self, scenario):
+        """Install a scenario; call before navigating to the app"""
+        self.scenario = scenario
+        if scenario.kind == "drip":
+            self.page.add_init_script(
+                DRIP_FETCH_SCRIPT
+                % {"body": json.dumps(FAKE_SESSION_BODY), "delay_ms": scenario.delay_ms}
+            )
+        self.page.route("**/api/checkout", self._handle)
+        return self
+
+    def _handle(self, route):
+        self.requests += 1
+        scenario = self.scenario
+        if scenario.kind == "hang":
+            # Never fulfil: the request stays pending until the client gives up
+            return
+        if scenario.delay_ms:
+            time.sleep(scenario.delay_ms / 1000)
+        if scenario.kind == "status":
+            route.fulfill(
+                status=scenario.status,
+                content_type="application/json",
+                body=json.dumps({"error": "Injected failure"}),
+            )
+        elif scenario.kind == "malformed":
+            route.fulfill(status=200, content_type="application/json", body='{"sessionId": ')
+        else:
+            route.fulfill(status=200, content_type="application/json", body=FAKE_SESSION_BODY)
+
+    def ui_timings(self):
+        """Milliseconds from the checkout click to loading and error feedback"""
+        ui = self.page.evaluate("() => window.__checkoutUi || {}")
+        clicked = ui.get("clickedAt")
+        if clicked is None:
+            return {"time_to_loading_ms": None, "time_to_error_ms": None}
+        return {
+            "time_to_loading_ms": (
+                round(ui["loadingAt"] - clicked, 1) if "loadingAt" in ui else None
+            ),
+            "time_to_error_ms": (
+                round(ui["errorAt"] - clicked, 1) if "errorAt" in ui else None
+            ),
+        }
+
+    def redirects(self):
+        return self.page.evaluate("() => window.__checkoutRedirects || []")
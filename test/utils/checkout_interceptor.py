@@ -0,0 +1,115 @@
+"""Capture checkout hand-off to Stripe without loading the hosted page.
+
+``CheckoutButton`` posts ``{cartDetails}`` to ``/api/checkout`` and passes the
+returned ``sessionId`` to ``stripe.redirectToCheckout``. The interceptor
+records both sides: the ``/api/checkout`` request and response via
+``page.route`` and every ``redirectToCheckout`` call via an init script that
+wraps the ``window.Stripe`` factory, so the redirect never leaves the app.
+"""
+import json
+
+STRIPE_JS_PATTERN = "https://js.stripe.com/**"
+
+# Wraps whatever Stripe factory gets assigned to window.Stripe (the real
+# Stripe.js or the stub below) so redirectToCheckout only records its options.
+REDIRECT_RECORDER_SCRIPT = """
+(() => {
+  window.__checkoutRedirects = [];
+  let wrappedFactory;
+  Object.defineProperty(window, "Stripe", {
+    configurable: true,
+    get() {
+      return wrappedFactory;
+    },
+    set(factory) {
+      wrappedFactory = function (...args) {
+        const instance = factory.apply(this, args);
+        instance.redirectToCheckout = async (options) => {
+          window.__checkoutRedirects.push(options);
+          return {};
+        };
+        return instance;
+      };
+      Object.assign(wrappedFactory, factory);
+    },
+  });
+})();
+"""
+
+# Minimal Stripe.js replacement so tests don't depend on js.stripe.com
+STRIPE_JS_STUB = """
+window.Stripe = function () {
+  return {
+    _registerWrapper() {},
+    registerAppInfo() {},
+    redirectToCheckout() {
+      return Promise.resolve({});
+    },
+  };
+};
+window.Stripe.version = 3;
+"""
+
+
+class CheckoutInterceptor:
+    """Records /api/checkout traffic and stripe.redirectToCheckout calls"""
+
+    def __init__(self, page, stub_stripe_js=True, session_id=None):
+        self.page = page
+        self.session_id_override = session_id
+        self.requests = []
+        self.responses = []
+        page.add_init_script(REDIRECT_RECORDER_SCRIPT)
+        if stub_stripe_js:
+            page.route(STRIPE_JS_PATTERN, self._fulfill_stripe_js)
+        page.route("**/api/checkout", self._handle_checkout)
+
+    def _fulfill_stripe_js(self, route):
+        route.fulfill(status=200, content_type="application/javascript", body=STRIPE_JS_STUB)
+
+    def _handle_checkout(self, route):
+        request = route.request
+        try:
+            payload = request.post_data_json
+        except Exception:
+            payload = request.post_data
+        self.requests.append(payload)
+
+        if self.session_id_override:
+            body = {"sessionId": self.session_id_override}
+            self.responses.append({"status": 200, "body": body})
+            route.fulfill(status=200, content_type="application/json", body=json.dumps(body))
+            return
+
+        response = route.fetch()
+        try:
+            body = response.json()
+        except Exception:
+            body = response.text()
+        self.responses.append({"status": response.status, "body": body})
+        route.fulfill(response=response)
+
+    @property
+    def cart_details(self):
+        """cartDetails of the latest /api/checkout request"""
+        if not self.requests or not isinstance(self.requests[-1], dict):
+            return None
+        return self.requests[-1].get("cartDetails")
+
+    @property
+    def session_id(self):
+        """sessionId returned by the latest /api/checkout response"""
+        if not self.responses or not isinstance(self.responses[-1]["body"], dict):
+            return None
+        return self.responses[-1]["body"].get("sessionId")
+
+    def redirects(self):
+        """Options passed to every stripe.redirectToCheckout call so far"""
+        return self.page.evaluate("() => window.__checkoutRedirects || []")
+
+    def wait_for_redirect(self, timeout=10000):
+        """Wait until redirectToCheckout is called and return its options"""
+        self.page.wait_for_function(
+            "() => (window.__checkoutRedirects || []).length > 0", timeout=timeout
+        )
+        return self.redirects()[-1]
@@ -0,0 +1,555 @@
+"""Distributed test execution: one coordinator, N nodes, one shared work queue.
+
+``python -m utils.distributed`` starts N nodes, either local ``pytest``
+processes or containers from ``test/Dockerfile`` (``--docker``). Each node
+runs a normal pytest session with this plugin enabled. The plugin replaces
+the run loop: instead of running its own items, the node asks the
+coordinator for the next test ID over HTTP. The coordinator hands out tests
+longest first, using their median duration in the results database
+(``utils.results_db``), so the long journeys don't all end up on the last
+node to finish.
+
+Results are sent back to the coordinator as each test finishes. It prints
+them as they arrive and records them in the results database as one run.
+When the nodes exit, it merges their outputs into
+``reports/distributed/<run id>/``:
+
+* ``junit.xml`` - every node's JUnit testcases in one testsuite
+* ``results.json`` - one entry per test with outcome, duration and node
+* ``artifacts/`` - the nodes' Playwright outputs (traces, screenshots, videos)
+
+Usage::
+
+    python -m utils.distributed --nodes 4                    # local processes
+    python -m utils.distributed --nodes 4 --docker           # containers
+    python -m utils.distributed --nodes 4 -- tests/ui -m "not slow"
+
+A local app under test talks to one fake Stripe on ``FAKE_STRIPE_PORT``, and
+only one node can serve it. Tests that use the fake are pinned: the first
+node to take one gets all of them, and starts the fake on that port. If it
+dies, the next node to ask takes over.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from tests.constants import REPORTS_DIR, TEST_ROOT
+from utils import telemetry
+from utils.results_db import DEFAULT_DB_PATH, ResultsDB, flatten_metrics, fold_phase, item_profile
+
+DISTRIBUTED_REPORTS_DIR = REPORTS_DIR / "distributed"
+# Same names as run_tests.sh
+DEFAULT_IMAGE = os.environ.get("PLAYWRIGHT_IMAGE_NAME", "playwright-pytest")
+CONTAINER_NAME = os.environ.get("PLAYWRIGHT_CONTAINER_NAME", "playwright-pytest-runner")
+# How many times a test is handed out again after its node died holding it
+MAX_REQUEUES = 1
+
+
+def plan_queue(nodeids, history):
+    """Order tests longest first by median historical duration.
+
+    Tests with no history are assumed to take the median of those with
+    history, so new tests land in the middle of the queue.
+    """
+    medians = {
+        nodeid: statistics.median(history[nodeid]) for nodeid in nodeids if history.get(nodeid)
+    }
+    default = statistics.median(medians.values()) if medians else 1.0
+    return sorted(nodeids, key=lambda nodeid: (-medians.get(nodeid, default), nodeid))
+
+
+def pinned(item):
+    """Tests that must all run on one node: those using the fake Stripe"""
+    return "fake_stripe_server" in item.fixturenames
+
+
+class WorkQueue:
+    """Thread-safe queue of test IDs, tracking which node holds which test"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = []
+        self.in_flight = {}
+        self.handed_out = {}
+        self.nodeids = None
+        self.pinned = set()
+        self.pinned_node = None
+        self.stopped = False
+
+    def load(self, nodeids, history, pinned=()):
+        """Plan the queue from the first node's collection.
+
+        Returns (planned, tests the node collected differently from the first).
+        """
+        with self.lock:
+            if self.nodeids is None:
+                self.nodeids = list(nodeids)
+                self.pending = plan_queue(nodeids, history)
+                self.pinned = set(pinned)
+                return True, set()
+            return False, set(self.nodeids) ^ set(nodeids)
+
+    def next(self, node):
+        with self.lock:
+            if self.stopped:
+                return None
+            for index, nodeid in enumerate(self.pending):
+                if nodeid not in self.pinned:
+                    break
+                if self.pinned_node in (None, node):
+                    self.pinned_node = node
+                    break
+            else:
+                return None
+            del self.pending[index]
+            self.in_flight.setdefault(node, set()).add(nodeid)
+            self.handed_out[nodeid] = self.handed_out.get(nodeid, 0) + 1
+            return nodeid
+
+    def done(self, node, nodeid):
+        with self.lock:
+            self.in_flight.get(node, set()).discard(nodeid)
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            self.pending.clear()
+
+    def abandon(self, node):
+        """Requeue the tests a dead node was holding; return those given up on"""
+        with self.lock:
+            if self.pinned_node == node:
+                self.pinned_node = None
+            held = sorted(self.in_flight.pop(node, set()))
+            requeued = [nodeid for nodeid in held if self.handed_out[nodeid] <= MAX_REQUEUES]
+            if not self.stopped:
+                self.pending[:0] = requeued
+            return [nodeid for nodeid in held if nodeid not in requeued or self.stopped]
+
+
+def merge_junit(paths, output, elapsed_s):
+    """Combine the testcases of several JUnit files into one testsuite"""
+    suite = ET.Element("testsuite", name="pytest")
+    counts = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+    for path in paths:
+        try:
+            root = ET.parse(path).getroot()
+        except (OSError, ET.ParseError):
+            continue
+        for case in root.iter("testcase"):
+            suite.append(case)
+            counts["tests"] += 1
+            for kind, key in (("failure", "failures"), ("error", "errors"), ("skipped", "skipped")):
+                counts[key] += case.find(kind) is not None
+    for key, value in counts.items():
+        suite.set(key, str(value))
+    suite.set("time", f"{elapsed_s:.3f}")
+    root = ET.Element("testsuites")
+    root.append(suite)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(root).write(output, encoding="utf-8", xml_declaration=True)
+    return counts
+
+
+def merge_artifacts(node_dirs, output):
+    """Copy each node's Playwright output directory into one tree"""
+    copied = 0
+    for node, directory in node_dirs.items():
+        if not directory.is_dir():
+            continue
+        for entry in directory.iterdir():
+            target = output / entry.name
+            if target.exists():
+                target = output / f"{entry.name}-{node}"
+            output.mkdir(parents=True, exist_ok=True)
+            if entry.is_dir():
+                shutil.copytree(entry, target)
+            else:
+                shutil.copy2(entry, target)
+            copied += 1
+    return copied
+
+
+class CoordinatorClient:
+    def __init__(self, url, node, timeout=30.0):
+        self.url = url.rstrip("/")
+        self.node = node
+        self.timeout = timeout
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(
+            f"{self.url}{path}",
+            data=json.dumps({"node": self.node, **payload}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read() or b"{}")
+
+    def hello(self, nodeids, pinned=()):
+        return self._post("/hello", {"nodeids": nodeids, "pinned": list(pinned)})
+
+    def next(self):
+        return self._post("/next", {}).get("nodeid")
+
+    def result(self, result):
+        self._post("/result", {"result": result})
+
+    def bye(self, stop=False):
+        self._post("/bye", {"stop": stop})
+
+
+class NodeRunner:
+    """Runs the tests the coordinator hands out instead of session.items"""
+
+    def __init__(self, client):
+        self.client = client
+        self.pending = {}
+        self.failures = {}
+        self.profiles = {}
+
+    def pytest_collection_finish(self, session):
+        self.profiles = {item.nodeid: item_profile(item) for item in session.items}
+        self.client.hello(
+            [item.nodeid for item in session.items],
+            [item.nodeid for item in session.items if pinned(item)],
+        )
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        if session.config.option.collectonly:
+            return True
+        items = {item.nodeid: item for item in session.items}
+        current = self.client.next()
+        while current is not None:
+            # Hold on to the next test so fixtures are torn down at the right scope
+            following = self.client.next()
+            item = items.get(current)
+            if item is None:
+                self.client.result({
+                    "nodeid": current,
+                    "outcome": "error",
+                    "duration_s": 0.0,
+                    "longrepr": f"not collected on {self.client.node}",
+                })
+            else:
+                nextitem = items.get(following) if following is not None else None
+                item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+            if session.shouldfail or session.shouldstop:
+                self.client.bye(stop=True)
+                return True
+            current = following
+        self.client.bye()
+        return True
+
+    def pytest_runtest_logreport(self, report):
+        entry = fold_phase(self.pending, report)
+        if report.failed:
+            self.failures[report.nodeid] = report.longreprtext
+        if entry is None:
+            return
+        metrics = [
+            metric for name, value in entry["properties"] for metric in flatten_metrics(name, value)
+        ]
+        self.client.result({
+            "nodeid": report.nodeid,
+            "outcome": entry["outcome"],
+            "duration_s": round(entry["duration_s"], 4),
+            "profile": self.profiles.get(report.nodeid),
+            "metrics": metrics,
+            "longrepr": self.failures.pop(report.nodeid, None),
+        })
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("distributed", "run as a node of utils.distributed")
+    group.addoption(
+        "--dist-coordinator",
+        default=None,
+        help="URL of the coordinator to take tests from (set by utils.distributed)",
+    )
+    group.addoption(
+        "--dist-node-id",
+        default=None,
+        help="Name of this node in the coordinator's reports",
+    )
+
+
+def pytest_configure(config):
+    url = config.getoption("--dist-coordinator")
+    if not url or hasattr(config, "workerinput"):
+        return
+    node = config.getoption("--dist-node-id") or telemetry.worker_id()
+    config.pluginmanager.register(NodeRunner(CoordinatorClient(url, node)), "dist_node")
+
+
+def _make_handler(coordinator):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            route = {
+                "/hello": coordinator.on_hello,
+                "/next": coordinator.on_next,
+                "/result": coordinator.on_result,
+                "/bye": coordinator.on_bye,
+            }.get(self.path)
+            status, body = (200, route(payload)) if route else (404, {"error": "not found"})
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class Coordinator:
+    """Serves the work queue to the nodes and collects what they send back"""
+
+    def __init__(self, history=None, db=None, run_id=None, host="127.0.0.1", port=0):
+        self.history = history or {}
+        self.db = db
+        self.run_id = run_id or telemetry.run_id()
+        self.queue = WorkQueue()
+        self.results = {}
+        self.nodes = {}
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def on_hello(self, payload):
+        node, nodeids = payload["node"], payload["nodeids"]
+        with self.lock:
+            self.nodes.setdefault(node, {"tests": 0, "busy_s": 0.0})
+        planned, mismatch = self.queue.load(nodeids, self.history, payload.get("pinned", ()))
+        if planned:
+            print(f"📋 {len(nodeids)} tests queued, longest first")
+            if self.queue.pinned:
+                print(f"📌 {len(self.queue.pinned)} fake Stripe tests pinned to one node")
+        if mismatch:
+            print(f"⚠️ {node} collected {len(mismatch)} tests differently from the first node")
+        return {}
+
+    def on_next(self, payload):
+        return {"nodeid": self.queue.next(payload["node"])}
+
+    def on_result(self, payload):
+        node, result = payload["node"], payload["result"]
+        self.queue.done(node, result["nodeid"])
+        self._record(node, result)
+        return {}
+
+    def on_bye(self, payload):
+        if payload.get("stop"):
+            self.queue.stop()
+        return {}
+
+    def _record(self, node, result):
+        result = {**result, "node": node}
+        with self.lock:
+            self.results[result["nodeid"]] = result
+            stats = self.nodes.setdefault(node, {"tests": 0, "busy_s": 0.0})
+            stats["tests"] += 1
+            stats["busy_s"] += result["duration_s"]
+            done = len(self.results)
+        total = len(self.queue.nodeids or ())
+        icon = {"passed": "✅", "skipped": "⏭️", "xfailed": "⏭️"}.get(result["outcome"], "❌")
+        print(f"{icon} [{done}/{total}] {node} {result['nodeid']} {result['duration_s']:.2f}s")
+        if self.db is not None:
+            with self.lock:
+                self.db.add_result(
+                    self.run_id,
+                    result["nodeid"],
+                    result["outcome"],
+                    result["duration_s"],
+                    worker=node,
+                    profile=result.get("profile"),
+                    metrics=[tuple(metric) for metric in result.get("metrics", ())],
+                )
+
+    def node_exited(self, node, returncode):
+        """Requeue what a node was holding, or fail it if it was already retried"""
+        for nodeid in self.queue.abandon(node):
+            self._record(node, {
+                "nodeid": nodeid,
+                "outcome": "error",
+                "duration_s": 0.0,
+                "longrepr": f"{node} exited with {returncode} while running this test",
+            })
+
+    def write_results(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            results = sorted(self.results.values(), key=lambda result: result["nodeid"])
+        path.write_text(json.dumps({"run": self.run_id, "results": results}, indent=2))
+
+
+def node_command(index, coordinator_url, output_dir, pytest_args, docker=False, image=DEFAULT_IMAGE):
+    """Command line for node `index`; output paths are relative to the test root"""
+    node = f"node-{index}"
+    node_dir = output_dir / node
+    args = [
+        "--dist-coordinator", coordinator_url,
+        "--dist-node-id", node,
+        "--no-results-db",
+        f"--junitxml={node_dir / 'junit.xml'}",
+        "--output", str(node_dir / "test-results"),
+        *pytest_args,
+    ]
+    if not docker:
+        return [sys.executable, "-m", "pytest", *args]
+    env = [
+        f"{telemetry.RUN_ID_ENV}={telemetry.run_id()}",
+        f"{telemetry.NODE_ID_ENV}={node}",
+    ]
+    return [
+        "docker", "run", "--rm",
+        "--name", f"{CONTAINER_NAME}-{telemetry.run_id()}-{node}",
+        # The coordinator listens on the host's loopback interface
+        "--network", "host",
+        "-v", f"{TEST_ROOT}:/tests",
+        "-w", "/tests",
+        *[part for variable in env for part in ("-e", variable)],
+        image,
+        *args,
+    ]
+
+
+def run(nodes, pytest_args, docker=False, image=DEFAULT_IMAGE, db_path=DEFAULT_DB_PATH,
+        history_runs=50, root=TEST_ROOT):
+    """Run pytest_args across `nodes` nodes; return (exit code, merged report dir)"""
+    run_id = telemetry.run_id()
+    output_dir = DISTRIBUTED_REPORTS_DIR.relative_to(TEST_ROOT) / run_id
+    merged_dir = root / output_dir
+
+    db = ResultsDB(db_path) if db_path else None
+    history = db.durations(runs=history_runs) if db is not None else {}
+    if db is not None:
+        db.start_run(run_id, workers=nodes)
+    coordinator = Coordinator(history, db, run_id).start()
+    started = time.perf_counter()
+
+    processes = {}
+    for index in range(nodes):
+        node = f"node-{index}"
+        command = node_command(index, coordinator.url, output_dir, pytest_args, docker, image)
+        env = {
+            **os.environ,
+            telemetry.RUN_ID_ENV: run_id,
+            telemetry.NODE_ID_ENV: node,
+        }
+        (merged_dir / node).mkdir(parents=True, exist_ok=True)
+        log = open(merged_dir / node / "node.log", "w")
+        processes[node] = subprocess.Popen(
+            command, cwd=root, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+        log.close()
+    print(f"🚀 {nodes} {'container' if docker else 'process'} nodes on {coordinator.url}")
+
+    try:
+        running = dict(processes)
+        while running:
+            for node, process in list(running.items()):
+                returncode = process.poll()
+                if returncode is None:
+                    continue
+                del running[node]
+                coordinator.node_exited(node, returncode)
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        for process in processes.values():
+            process.terminate()
+        raise
+    finally:
+        coordinator.stop()
+    elapsed = time.perf_counter() - started
+
+    counts = merge_junit(
+        [merged_dir / node / "junit.xml" for node in processes], merged_dir / "junit.xml", elapsed
+    )
+    coordinator.write_results(merged_dir / "results.json")
+    artifacts = merge_artifacts(
+        {node: merged_dir / node / "test-results" for node in processes}, merged_dir / "artifacts"
+    )
+
+    results = coordinator.results.values()
+    failed = [result for result in results if result["outcome"] in ("failed", "error")]
+    missing = set(coordinator.queue.nodeids or ()) - set(coordinator.results)
+    exit_code = 1 if failed or missing or not coordinator.results else 0
+    if db is not None:
+        db.add_spans(run_id, telemetry.load_events(run_id))
+        db.finish_run(run_id, exit_code)
+        db.close()
+
+    print(f"\n📊 {len(coordinator.results)} tests on {nodes} nodes in {elapsed:.1f}s")
+    for node, stats in sorted(coordinator.nodes.items()):
+        print(f"   {node}: {stats['tests']} tests, {stats['busy_s']:.1f}s busy")
+    print(
+        f"   junit: {counts['tests']} cases, {counts['failures']} failures, "
+        f"{counts['errors']} errors; {artifacts} artifacts"
+    )
+    for result in failed:
+        print(f"❌ {result['nodeid']} on {result['node']}")
+    if missing:
+        print(f"⚠️ {len(missing)} tests never ran (see node.log files)")
+    print(f"📁 {merged_dir}")
+    return exit_code, merged_dir
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    pytest_args = []
+    if "--" in argv:
+        index = argv.index("--")
+        argv, pytest_args = argv[:index], argv[index + 1:]
+
+    parser = argparse.ArgumentParser(description="Run the suite across several nodes")
+    parser.add_argument("--nodes", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--docker", action="store_true", help="run nodes as containers")
+    parser.add_argument("--image", default=DEFAULT_IMAGE, help="image built from test/Dockerfile")
+    parser.add_argument("--results-db", default=str(DEFAULT_DB_PATH))
+    parser.add_argument("--no-results-db", action="store_true")
+    parser.add_argument("--history-runs", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    exit_code, _ = run(
+        args.nodes,
+        pytest_args,
+        docker=args.docker,
+        image=args.image,
+        db_path=None if args.no_results_db else args.results_db,
+        history_runs=args.history_runs,
+    )
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""Local stand-in for the Stripe API used by ``/api/checkout``.
+
+Implements ``POST /v1/checkout/sessions`` (and retrieval by id) with the
+validation Stripe applies to ``line_items``, returns realistic Checkout
+Session objects, and can inject latency and errors. Point the Next.js app at
+it with::
+
+    STRIPE_API_HOST=127.0.0.1 STRIPE_API_PORT=12111 STRIPE_API_PROTOCOL=http \\
+        STRIPE_SECRET_KEY=sk_test_fake npm run start
+
+Run it standalone with ``python -m utils.fake_stripe --port 12111``. Besides
+the Stripe endpoints it exposes ``GET /__fake__/calls`` and
+``POST /__fake__/reset`` for tests running in another process.
+"""
+import argparse
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode
+
+DEFAULT_PORT = 12111
+SESSION_TTL_SECONDS = 24 * 60 * 60
+_KEY_PART = re.compile(r"\[([^\]]*)\]")
+
+
+class StripeError(Exception):
+    def __init__(self, status, error_type, message, param=None, code=None):
+        super().__init__(message)
+        self.status = status
+        self.body = {
+            "error": {
+                "type": error_type,
+                "message": message,
+                **({"param": param} if param else {}),
+                **({"code": code} if code else {}),
+            }
+        }
+
+
+def parse_form(body):
+    """Decode Stripe's bracketed form encoding into nested dicts and lists"""
+    root = {}
+    for key, value in parse_qsl(body, keep_blank_values=True):
+        head = key.split("[", 1)[0]
+        parts = [head] + _KEY_PART.findall(key[len(head):])
+        node = root
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return _listify(root)
+
+
+def encode_form(params, prefix=None):
+    """Encode nested params the way the Stripe SDKs do"""
+    pairs = []
+    items = enumerate(params) if isinstance(params, list) else params.items()
+    for key, value in items:
+        name = f"{prefix}[{key}]" if prefix else str(key)
+        if isinstance(value, (dict, list)):
+            pairs.append(encode_form(value, name))
+        else:
+            pairs.append(urlencode({name: value}))
+    return "&".join(pair for pair in pairs if pair)
+
+
+def _listify(node):
+    if not isinstance(node, dict):
+        return node
+    node = {key: _listify(value) for key, value in node.items()}
+    if node and all(key.isdigit() for key in node):
+        return [node[key] for key in sorted(node, key=int)]
+    return node
+
+
+def _positive_int(value, param, allow_zero=False):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise StripeError(400, "invalid_request_error", f"Invalid integer: {value}", param)
+    if number < 0 or (number == 0 and not allow_zero):
+        raise StripeError(
+            400, "invalid_request_error", f"{param} must be greater than 0", param
+        )
+    return number
+
+
+def validate_session_params(params, known_prices=None):
+    """Validate checkout.sessions.create params; return (line_items, total)"""
+    line_items = params.get("line_items")
+    if not isinstance(line_items, list) or not line_items:
+        raise StripeError(
+            400, "invalid_request_error", "Missing required param: line_items.", "line_items"
+        )
+    if params.get("mode") not in ("payment", "subscription", "setup"):
+        raise StripeError(400, "invalid_request_error", "Invalid mode", "mode")
+    for url_param in ("success_url", "cancel_url"):
+        if params.get(url_param) and not re.match(r"https?://", params[url_param]):
+            raise StripeError(400, "invalid_request_error", "Not a valid URL", url_param)
+
+    validated = []
+    total = 0
+    for index, item in enumerate(line_items):
+        prefix = f"line_items[{index}]"
+        quantity = _positive_int(item.get("quantity"), f"{prefix}[quantity]")
+        if "price" in item:
+            price_id = item["price"]
+            if not str(price_id).startswith("price_"):
+                raise StripeError(
+                    400, "invalid_request_error", f"No such price: '{price_id}'",
+                    f"{prefix}[price]", "resource_missing",
+                )
+            unit_amount = (known_prices or {}).get(price_id)
+            if known_prices is not None and unit_amount is None:
+                raise StripeError(
+                    400, "invalid_request_error", f"No such price: '{price_id}'",
+                    f"{prefix}[price]", "resource_missing",
+                )
+            name = price_id
+        elif "price_data" in item:
+            price_data = item["price_data"]
+            if price_data.get("currency") != "jpy":
+                raise StripeError(
+                    400, "invalid_request_error",
+                    f"Invalid currency: {price_data.get('currency')}. Only jpy is enabled.",
+                    f"{prefix}[price_data][currency]",
+                )
+            unit_amount = _positive_int(
+                price_data.get("unit_amount"), f"{prefix}[price_data][unit_amount]",
+                allow_zero=True,
+            )
+            name = (price_data.get("product_data") or {}).get("name")
+            if not name:
+                raise StripeError(
+                    400, "invalid_request_error", "Missing required param: name.",
+                    f"{prefix}[price_data][product_data][name]",
+                )
+        else:
+            raise StripeError(
+                400, "invalid_request_error",
+                "You must specify either `price` or `price_data`.", prefix,
+            )
+        validated.append({"name": name, "unit_amount": unit_amount, "quantity": quantity})
+        total += (unit_amount or 0) * quantity
+    return validated, total
+
+
+class FakeStripe:
+    """Thread-safe state shared by the HTTP handler"""
+
+    def __init__(self, latency=0.0, error_rate=0.0, error_status=500, seed=None,
+                 known_prices=None):
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.sessions = {}
+        self.calls = []
+        self.idempotent_responses = {}
+        self.known_prices = known_prices
+        self.configure(latency=latency, error_rate=error_rate, error_status=error_status)
+
+    def configure(self, latency=None, error_rate=None, error_status=None):
+        """Latency is seconds, or a (min, max) range; error_rate is 0..1"""
+        if latency is not None:
+            self.latency = latency
+        if error_rate is not None:
+            self.error_rate = error_rate
+        if error_status is not None:
+            self.error_status = error_status
+
+    def reset(self):
+        with self.lock:
+            self.sessions.clear()
+            self.calls.clear()
+            self.idempotent_responses.clear()
+        self.configure(latency=0.0, error_rate=0.0, error_status=500)
+
+    def session_creations(self):
+        with self.lock:
+            return [
+                call
+                for call in self.calls
+                if call["method"] == "POST" and call["path"] == "/v1/checkout/sessions"
+            ]
+
+    def complete_session(self, session_id):
+        """Mark a session paid, as if the shopper finished Stripe Checkout"""
+        with self.lock:
+            self.sessions[session_id].update(status="complete", payment_status="paid")
+
+    def _sleep(self):
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self.random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def _maybe_fail(self):
+        with self.lock:
+            failing = self.error_rate and self.random.random() < self.error_rate
+        if not failing:
+            return
+        if self.error_status == 429:
+            raise StripeError(
+                429, "invalid_request_error",
+                "Request rate limit exceeded.", code="rate_limit",
+            )
+        raise StripeError(self.error_status, "api_error", "Injected fake Stripe failure.")
+
+    def create_session(self, params):
+        line_items, total = validate_session_params(params, self.known_prices)
+        now = int(time.time())
+        session_id = f"cs_test_{secrets.token_hex(16)}"
+        session = {
+            "id": session_id,
+            "object": "checkout.session",
+            "amount_subtotal": total,
+            "amount_total": total,
+            "cancel_url": params.get("cancel_url"),
+            "created": now,
+            "currency": "jpy",
+            "expires_at": now + SESSION_TTL_SECONDS,
+            "livemode": False,
+            "metadata": params.get("metadata", {}),
+            "mode": params.get("mode"),
+            "payment_method_types": params.get("payment_method_types", ["card"]),
+            "payment_status": "unpaid",
+            "status": "open",
+            "success_url": params.get("success_url"),
+            "url": f"https://checkout.stripe.com/c/pay/{session_id}",
+        }
+        with self.lock:
+            self.sessions[session_id] = {**session, "line_items": line_items}
+        return session
+
+    def handle(self, method, path, headers, body):
+        """Return (status, JSON body) for one API request"""
+        params = parse_form(body) if body else {}
+        with self.lock:
+            self.calls.append(
+                {
+                    "method": method,
+                    "path": path,
+                    "params": params,
+                    "body_bytes": len(body.encode("utf-8")),
+                    "received_at": time.time(),
+                }
+            )
+
+        authorization = headers.get("Authorization", "")
+        if not authorization.startswith("Bearer sk_"):
+            return 401, StripeError(
+                401, "invalid_request_error", "Invalid API Key provided."
+            ).body
+
+        idempotency_key = headers.get("Idempotency-Key")
+        if method == "POST" and idempotency_key:
+            with self.lock:
+                replay = self.idempotent_responses.get(idempotency_key)
+            if replay:
+                return replay
+
+        self._sleep()
+        try:
+            self._maybe_fail()
+            if method == "POST" and path == "/v1/checkout/sessions":
+                result = (200, self.create_session(params))
+            elif method == "GET" and path.startswith("/v1/checkout/sessions/"):
+                session = self.sessions.get(path.rsplit("/", 1)[-1])
+                if session is None:
+                    raise StripeError(
+                        404, "invalid_request_error", "No such checkout.session",
+                        "id", "resource_missing",
+                    )
+                result = (200, {k: v for k, v in session.items() if k != "line_items"})
+            else:
+                raise StripeError(404, "invalid_request_error", f"Unrecognized request URL ({method}: {path}).")
+        except StripeError as error:
+            result = (error.status, error.body)
+
+        if method == "POST" and idempotency_key and result[0] < 500:
+            with self.lock:
+                self.idempotent_responses[idempotency_key] = result
+        return result
+
+
+def _make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Request-Id", f"req_{secrets.token_hex(7)}")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _dispatch(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode("utf-8") if length else ""
+            path = self.path.split("?", 1)[0]
+            if path == "/__fake__/calls":
+                with fake.lock:
+                    return self._send(200, {"calls": list(fake.calls)})
+            if path == "/__fake__/reset":
+                fake.reset()
+                return self._send(200, {"ok": True})
+            self._send(*fake.handle(method, path, self.headers, body))
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class FakeStripeServer:
+    """Runs a FakeStripe on a background thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, **options):
+        self.fake = FakeStripe(**options)
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self.fake))
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def host(self):
+        return self.httpd.server_address[0]
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def app_env(self):
+        """Environment variables that point the Next.js app at this server"""
+        return {
+            "STRIPE_API_HOST": self.host,
+            "STRIPE_API_PORT": str(self.port),
+            "STRIPE_API_PROTOCOL": "http",
+        }
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __getattr__(self, name):
+        # configure(), reset(), calls, sessions, ... live on the FakeStripe
+        return getattr(self.fake, name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the fake Stripe API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    server = FakeStripeServer(
+        args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+        error_status=args.error_status, seed=args.seed,
+    )
+    print(f"Fake Stripe listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Per-step timing and network waterfalls for E2E journeys.
+
+Use the ``journey`` fixture inside a test::
+
+    with journey.step("Proceed to checkout"):
+        ecommerce_page.click_checkout_button()
+
+Each step records its duration and the requests that started while it ran.
+The waterfall is written to ``reports/journeys/`` as JSON, added to the
+terminal report section and, when pytest-html is installed, to the HTML
+report.
+"""
+import html
+import json
+import re
+import time
+from contextlib import contextmanager
+
+import pytest
+from tests.constants import REPORTS_DIR
+from utils.telemetry import span
+
+JOURNEY_REPORTS_DIR = REPORTS_DIR / "journeys"
+journeys_key = pytest.StashKey()
+
+# Labels that explain where a slow checkout step spent its time
+REQUEST_TAGS = [
+    ("api-checkout", re.compile(r"/api/checkout")),
+    ("stripe-js", re.compile(r"js\.stripe\.com")),
+    ("stripe-redirect", re.compile(r"checkout\.stripe\.com")),
+    ("stripe-api", re.compile(r"(api|m|r)\.stripe\.com")),
+    ("next-static", re.compile(r"/_next/")),
+]
+
+
+def tag_request(url):
+    for tag, pattern in REQUEST_TAGS:
+        if pattern.search(url):
+            return tag
+    return None
+
+
+class JourneyRecorder:
+    """Times named journey steps and the network requests made in each"""
+
+    def __init__(self, page, name):
+        self.page = page
+        self.name = name
+        self.steps = []
+        self._started = time.time() * 1000
+        self._requests = []
+        self._bounds = []
+        page.on("requestfinished", self._on_finished)
+        page.on("requestfailed", self._on_failed)
+
+    def _record(self, request, failure=None):
+        timing = request.timing
+        start = timing.get("startTime", 0) or time.time() * 1000
+        response_end = timing.get("responseEnd", -1)
+        response = None
+        if failure is None:
+            try:
+                response = request.response()
+            except Exception:
+                response = None
+        self._requests.append(
+            {
+                "method": request.method,
+                "url": request.url,
+                "resource_type": request.resource_type,
+                "status": response.status if response else None,
+                "failure": failure,
+                "tag": tag_request(request.url),
+                "start_ms": start - self._started,
+                "duration_ms": response_end if response_end >= 0 else None,
+            }
+        )
+
+    def _on_finished(self, request):
+        self._record(request)
+
+    def _on_failed(self, request):
+        self._record(request, failure=request.failure or "failed")
+
+    @contextmanager
+    def step(self, name):
+        """Time one journey step and tag the requests it triggered"""
+        number = len(self.steps) + 1
+        step = {"number": number, "name": name, "outcome": "ok"}
+        start = time.time() * 1000
+        try:
+            with span(f"journey.step: {name}", journey=self.name, step=number):
+                yield step
+        except BaseException as error:
+            step["outcome"] = f"error:{type(error).__name__}"
+            raise
+        finally:
+            end = time.time() * 1000
+            step["start_ms"] = round(start - self._started, 1)
+            step["duration_ms"] = round(end - start, 1)
+            self.steps.append(step)
+            self._bounds.append((start - self._started, end - self._started))
+
+    def waterfall(self):
+        """Assign every recorded request to the step during which it started"""
+        steps = []
+        for step, (begin, finish) in zip(self.steps, self._bounds):
+            requests = [
+                request
+                for request in self._requests
+                if begin <= request["start_ms"] < finish
+            ]
+            requests.sort(key=lambda request: request["start_ms"])
+            tagged = {}
+            for request in requests:
+                if request["tag"] and request["duration_ms"] is not None:
+                    tagged[request["tag"]] = round(
+                        tagged.get(request["tag"], 0) + request["duration_ms"], 1
+                    )
+            steps.append({**step, "requests": requests, "tagged_ms": tagged})
+        return {"journey": self.name, "steps": steps}
+
+    def detach(self):
+        try:
+            self.page.remove_listener("requestfinished", self._on_finished)
+            self.page.remove_listener("requestfailed", self._on_failed)
+        except Exception:
+            pass
+
+
+def format_waterfall(waterfall, width=40):
+    steps = waterfall["steps"]
+    if not steps:
+        return f"{waterfall['journey']}: no steps recorded"
+    total = max(step["start_ms"] + step["duration_ms"] for step in steps) or 1
+    lines = [f"{waterfall['journey']} ({total:.0f} ms)"]
+    for step in steps:
+        offset = int(step["start_ms"] / total * width)
+        length = max(1, int(step["duration_ms"] / total * width))
+        bar = " " * offset + "█" * length
+        lines.append(
+            f"{step['number']:>2}. {step['name'][:32]:<32} {step['duration_ms']:>9.0f} ms "
+            f"|{bar:<{width}}| {step['outcome']}"
+        )
+        for tag, ms in step["tagged_ms"].items():
+            lines.append(f"      {tag:<20} {ms:>9.0f} ms")
+        lines.append(f"      {len(step['requests'])} requests")
+    return "\n".join(lines)
+
+
+def waterfall_html(waterfall):
+    rows = []
+    total = (
+        max((step["start_ms"] + step["duration_ms"] for step in waterfall["steps"]), default=0)
+        or 1
+    )
+    for step in waterfall["steps"]:
+        left = step["start_ms"] / total * 100
+        width = max(0.5, step["duration_ms"] / total * 100)
+        tags = ", ".join(f"{tag}: {ms:.0f} ms" for tag, ms in step["tagged_ms"].items())
+        rows.append(
+            "<tr>"
+            f"<td>{step['number']}. {html.escape(step['name'])}</td>"
+            f"<td>{step['duration_ms']:.0f} ms</td>"
+            f"<td style='width:50%'><div style='margin-left:{left:.1f}%;width:{width:.1f}%;"
+            "background:#10b981;height:10px'></div></td>"
+            f"<td>{html.escape(tags)}</td>"
+            "</tr>"
+        )
+    return (
+        f"<h4>Journey waterfall: {html.escape(waterfall['journey'])}</h4>"
+        "<table><tr><th>Step</th><th>Duration</th><th>Timeline</th><th>Tagged requests</th></tr>"
+        + "".join(rows)
+        + "</table>"
+    )
+
+
+def _report_path(nodeid):
+    return JOURNEY_REPORTS_DIR / (re.sub(r"[^\w.-]+", "_", nodeid) + ".json")
+
+
+@pytest.fixture
+def journey(request, page):
+    """Record per-step timings and network waterfalls for an E2E journey"""
+    recorder = JourneyRecorder(page, request.node.name)
+    request.node.stash.setdefault(journeys_key, []).append(recorder)
+    yield recorder
+    recorder.detach()
+    JOURNEY_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    _report_path(request.node.nodeid).write_text(
+        json.dumps(recorder.waterfall(), indent=2), encoding="utf-8"
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    recorders = item.stash.get(journeys_key, [])
+    if report.when != "call" or not recorders:
+        return
+
+    pytest_html = item.config.pluginmanager.getplugin("html")
+    for recorder in recorders:
+        waterfall = recorder.waterfall()
+        report.sections.append(("Journey waterfall", format_waterfall(waterfall)))
+        report.user_properties.append(
+            (
+                "journey_steps",
+                [
+                    {"step": step["name"], "duration_ms": step["duration_ms"]}
+                    for step in waterfall["steps"]
+                ],
+            )
+        )
+        if pytest_html is not None:
+            extras = getattr(report, "extras", [])
+            extras.append(pytest_html.extras.html(waterfall_html(waterfall)))
+            report.extras = extras
@@ -0,0 +1,417 @@
+"""Sale-day load: a few real browser shoppers among many HTTP shoppers.
+
+A scenario is a ramp of phases. Each phase has a duration, an arrival rate of
+HTTP shoppers and a number of browser shoppers::
+
+    warm-up:30:2:1,step:60:10:2,spike:20:40:2,soak:300:10:1
+    (name:duration s:HTTP shoppers per second:browser shoppers)
+
+HTTP shoppers arrive open-loop (``utils.loadgen``): each loads ``/`` and
+some of them then post a small random cart to ``/api/checkout``. Browser
+shoppers drive the storefront through ``EcommercePage`` in their own
+Playwright instance and thread. They load the app, add a product and check
+out, and ``CheckoutInterceptor`` stops them at the Stripe redirect.
+
+Every request and browser step is attributed to the phase it started in.
+Each phase gets an SLO report per kind of traffic: latency percentiles,
+throughput, and error-budget burn. A burn of 1.0 spends the whole budget the
+SLO allows. 429s are intended backpressure. They are reported, but they only
+burn budget when they make a request slow.
+
+Both kinds of shopper hit ``LOCAL_APP_URL`` unless given another target.
+Run the app against the fake Stripe API (``utils.fake_stripe``) so a
+sale-day ramp never creates real Checkout Sessions or loads a live site.
+
+    python -m utils.load_scenario
+    python -m utils.load_scenario --ramp "step:60:20:3" --target http://localhost:3001
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+from tests.constants import (
+    CHECKOUT_CLIENT_TIMEOUT_MS,
+    CHECKOUT_FEEDBACK_BUDGET_MS,
+    CHECKOUT_TIMING_BUDGETS_MS,
+    LOCAL_APP_URL,
+    PRODUCTS,
+    REPORTS_DIR,
+)
+from utils.loadgen import REQUEST_ERRORS, RequestResult, arrivals, get, post_json
+from utils.telemetry import percentile
+
+DEFAULT_RAMP = "warm-up:30:2:1,step:60:10:2,spike:20:40:2,soak:300:10:1"
+LOAD_REPORTS_DIR = REPORTS_DIR / "load"
+BROWSER_VIEWPORT = {"width": 1280, "height": 720}
+
+
+@dataclass(frozen=True)
+class Phase:
+    name: str
+    duration_s: float
+    http_rate: float
+    browsers: int = 0
+
+
+@dataclass(frozen=True)
+class Slo:
+    """latency_target of requests finish within latency_ms; availability of
+    requests don't fail"""
+
+    latency_ms: float
+    latency_target: float = 0.95
+    availability: float = 0.99
+
+
+DEFAULT_SLOS = {
+    "page": Slo(1000),
+    "checkout": Slo(CHECKOUT_TIMING_BUDGETS_MS["total"]),
+    "browser_load": Slo(6000),
+    "browser_checkout": Slo(CHECKOUT_TIMING_BUDGETS_MS["total"] + CHECKOUT_FEEDBACK_BUDGET_MS),
+}
+
+
+def parse_ramp(spec):
+    """Phases from "name:duration_s:http_rate[:browsers],..." """
+    phases = []
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        fields = part.split(":")
+        if len(fields) not in (3, 4):
+            raise ValueError(f"Phase {part!r} is not name:duration_s:http_rate[:browsers]")
+        try:
+            phase = Phase(
+                fields[0],
+                float(fields[1]),
+                float(fields[2]),
+                int(fields[3]) if len(fields) == 4 else 0,
+            )
+        except ValueError:
+            raise ValueError(f"Phase {part!r} has a non-numeric field") from None
+        if phase.duration_s <= 0 or phase.http_rate < 0 or phase.browsers < 0:
+            raise ValueError(f"Phase {part!r} needs a positive duration and no negative load")
+        phases.append(phase)
+    if not phases:
+        raise ValueError("The ramp has no phases")
+    return phases
+
+
+def phase_at(phases, elapsed_s):
+    """The phase running elapsed_s into the scenario (the last one once it's over)"""
+    end = 0.0
+    for phase in phases:
+        end += phase.duration_s
+        if elapsed_s < end:
+            return phase
+    return phases[-1]
+
+
+def random_cart(rng=random):
+    """A cartDetails payload of one to three catalog products"""
+    cart = {}
+    for price_id in rng.sample(sorted(PRODUCTS), rng.randint(1, 3)):
+        product = PRODUCTS[price_id]
+        cart[price_id] = {
+            "id": price_id,
+            "price_id": price_id,
+            "name": product["name"],
+            "price": product["price"],
+            "quantity": rng.randint(1, 3),
+        }
+    return cart
+
+
+def kind_report(results, duration_s, slo):
+    """Percentiles, throughput and budget burn for one kind of traffic in one phase"""
+    ok_latencies = [result.latency_ms for result in results if result.ok]
+    failed = sum(result.failed for result in results)
+    answered = [result for result in results if not result.failed]
+    slow = sum(result.latency_ms > slo.latency_ms for result in answered)
+    error_rate = failed / len(results) if results else 0.0
+    slow_rate = slow / len(answered) if answered else 0.0
+    error_burn = error_rate / (1 - slo.availability)
+    latency_burn = slow_rate / (1 - slo.latency_target)
+    return {
+        "requests": len(results),
+        "ok": len(ok_latencies),
+        "limited": sum(result.status == 429 for result in results),
+        "failed": failed,
+        "throughput_per_s": round(len(ok_latencies) / duration_s, 2),
+        "p50_ms": round(percentile(ok_latencies, 0.50), 1),
+        "p95_ms": round(percentile(ok_latencies, 0.95), 1),
+        "p99_ms": round(percentile(ok_latencies, 0.99), 1),
+        "error_rate": round(error_rate, 4),
+        "error_budget_burn": round(error_burn, 2),
+        "latency_budget_burn": round(latency_burn, 2),
+        "slo": {
+            "latency_ms": slo.latency_ms,
+            "latency_target": slo.latency_target,
+            "availability": slo.availability,
+        },
+        "met": error_burn <= 1.0 and latency_burn <= 1.0,
+    }
+
+
+def slo_report(samples, phases, slos=None):
+    """Per-phase and whole-run SLO reports from (phase name, kind, RequestResult) samples"""
+    slos = slos or DEFAULT_SLOS
+    by_phase = {}
+    for phase_name, kind, result in samples:
+        by_phase.setdefault(phase_name, {}).setdefault(kind, []).append(result)
+
+    def section(name, duration_s, kinds, **details):
+        return {
+            "name": name,
+            "duration_s": duration_s,
+            **details,
+            "kinds": {
+                kind: kind_report(results, duration_s, slos[kind])
+                for kind, results in sorted(kinds.items())
+                if kind in slos
+            },
+        }
+
+    report_phases = [
+        section(
+            phase.name,
+            phase.duration_s,
+            by_phase.get(phase.name, {}),
+            http_rate=phase.http_rate,
+            browsers=phase.browsers,
+        )
+        for phase in phases
+    ]
+    everything = {}
+    for kinds in by_phase.values():
+        for kind, results in kinds.items():
+            everything.setdefault(kind, []).extend(results)
+    overall = section("overall", sum(phase.duration_s for phase in phases), everything)
+    return {
+        "phases": report_phases,
+        "overall": overall,
+        "met": all(
+            kind["met"] for phase in report_phases for kind in phase["kinds"].values()
+        ),
+    }
+
+
+def format_slo_report(report):
+    lines = []
+    for phase in [*report["phases"], report["overall"]]:
+        if "http_rate" in phase:
+            title = (
+                f"{phase['name']}: {phase['duration_s']:g}s, {phase['http_rate']:g} HTTP "
+                f"shoppers/s, {phase['browsers']} browser shoppers"
+            )
+        else:
+            title = f"{phase['name']}: {phase['duration_s']:g}s"
+        lines.append(title)
+        lines.append(
+            "  kind             |    n |  ok/s |   p50 ms |   p95 ms |   p99 ms "
+            "|  429 | failed | err burn | lat burn"
+        )
+        for kind, stats in phase["kinds"].items():
+            lines.append(
+                f"  {'✅' if stats['met'] else '❌'} {kind:<14} | {stats['requests']:>4} "
+                f"| {stats['throughput_per_s']:>5.1f} | {stats['p50_ms']:>8.1f} "
+                f"| {stats['p95_ms']:>8.1f} | {stats['p99_ms']:>8.1f} | {stats['limited']:>4} "
+                f"| {stats['failed']:>6} | {stats['error_budget_burn']:>8.2f} "
+                f"| {stats['latency_budget_burn']:>8.2f}"
+            )
+    lines.append(
+        "✅ SLOs met in every phase" if report["met"] else "❌ SLOs missed in at least one phase"
+    )
+    return "\n".join(lines)
+
+
+def save_report(report, name, directory=LOAD_REPORTS_DIR):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.json"
+    path.write_text(json.dumps(report, indent=2))
+    return path
+
+
+class LoadScenario:
+    """Runs a ramp of phases and collects (phase, kind, RequestResult) samples"""
+
+    def __init__(self, phases, target_url=LOCAL_APP_URL, browser_name="chromium",
+                 launch_args=None, checkout_ratio=0.3, think_time_s=(0.2, 1.0),
+                 timeout_s=10.0, slos=None, seed=None):
+        self.phases = phases
+        self.target_url = target_url.rstrip("/")
+        self.browser_name = browser_name
+        self.launch_args = launch_args or {}
+        self.checkout_ratio = checkout_ratio
+        self.think_time_s = think_time_s
+        self.timeout_s = timeout_s
+        self.slos = slos or DEFAULT_SLOS
+        self.rng = random.Random(seed)
+        self.samples = []
+        self.browser_errors = []
+        self._lock = threading.Lock()
+        self._started = None
+
+    @property
+    def duration_s(self):
+        return sum(phase.duration_s for phase in self.phases)
+
+    def elapsed(self):
+        return time.monotonic() - self._started
+
+    def record(self, phase, kind, result):
+        with self._lock:
+            self.samples.append((phase.name, kind, result))
+
+    def run(self):
+        """Run every phase and return the SLO report"""
+        self._started = time.monotonic()
+        shoppers = [
+            threading.Thread(
+                target=self._browser_shopper, args=(slot,), name=f"browser-shopper-{slot}"
+            )
+            for slot in range(max(phase.browsers for phase in self.phases))
+        ]
+        for thread in shoppers:
+            thread.start()
+        try:
+            asyncio.run(self._http_shoppers())
+        finally:
+            for thread in shoppers:
+                thread.join()
+        if self.browser_errors:
+            raise RuntimeError(f"Browser shoppers crashed: {'; '.join(self.browser_errors)}")
+        return slo_report(self.samples, self.phases, self.slos)
+
+    async def _timed(self, phase, kind, request):
+        result = RequestResult(started_s=self.elapsed(), latency_ms=0.0)
+        started = time.monotonic()
+        try:
+            result.status, result.headers = await request
+        except REQUEST_ERRORS as error:
+            result.error = f"{type(error).__name__}: {error}"
+        result.latency_ms = (time.monotonic() - started) * 1000
+        self.record(phase, kind, result)
+        return result
+
+    async def _http_shopper(self, phase):
+        page = await self._timed(phase, "page", get(f"{self.target_url}/", self.timeout_s))
+        if not page.ok or self.rng.random() >= self.checkout_ratio:
+            return
+        await asyncio.sleep(self.rng.uniform(*self.think_time_s))
+        payload = {"cartDetails": random_cart(self.rng)}
+        await self._timed(
+            phase,
+            "checkout",
+            post_json(f"{self.target_url}/api/checkout", payload, self.timeout_s),
+        )
+
+    async def _http_shoppers(self):
+        tasks = []
+        phase_end = 0.0
+        for phase in self.phases:
+            phase_end += phase.duration_s
+            if phase.http_rate:
+                async for _ in arrivals(phase.http_rate, phase.duration_s):
+                    tasks.append(asyncio.create_task(self._http_shopper(phase)))
+            # Arrivals stop one interval early; keep phases aligned to the clock
+            await asyncio.sleep(max(0.0, phase_end - self.elapsed()))
+        await asyncio.gather(*tasks)
+
+    def _browser_shopper(self, slot):
+        # Playwright's sync API is bound to the thread that started it
+        from playwright.sync_api import sync_playwright
+
+        try:
+            with sync_playwright() as playwright:
+                browser = getattr(playwright, self.browser_name).launch(**self.launch_args)
+                try:
+                    while self.elapsed() < self.duration_s:
+                        phase = phase_at(self.phases, self.elapsed())
+                        if slot >= phase.browsers:
+                            time.sleep(0.25)
+                            continue
+                        self._browser_journey(browser, phase)
+                finally:
+                    browser.close()
+        except Exception as error:
+            self.browser_errors.append(f"shopper {slot}: {type(error).__name__}: {error}")
+
+    @contextlib.contextmanager
+    def _step(self, phase, kind):
+        result = RequestResult(started_s=self.elapsed(), latency_ms=0.0, status=200)
+        started = time.monotonic()
+        try:
+            yield result
+        except Exception as error:
+            result.error = f"{type(error).__name__}: {error}"
+            raise
+        finally:
+            result.latency_ms = (time.monotonic() - started) * 1000
+            self.record(phase, kind, result)
+
+    def _browser_journey(self, browser, phase):
+        """Load the storefront, add a product and check out up to the Stripe redirect"""
+        from pages.main import EcommercePage
+        from playwright.sync_api import Error
+        from utils.checkout_interceptor import CheckoutInterceptor
+
+        context = browser.new_context(viewport=BROWSER_VIEWPORT)
+        try:
+            page = context.new_page()
+            page.set_default_timeout(self.timeout_s * 1000)
+            interceptor = CheckoutInterceptor(page)
+            shop = EcommercePage(page)
+            with self._step(phase, "browser_load"):
+                shop.navigate_to_app(f"{self.target_url}/")
+                shop.add_to_cart_buttons.first.wait_for()
+            shop.add_product_to_cart_by_index(
+                self.rng.randrange(shop.add_to_cart_buttons.count())
+            )
+            shop.open_cart_panel()
+            with self._step(phase, "browser_checkout") as result:
+                with page.expect_response("**/api/checkout") as response:
+                    shop.checkout_button.first.click()
+                result.status = response.value.status
+                if result.status == 200:
+                    interceptor.wait_for_redirect(timeout=CHECKOUT_CLIENT_TIMEOUT_MS)
+        except Error:
+            # Already recorded against the step that failed
+            pass
+        finally:
+            context.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a ramped sale-day load scenario")
+    parser.add_argument("--ramp", default=DEFAULT_RAMP,
+                        help="name:duration_s:http_rate[:browsers],... (default %(default)s)")
+    parser.add_argument("--target", default=LOCAL_APP_URL,
+                        help="app under load (default %(default)s)")
+    parser.add_argument("--checkout-ratio", type=float, default=0.3)
+    parser.add_argument("--browser", default="chromium",
+                        choices=["chromium", "firefox", "webkit"])
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    try:
+        phases = parse_ramp(args.ramp)
+    except ValueError as error:
+        parser.error(str(error))
+
+    scenario = LoadScenario(
+        phases, args.target, args.browser, checkout_ratio=args.checkout_ratio, seed=args.seed
+    )
+    print(f"📈 {len(phases)} phases over {scenario.duration_s:g}s against {args.target}")
+    report = scenario.run()
+    path = save_report(report, time.strftime("%Y%m%d-%H%M%S"))
+    print(format_slo_report(report))
+    print(f"💾 {path}")
+    return 0 if report["met"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
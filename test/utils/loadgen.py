@@ -0,0 +1,170 @@
+"""Open-loop HTTP load generation on asyncio, without third-party clients.
+
+Requests are started on a fixed arrival schedule whether or not earlier ones
+have finished, which is how real overload behaves: a sale doesn't wait for
+the server to catch up. Results are bucketed into time windows so tests can
+check that throughput stays flat and errors stay bounded while overloaded.
+"""
+import asyncio
+import json
+import ssl
+from collections import Counter
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from utils.telemetry import percentile
+
+# What a request can fail with: refused or reset connections, timeouts and
+# malformed status lines
+REQUEST_ERRORS = (OSError, asyncio.TimeoutError, ValueError, IndexError)
+
+
+@dataclass
+class RequestResult:
+    started_s: float
+    latency_ms: float
+    status: int = None
+    headers: dict = field(default_factory=dict)
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.status == 200
+
+    @property
+    def failed(self):
+        """Transport errors and 5xx; 429s are intended backpressure"""
+        return self.error is not None or (self.status or 0) >= 500
+
+
+async def send(method, url, body=b"", content_type=None, timeout=10.0):
+    """One request over a fresh connection; return (status, lowercased headers)"""
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    target = parts.path or "/"
+    if parts.query:
+        target += f"?{parts.query}"
+    head = f"{method} {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+    if content_type:
+        head += f"Content-Type: {content_type}\r\n"
+    if body:
+        head += f"Content-Length: {len(body)}\r\n"
+    request = (head + "Connection: close\r\n\r\n").encode("ascii") + body
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=ssl.create_default_context() if secure else None
+        )
+        try:
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            await reader.read()
+            return int(status_line.split()[1]), headers
+        finally:
+            writer.close()
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+async def post_json(url, payload, timeout=10.0):
+    """POST JSON over a fresh connection; return (status, lowercased headers)"""
+    body = json.dumps(payload).encode("utf-8")
+    return await send("POST", url, body, "application/json", timeout)
+
+
+async def get(url, timeout=10.0):
+    """GET over a fresh connection, reading the whole body; return (status, headers)"""
+    return await send("GET", url, timeout=timeout)
+
+
+async def arrivals(rate_per_second, duration_s):
+    """Yield (index, scheduled offset) on a fixed schedule for duration_s seconds"""
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    for index in range(int(rate_per_second * duration_s)):
+        scheduled_s = index / rate_per_second
+        delay = begin + scheduled_s - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        yield index, scheduled_s
+
+
+async def run_open_loop(url, payload_factory, rate_per_second, duration_s, timeout=10.0):
+    """Start rate_per_second requests every second for duration_s seconds"""
+    loop = asyncio.get_running_loop()
+    results = []
+
+    async def one(index, scheduled_s):
+        started = loop.time()
+        result = RequestResult(started_s=scheduled_s, latency_ms=0.0)
+        try:
+            result.status, result.headers = await post_json(url, payload_factory(index), timeout)
+        except REQUEST_ERRORS as error:
+            result.error = f"{type(error).__name__}: {error}"
+        result.latency_ms = (loop.time() - started) * 1000
+        results.append(result)
+
+    tasks = []
+    async for index, scheduled_s in arrivals(rate_per_second, duration_s):
+        tasks.append(asyncio.create_task(one(index, scheduled_s)))
+    await asyncio.gather(*tasks)
+    return sorted(results, key=lambda result: result.started_s)
+
+
+def run_load(url, payload_factory, rate_per_second, duration_s, timeout=10.0):
+    """Synchronous wrapper around run_open_loop for pytest tests"""
+    return asyncio.run(
+        run_open_loop(url, payload_factory, rate_per_second, duration_s, timeout)
+    )
+
+
+def summarize_load(results, window_s=1.0):
+    """Per-window throughput and status counts plus overall error rate and latency"""
+    windows = {}
+    for result in results:
+        window = windows.setdefault(
+            int(result.started_s // window_s), {"sent": 0, "ok": 0, "limited": 0, "failed": 0}
+        )
+        window["sent"] += 1
+        window["ok"] += result.ok
+        window["limited"] += result.status == 429
+        window["failed"] += result.failed
+
+    ok_latencies = [result.latency_ms for result in results if result.ok]
+    statuses = Counter(result.status or "error" for result in results)
+    return {
+        "requests": len(results),
+        "statuses": dict(statuses),
+        "error_rate": (
+            sum(result.failed for result in results) / len(results) if results else 0.0
+        ),
+        "ok_p50_ms": round(percentile(ok_latencies, 0.50), 1),
+        "ok_p95_ms": round(percentile(ok_latencies, 0.95), 1),
+        "windows": [
+            {"window": index * window_s, **windows[index]} for index in sorted(windows)
+        ],
+    }
+
+
+def format_load_summary(summary):
+    lines = [
+        f"{summary['requests']} requests, statuses {summary['statuses']}, "
+        f"error rate {summary['error_rate']:.1%}, "
+        f"200 p50 {summary['ok_p50_ms']} ms / p95 {summary['ok_p95_ms']} ms",
+        "   t(s) | sent |  200 |  429 | failed",
+    ]
+    for window in summary["windows"]:
+        lines.append(
+            f"  {window['window']:>5.1f} | {window['sent']:>4} | {window['ok']:>4} "
+            f"| {window['limited']:>4} | {window['failed']:>6}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,148 @@
+"""Cross-browser matrix: the market, cart and checkout suites on every engine at once.
+
+``pytest.ini`` pins Chromium through Chrome, so the compatibility matrix in
+``documents/TESTCASES.md`` normally means three separate runs. Here a single
+``utils.distributed`` run does all of them. Every node collects the suites
+once per engine (pytest-playwright parametrizes each test by
+``--browser``), so Chromium, Firefox and WebKit tests share one work queue.
+The nodes connect to one shared browser server per engine
+(``utils.browser_server``) rather than launching their own.
+
+    python -m utils.matrix                         # 3 nodes, all engines
+    python -m utils.matrix --nodes 6 --engines chromium webkit
+    python -m utils.matrix -- -m "not slow"        # extra pytest arguments
+
+The grid of outcomes and durations per test and engine is printed at the end
+and saved as ``matrix.json`` next to the merged reports.
+"""
+import argparse
+import json
+import sys
+
+from utils import telemetry
+from utils.browser_server import SharedBrowserServer
+from utils.distributed import DEFAULT_IMAGE, run
+from utils.results_db import DEFAULT_DB_PATH
+
+ENGINES = ("chromium", "firefox", "webkit")
+MATRIX_SUITES = [
+    "tests/ui/test_market_functionality.py",
+    "tests/ui/test_cart_functionality.py",
+    "tests/ui/test_payment_functionality.py",
+]
+OUTCOME_ICONS = {"passed": "✅", "skipped": "⏭️", "xfailed": "⏭️"}
+
+
+def split_engine(nodeid, engines=ENGINES):
+    """("path::test[param]", "webkit") from "path::test[webkit-param]" """
+    head, bracket, params = nodeid.partition("[")
+    if not bracket:
+        return nodeid, None
+    parts = params.rstrip("]").split("-")
+    for engine in engines:
+        if engine in parts:
+            parts.remove(engine)
+            rest = "-".join(parts)
+            return (f"{head}[{rest}]" if rest else head), engine
+    return nodeid, None
+
+
+def build_grid(results, engines=ENGINES):
+    """{test: {engine: result}} and per-engine totals from distributed results"""
+    grid = {}
+    totals = {
+        engine: {"passed": 0, "failed": 0, "skipped": 0, "duration_s": 0.0} for engine in engines
+    }
+    for result in results:
+        test, engine = split_engine(result["nodeid"], engines)
+        if engine is None:
+            continue
+        grid.setdefault(test, {})[engine] = result
+        bucket = {"passed": "passed", "skipped": "skipped", "xfailed": "skipped"}.get(
+            result["outcome"], "failed"
+        )
+        totals[engine][bucket] += 1
+        totals[engine]["duration_s"] += result["duration_s"]
+    return grid, totals
+
+
+def format_grid(grid, totals, engines=ENGINES):
+    width = max([len("passed/failed/skipped"), *(len(test) for test in grid)])
+    lines = [f"{'test'.ljust(width)} | " + " | ".join(engine.center(12) for engine in engines)]
+    lines.append("-" * len(lines[0]))
+    for test in sorted(grid):
+        cells = []
+        for engine in engines:
+            result = grid[test].get(engine)
+            if result is None:
+                cells.append("-".center(12))
+            else:
+                icon = OUTCOME_ICONS.get(result["outcome"], "❌")
+                cells.append(f"{icon} {result['duration_s']:>9.2f}s")
+        lines.append(f"{test.ljust(width)} | " + " | ".join(cells))
+    lines.append("-" * len(lines[0]))
+    lines.append(
+        f"{'passed/failed/skipped'.ljust(width)} | "
+        + " | ".join(
+            "{passed}/{failed}/{skipped}".format(**totals[engine]).center(12) for engine in engines
+        )
+    )
+    lines.append(
+        f"{'total time'.ljust(width)} | "
+        + " | ".join(f"{totals[engine]['duration_s']:.1f}s".center(12) for engine in engines)
+    )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    extra_args = []
+    if "--" in argv:
+        index = argv.index("--")
+        argv, extra_args = argv[:index], argv[index + 1:]
+
+    parser = argparse.ArgumentParser(description="Run the cross-browser matrix")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--nodes", type=int, default=len(ENGINES))
+    parser.add_argument("--suites", nargs="+", default=MATRIX_SUITES)
+    parser.add_argument("--docker", action="store_true", help="run nodes as containers")
+    parser.add_argument("--image", default=DEFAULT_IMAGE)
+    parser.add_argument("--results-db", default=str(DEFAULT_DB_PATH))
+    parser.add_argument("--no-results-db", action="store_true")
+    args = parser.parse_args(argv)
+
+    pytest_args = [
+        *args.suites,
+        *[part for engine in args.engines for part in ("--browser", engine)],
+        "--shared-browser", "on",
+        # pytest.ini pins --browser chromium --browser-channel chrome
+        "-o", "addopts=-v -ra --tb=short",
+        *extra_args,
+    ]
+    try:
+        exit_code, merged_dir = run(
+            args.nodes,
+            pytest_args,
+            docker=args.docker,
+            image=args.image,
+            db_path=None if args.no_results_db else args.results_db,
+        )
+    finally:
+        # Nodes leave the per-engine servers running for each other
+        for engine in args.engines:
+            server = SharedBrowserServer(telemetry.run_id(), engine, {})
+            if server.state_path.exists():
+                server.shutdown()
+
+    results = json.loads((merged_dir / "results.json").read_text())["results"]
+    grid, totals = build_grid(results, args.engines)
+    (merged_dir / "matrix.json").write_text(
+        json.dumps({"engines": args.engines, "totals": totals, "grid": grid}, indent=2)
+    )
+    print("\n🌐 Cross-browser matrix")
+    print(format_grid(grid, totals, args.engines))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
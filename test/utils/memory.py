@@ -0,0 +1,146 @@
+"""JS heap and DOM growth sampling for long-running browser sessions"""
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+@dataclass
+class MemorySample:
+    cycle: int
+    elapsed: float
+    js_heap_used: int
+    js_heap_total: int
+    dom_nodes: int
+    event_listeners: int
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class GrowthFinding:
+    metric: str
+    start: float
+    end: float
+    growth: float
+    threshold: float
+
+    def __str__(self):
+        return (
+            f"{self.metric} grew monotonically from {self.start:.0f} to "
+            f"{self.end:.0f} (+{self.growth:.0f}, threshold {self.threshold:.0f})"
+        )
+
+
+def find_monotonic_growth(values, threshold, tolerance=0.0):
+    """Return the total growth if values never drop by more than tolerance and
+    grow past threshold overall, otherwise None"""
+    if len(values) < 3:
+        return None
+    for previous, current in zip(values, values[1:]):
+        if current < previous - tolerance:
+            return None
+    growth = values[-1] - values[0]
+    return growth if growth > threshold else None
+
+
+class MemorySampler:
+    """Samples heap usage and DOM node counts for a single page.
+
+    Uses the Chromium DevTools protocol when available so that garbage can be
+    collected before every sample; other engines fall back to
+    ``performance.memory`` and a DOM walk.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.samples = []
+        self._started = time.perf_counter()
+        try:
+            self.cdp = page.context.new_cdp_session(page)
+            self.cdp.send("Performance.enable")
+            self.cdp.send("HeapProfiler.enable")
+        except Exception:
+            self.cdp = None
+
+    @property
+    def supports_heap_snapshots(self):
+        return self.cdp is not None
+
+    def sample(self, cycle):
+        """Force a GC where possible and record a MemorySample"""
+        if self.cdp is not None:
+            self.cdp.send("HeapProfiler.collectGarbage")
+            metrics = {
+                metric["name"]: metric["value"]
+                for metric in self.cdp.send("Performance.getMetrics")["metrics"]
+            }
+            sample = MemorySample(
+                cycle=cycle,
+                elapsed=time.perf_counter() - self._started,
+                js_heap_used=int(metrics.get("JSHeapUsedSize", 0)),
+                js_heap_total=int(metrics.get("JSHeapTotalSize", 0)),
+                dom_nodes=int(metrics.get("Nodes", 0)),
+                event_listeners=int(metrics.get("JSEventListeners", 0)),
+            )
+        else:
+            metrics = self.page.evaluate(
+                """() => ({
+                    used: performance.memory ? performance.memory.usedJSHeapSize : 0,
+                    total: performance.memory ? performance.memory.totalJSHeapSize : 0,
+                    nodes: document.getElementsByTagName('*').length,
+                })"""
+            )
+            sample = MemorySample(
+                cycle=cycle,
+                elapsed=time.perf_counter() - self._started,
+                js_heap_used=int(metrics["used"]),
+                js_heap_total=int(metrics["total"]),
+                dom_nodes=int(metrics["nodes"]),
+                event_listeners=0,
+            )
+        self.samples.append(sample)
+        return sample
+
+    def check_growth(self, heap_threshold, dom_threshold, warmup=1, heap_tolerance=0.0):
+        """Return GrowthFinding objects for metrics that grew monotonically"""
+        samples = self.samples[warmup:]
+        findings = []
+        for metric, threshold, tolerance in (
+            ("js_heap_used", heap_threshold, heap_tolerance),
+            ("dom_nodes", dom_threshold, 0.0),
+        ):
+            values = [getattr(sample, metric) for sample in samples]
+            growth = find_monotonic_growth(values, threshold, tolerance)
+            if growth is not None:
+                findings.append(
+                    GrowthFinding(metric, values[0], values[-1], growth, threshold)
+                )
+        return findings
+
+    def save_heap_snapshot(self, path):
+        """Write a .heapsnapshot file loadable in Chrome DevTools"""
+        if self.cdp is None:
+            return None
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        chunks = []
+
+        def on_chunk(params):
+            chunks.append(params["chunk"])
+
+        self.cdp.on("HeapProfiler.addHeapSnapshotChunk", on_chunk)
+        try:
+            self.cdp.send("HeapProfiler.takeHeapSnapshot", {"reportProgress": False})
+        finally:
+            self.cdp.remove_listener("HeapProfiler.addHeapSnapshotChunk", on_chunk)
+        path.write_text("".join(chunks), encoding="utf-8")
+        return path
+
+    def detach(self):
+        if self.cdp is not None:
+            try:
+                self.cdp.detach()
+            except Exception:
+                pass
+            self.cdp = None
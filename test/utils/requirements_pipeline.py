@@ -0,0 +1,380 @@
+"""Incremental requirements-to-test-case pipeline over ``documents/``.
+
+The hand-maintained documents (``REQUIREMENTS.md``, ``TESTCASES.md``,
+``COMPREHENSIVE_TEST_STRATEGY.md``) are split into sections at their
+markdown headings, ignoring ``#`` lines inside code fences. Each section is
+content-hashed. The index in ``data/generated_data/requirements_index.json``
+keeps, per section:
+
+* its requirement IDs: ``UC-001`` style IDs, numbered headings such as
+  ``1.3.2``, and ``<!-- req: CART-LIMIT -->`` annotations, each with a hash
+  of the text it covers (and, for annotations, that line's keywords);
+* the test cases drafted from it (one per bullet or numbered step);
+* the test functions under ``tests/`` linked to it, by explicit ID mentions
+  or by shared keywords between the section and the test's name and
+  docstring.
+
+On later runs, only the sections whose hash changed are drafted and linked
+again. When test files change, only those files are re-parsed, and their
+tests are re-linked against all sections. A rerun after editing one
+section therefore does work proportional to that section, not to the whole
+folder. The drafting step is a parameter, so a slower generator gets the
+same incremental behaviour.
+
+    python -m utils.requirements_pipeline            # update the index
+    python -m utils.requirements_pipeline --force    # rebuild everything
+    python -m utils.requirements_pipeline --show UC-002
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from tests.constants import TEST_ROOT
+
+DOCUMENTS_DIR = TEST_ROOT.parent / "documents"
+DOCUMENTS = ["REQUIREMENTS.md", "TESTCASES.md", "COMPREHENSIVE_TEST_STRATEGY.md"]
+TESTS_DIR = TEST_ROOT / "tests"
+INDEX_PATH = TEST_ROOT / "data" / "generated_data" / "requirements_index.json"
+INDEX_VERSION = 3
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_USE_CASE_ID = re.compile(r"\b((?:UC|TC|BR|REQ)-\d+)\b")
+_NUMBERED = re.compile(r"^(\d+(?:\.\d+)+)\s")
+_ANNOTATION = re.compile(r"<!--\s*req:\s*([A-Za-z0-9_.-]+)\s*-->")
+_BOLD = re.compile(r"\*\*([^*]+?):?\*\*")
+_ITEM = re.compile(r"^\s*(?:[-*]|\d+\.)\s+(.*)$")
+_WORD = re.compile(r"[a-z][a-z0-9]+")
+STOPWORDS = {
+    "and", "are", "can", "for", "from", "has", "into", "its", "not", "test", "tests",
+    "testing", "that", "the", "this", "user", "when", "with", "should", "page", "check",
+    "checks", "verify", "functionality",
+    # Use case template labels
+    "actor", "goal", "flow", "business", "value", "precondition", "trigger", "scenario",
+}
+# Shared keywords needed to link a test to a section without an explicit ID
+MIN_KEYWORD_OVERLAP = 2
+
+
+@dataclass
+class Section:
+    document: str
+    title: str
+    level: int
+    line: int
+    path: list
+    body: str
+
+    @property
+    def key(self):
+        return f"{self.document}#{'/'.join(_slug(part) for part in self.path)}"
+
+    @property
+    def content_hash(self):
+        digest = hashlib.sha256(self.title.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update("\n".join(line.rstrip() for line in self.body.splitlines()).encode("utf-8"))
+        return digest.hexdigest()
+
+
+@dataclass
+class LinkedTest:
+    nodeid: str
+    keywords: list
+    mentions: list = field(default_factory=list)
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "section"
+
+
+def _stem(word):
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def keywords(text):
+    return sorted({_stem(word) for word in _WORD.findall(text.lower()) if word not in STOPWORDS})
+
+
+def split_sections(text, document):
+    """Split markdown into sections at headings outside code fences"""
+    sections = []
+    stack = []
+    current = None
+    body = []
+    in_fence = False
+    for number, line in enumerate(text.splitlines(), start=1):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match is None:
+            body.append(line)
+            continue
+        if current is not None:
+            current.body = "\n".join(body).strip("\n")
+            sections.append(current)
+        level, title = len(match.group(1)), match.group(2).strip()
+        stack = [entry for entry in stack if entry[0] < level] + [(level, title)]
+        current = Section(document, title, level, number, [entry[1] for entry in stack], "")
+        body = []
+    if current is not None:
+        current.body = "\n".join(body).strip("\n")
+        sections.append(current)
+    return sections
+
+
+def requirement_ids(section):
+    """IDs a section defines: its own heading ID plus annotations"""
+    ids = []
+    title_ids = _USE_CASE_ID.findall(section.title)
+    numbered = _NUMBERED.match(section.title)
+    if title_ids:
+        ids += title_ids
+    elif numbered:
+        ids.append(numbered.group(1))
+    ids += _ANNOTATION.findall(section.body)
+    return list(dict.fromkeys(ids))
+
+
+def requirement_texts(section):
+    """{requirement ID: text} for the IDs a section defines.
+
+    An annotated ID covers its own line; a heading ID covers the whole section.
+    """
+    texts = {}
+    for line in section.body.splitlines():
+        for requirement_id in _ANNOTATION.findall(line):
+            text = _ANNOTATION.sub("", line).replace("**", "").strip(" -*")
+            texts[requirement_id] = text
+    for requirement_id in requirement_ids(section):
+        texts.setdefault(requirement_id, f"{section.title}\n{section.body}")
+    return texts
+
+
+def requirement_hashes(section):
+    """{requirement ID: content hash} for the IDs a section defines"""
+    return {
+        requirement_id: hashlib.sha256(text.encode("utf-8")).hexdigest()
+        for requirement_id, text in requirement_texts(section).items()
+    }
+
+
+def requirement_keywords(section):
+    """{requirement ID: keywords} for the IDs annotated on a line of their own"""
+    annotated = set(_ANNOTATION.findall(section.body))
+    return {
+        requirement_id: keywords(text)
+        for requirement_id, text in requirement_texts(section).items()
+        if requirement_id in annotated
+    }
+
+
+def section_keywords(section):
+    """Keywords from the title and the bold labels of the section's bullets"""
+    terms = " ".join([re.sub(r"^[\d.]+\s+", "", section.title), *_BOLD.findall(section.body)])
+    return keywords(terms)
+
+
+def draft_test_cases(section):
+    """Draft one test case per bullet or numbered step of a section"""
+    cases = []
+    prefix = (requirement_ids(section) or [_slug(section.title)])[0]
+    for line in section.body.splitlines():
+        match = _ITEM.match(line)
+        if not match:
+            continue
+        text = _ANNOTATION.sub("", match.group(1)).replace("**", "").strip()
+        if text:
+            cases.append({"id": f"{prefix}-TC{len(cases) + 1:02d}", "title": f"Verify {text}"})
+    return cases
+
+
+def parse_tests(path, root=TEST_ROOT):
+    """Test functions in a test file, with their keywords and ID mentions"""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return []
+    relative = path.relative_to(root).as_posix()
+    tests = []
+
+    def visit(node, prefix):
+        for child in node.body:
+            if isinstance(child, ast.ClassDef) and child.name.startswith("Test"):
+                visit(child, prefix + [child.name])
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) and (
+                child.name.startswith("test_")
+            ):
+                docstring = ast.get_docstring(child) or ""
+                text = " ".join([*prefix, child.name.replace("_", " "), docstring])
+                tests.append(LinkedTest(
+                    "::".join([relative, *prefix, child.name]),
+                    keywords(re.sub(r"(?<=[a-z])(?=[A-Z])", " ", text)),
+                    _USE_CASE_ID.findall(docstring),
+                ))
+
+    visit(tree, [])
+    return tests
+
+
+def link_tests(entry, tests):
+    """Test node IDs linked to an indexed section"""
+    ids = set(entry["requirement_ids"])
+    section_words = set(entry["keywords"])
+    linked = []
+    for test in tests:
+        if ids & set(test["mentions"]):
+            linked.append(test["nodeid"])
+        elif len(section_words & set(test["keywords"])) >= MIN_KEYWORD_OVERLAP:
+            linked.append(test["nodeid"])
+    return sorted(linked)
+
+
+def _file_hash(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class RequirementsPipeline:
+    def __init__(self, documents_dir=DOCUMENTS_DIR, documents=DOCUMENTS, tests_dir=TESTS_DIR,
+                 index_path=INDEX_PATH, draft=draft_test_cases):
+        self.documents_dir = Path(documents_dir)
+        self.documents = documents
+        self.tests_dir = Path(tests_dir)
+        self.test_root = self.tests_dir.parent
+        self.index_path = Path(index_path)
+        self.draft = draft
+
+    def load_index(self):
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            index = {}
+        if index.get("version") != INDEX_VERSION:
+            index = {"version": INDEX_VERSION, "sections": {}, "test_files": {}}
+        return index
+
+    def save_index(self, index):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        temporary.write_text(json.dumps(index, indent=2, ensure_ascii=False) + "\n", "utf-8")
+        os.replace(temporary, self.index_path)
+
+    def _update_tests(self, index, force):
+        """Re-parse changed test files.
+
+        Returns (all tests, tests from changed files, changed or removed files).
+        """
+        previous = index["test_files"]
+        current = {}
+        changed_tests = []
+        changed_files = set()
+        for path in sorted(self.tests_dir.rglob("test_*.py")):
+            relative = path.relative_to(self.test_root).as_posix()
+            digest = _file_hash(path)
+            entry = previous.get(relative)
+            if entry is None or entry["hash"] != digest or force:
+                entry = {
+                    "hash": digest,
+                    "tests": [asdict(test) for test in parse_tests(path, self.test_root)],
+                }
+                changed_tests += entry["tests"]
+                changed_files.add(relative)
+            current[relative] = entry
+        changed_files |= set(previous) - set(current)
+        index["test_files"] = current
+        all_tests = [test for entry in current.values() for test in entry["tests"]]
+        return all_tests, changed_tests, changed_files
+
+    def run(self, force=False):
+        """Bring the index up to date; return counts of what was (re)done"""
+        started = time.perf_counter()
+        index = self.load_index()
+        all_tests, changed_tests, changed_files = self._update_tests(index, force)
+
+        previous = index["sections"]
+        sections = {}
+        stats = {"sections": 0, "drafted": 0, "relinked": 0, "unchanged": 0, "removed": 0}
+        for document in self.documents:
+            path = self.documents_dir / document
+            if not path.exists():
+                continue
+            for section in split_sections(path.read_text(encoding="utf-8"), document):
+                key = section.key
+                if key in sections:
+                    key = f"{key}@{section.line}"
+                digest = section.content_hash
+                entry = previous.get(key)
+                if entry is None or entry["hash"] != digest or force:
+                    entry = {
+                        "document": document,
+                        "title": section.title,
+                        "path": section.path,
+                        "hash": digest,
+                        "requirement_ids": requirement_ids(section),
+                        "requirement_hashes": requirement_hashes(section),
+                        "requirement_keywords": requirement_keywords(section),
+                        "keywords": section_keywords(section),
+                        "test_cases": self.draft(section),
+                    }
+                    entry["tests"] = link_tests(entry, all_tests)
+                    stats["drafted"] += 1
+                elif changed_files:
+                    # Same section, different tests: only re-link tests from changed files
+                    kept = [
+                        nodeid for nodeid in entry["tests"]
+                        if nodeid.split("::", 1)[0] not in changed_files
+                    ]
+                    entry["tests"] = sorted(set(kept) | set(link_tests(entry, changed_tests)))
+                    stats["relinked"] += 1
+                else:
+                    stats["unchanged"] += 1
+                entry["line"] = section.line
+                sections[key] = entry
+        stats["sections"] = len(sections)
+        stats["removed"] = len(set(previous) - set(sections))
+        index["sections"] = sections
+        self.save_index(index)
+        stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return stats
+
+    def sections_for(self, requirement_id, index=None):
+        index = index or self.load_index()
+        return {
+            key: entry
+            for key, entry in index["sections"].items()
+            if requirement_id in entry["requirement_ids"]
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index requirement sections and their tests")
+    parser.add_argument("--force", action="store_true", help="redo every section")
+    parser.add_argument("--show", metavar="ID", help="print the sections defining a requirement ID")
+    args = parser.parse_args(argv)
+
+    pipeline = RequirementsPipeline()
+    stats = pipeline.run(force=args.force)
+    print(
+        f"📚 {stats['sections']} sections: {stats['drafted']} drafted, "
+        f"{stats['relinked']} re-linked, {stats['unchanged']} unchanged, "
+        f"{stats['removed']} removed in {stats['elapsed_ms']} ms"
+    )
+    if args.show:
+        for key, entry in pipeline.sections_for(args.show).items():
+            print(f"\n{key} (line {entry['line']})")
+            for case in entry["test_cases"]:
+                print(f"  {case['id']}: {case['title']}")
+            for nodeid in entry["tests"]:
+                print(f"  🧪 {nodeid}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
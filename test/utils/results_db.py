@@ -0,0 +1,449 @@
+"""SQLite history of test outcomes, durations and perf metrics.
+
+A pytest plugin appends every test's outcome, duration, xdist worker and
+profile to ``reports/results.sqlite3``, along with numeric values recorded via
+``record_property`` (journey steps become ``journey.<step>`` metrics) and the
+run's page-object spans from ``utils.telemetry``. Only the controller process
+writes; under xdist the reports arrive there from the workers.
+
+Query it with::
+
+    python -m utils.results_db slowest --runs 50 --limit 20
+    python -m utils.results_db p95 --action open_cart_panel --by day
+    python -m utils.results_db regressions --threshold 0.3
+    python -m utils.results_db flaky --runs 50
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from tests.constants import REPORTS_DIR
+from utils import telemetry
+
+DEFAULT_DB_PATH = REPORTS_DIR / "results.sqlite3"
+PROFILE_ENV = "TEST_PROFILE"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    host TEXT,
+    workers INTEGER,
+    exitstatus INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL REFERENCES runs(id),
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration_s REAL NOT NULL,
+    worker TEXT,
+    profile TEXT,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_nodeid ON results (nodeid, run_id);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+CREATE TABLE IF NOT EXISTS metrics (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    name TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS metrics_name ON metrics (name);
+CREATE INDEX IF NOT EXISTS metrics_result ON metrics (result_id);
+CREATE TABLE IF NOT EXISTS spans (
+    run_id TEXT NOT NULL REFERENCES runs(id),
+    nodeid TEXT,
+    action TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    outcome TEXT,
+    worker TEXT,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS spans_action ON spans (action, ts);
+"""
+
+
+def flatten_metrics(name, value):
+    """Yield (metric name, number) pairs from a user property value"""
+    if isinstance(value, bool):
+        return
+    if isinstance(value, (int, float)):
+        yield name, float(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten_metrics(f"{name}.{key}", item)
+    elif isinstance(value, list) and name == "journey_steps":
+        for step in value:
+            if isinstance(step, dict) and "step" in step:
+                yield from flatten_metrics(f"journey.{step['step']}", step.get("duration_ms"))
+
+
+class ResultsDB:
+    """Thin wrapper around the results database"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def start_run(self, run_id, workers=0, started_at=None):
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO runs (id, started_at, host, workers) VALUES (?, ?, ?, ?)",
+                (run_id, started_at or time.time(), socket.gethostname(), workers),
+            )
+
+    def finish_run(self, run_id, exitstatus, finished_at=None):
+        with self.connection:
+            self.connection.execute(
+                "UPDATE runs SET finished_at = ?, exitstatus = ? WHERE id = ?",
+                (finished_at or time.time(), int(exitstatus), run_id),
+            )
+
+    def add_result(self, run_id, nodeid, outcome, duration_s, worker=None, profile=None,
+                   metrics=(), finished_at=None):
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO results (run_id, nodeid, outcome, duration_s, worker, profile, finished_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, nodeid, outcome, duration_s, worker, profile, finished_at or time.time()),
+            )
+            self.connection.executemany(
+                "INSERT INTO metrics (result_id, name, value) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, name, value) for name, value in metrics],
+            )
+
+    def add_spans(self, run_id, events):
+        rows = [
+            (
+                run_id,
+                event.get("test"),
+                event["action"],
+                event["duration_ms"],
+                event.get("outcome"),
+                event.get("worker"),
+                event.get("ts", time.time()),
+            )
+            for event in events
+            if event.get("type") == "span" and event.get("action") != "test"
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO spans (run_id, nodeid, action, duration_ms, outcome, worker, ts)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def recent_runs(self, limit):
+        rows = self.connection.execute(
+            "SELECT id FROM runs ORDER BY started_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def durations(self, runs=50, outcome="passed", nodeids=None, profile=None):
+        """{nodeid: [duration_s, ...]} over the last `runs` runs"""
+        query = (
+            "SELECT nodeid, duration_s FROM results WHERE run_id IN "
+            "(SELECT id FROM runs ORDER BY started_at DESC LIMIT ?)"
+        )
+        params = [runs]
+        if outcome:
+            query += " AND outcome = ?"
+            params.append(outcome)
+        if profile:
+            query += " AND profile = ?"
+            params.append(profile)
+        history = defaultdict(list)
+        for row in self.connection.execute(query, params):
+            if nodeids is None or row["nodeid"] in nodeids:
+                history[row["nodeid"]].append(row["duration_s"])
+        return dict(history)
+
+    def slowest(self, runs=50, limit=20):
+        rows = [
+            {
+                "nodeid": nodeid,
+                "runs": len(values),
+                "mean_s": round(statistics.mean(values), 3),
+                "p95_s": round(telemetry.percentile(values, 0.95), 3),
+                "max_s": round(max(values), 3),
+            }
+            for nodeid, values in self.durations(runs).items()
+        ]
+        rows.sort(key=lambda row: row["mean_s"], reverse=True)
+        return rows[:limit]
+
+    def p95_by_period(self, action=None, metric=None, by="day", fraction=0.95):
+        """Percentile of a span action or a metric, grouped by day or run"""
+        if (action is None) == (metric is None):
+            raise ValueError("Pass exactly one of action or metric")
+        if action is not None:
+            query = (
+                "SELECT spans.ts AS ts, spans.run_id AS run_id, spans.duration_ms AS value "
+                "FROM spans WHERE spans.action LIKE ?"
+            )
+            pattern = f"%{action}%"
+        else:
+            query = (
+                "SELECT results.finished_at AS ts, results.run_id AS run_id, metrics.value AS value "
+                "FROM metrics JOIN results ON results.id = metrics.result_id WHERE metrics.name LIKE ?"
+            )
+            pattern = f"%{metric}%"
+        groups = defaultdict(list)
+        for row in self.connection.execute(query, (pattern,)):
+            key = time.strftime("%Y-%m-%d", time.localtime(row["ts"])) if by == "day" else row["run_id"]
+            groups[key].append(row["value"])
+        return [
+            {
+                by: key,
+                "count": len(values),
+                f"p{round(fraction * 100)}": round(telemetry.percentile(values, fraction), 1),
+            }
+            for key, values in sorted(groups.items())
+        ]
+
+    def regressions(self, threshold=0.3, recent_runs=5, baseline_runs=50):
+        """Tests whose median duration in recent runs exceeds the baseline median"""
+        run_ids = self.recent_runs(recent_runs + baseline_runs)
+        recent_ids, baseline_ids = set(run_ids[:recent_runs]), set(run_ids[recent_runs:])
+        recent, baseline = defaultdict(list), defaultdict(list)
+        for row in self.connection.execute(
+            "SELECT run_id, nodeid, duration_s FROM results WHERE outcome = 'passed'"
+        ):
+            if row["run_id"] in recent_ids:
+                recent[row["nodeid"]].append(row["duration_s"])
+            elif row["run_id"] in baseline_ids:
+                baseline[row["nodeid"]].append(row["duration_s"])
+        rows = []
+        for nodeid, values in recent.items():
+            if nodeid not in baseline:
+                continue
+            before, after = statistics.median(baseline[nodeid]), statistics.median(values)
+            if before > 0 and after > before * (1 + threshold):
+                rows.append(
+                    {
+                        "nodeid": nodeid,
+                        "baseline_s": round(before, 3),
+                        "recent_s": round(after, 3),
+                        "change": f"+{(after / before - 1):.0%}",
+                    }
+                )
+        rows.sort(key=lambda row: row["recent_s"] / row["baseline_s"], reverse=True)
+        return rows
+
+    def flaky(self, runs=50):
+        """Tests that both passed and failed over the last `runs` runs"""
+        rows = self.connection.execute(
+            "SELECT nodeid, SUM(outcome = 'passed') AS passed, SUM(outcome = 'failed') AS failed "
+            "FROM results WHERE run_id IN (SELECT id FROM runs ORDER BY started_at DESC LIMIT ?) "
+            "GROUP BY nodeid HAVING passed > 0 AND failed > 0 ORDER BY failed DESC",
+            (runs,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def item_profile(item):
+    """Profile label for a test: TEST_PROFILE, else its browser and channel"""
+    if os.environ.get(PROFILE_ENV):
+        return os.environ[PROFILE_ENV]
+    callspec = getattr(item, "callspec", None)
+    browser = callspec.params.get("browser_name") if callspec else None
+    if browser is None:
+        return "default"
+    channel = item.config.getoption("--browser-channel", None)
+    return f"{browser}/{channel}" if channel else browser
+
+
+def item_durations(db_path, items, runs=50):
+    """{(profile, nodeid): [passing duration_s, ...]} for items, each test from
+    the history of its own profile"""
+    # A throttled profile's history says nothing about a fast one
+    by_profile = {}
+    for item in items:
+        by_profile.setdefault(item_profile(item), set()).add(item.nodeid)
+    db = ResultsDB(db_path)
+    try:
+        return {
+            (profile, nodeid): durations
+            for profile, nodeids in by_profile.items()
+            for nodeid, durations in db.durations(
+                runs=runs, nodeids=nodeids, profile=profile
+            ).items()
+        }
+    finally:
+        db.close()
+
+
+def fold_phase(pending, report):
+    """Fold a setup/call/teardown report into pending[nodeid]; return the
+    test's entry (outcome, duration_s, properties) once teardown is in"""
+    entry = pending.setdefault(
+        report.nodeid, {"duration_s": 0.0, "outcome": "passed", "properties": []}
+    )
+    entry["duration_s"] += report.duration
+    if report.failed:
+        entry["outcome"] = "failed" if report.when == "call" else "error"
+    elif report.skipped and entry["outcome"] == "passed":
+        entry["outcome"] = "xfailed" if hasattr(report, "wasxfail") else "skipped"
+    if report.when == "call":
+        entry["properties"] = list(report.user_properties)
+    if report.when != "teardown":
+        return None
+    return pending.pop(report.nodeid)
+
+
+class ResultsRecorder:
+    """Collects per-phase reports on the controller and writes one row per test"""
+
+    def __init__(self, db, run_id):
+        self.db = db
+        self.run_id = run_id
+        self.profiles = {}
+        self.pending = {}
+
+    def pytest_collection_modifyitems(self, items):
+        for item in items:
+            self.profiles[item.nodeid] = item_profile(item)
+
+    def pytest_runtest_logreport(self, report):
+        entry = fold_phase(self.pending, report)
+        if entry is None:
+            return
+        node = getattr(report, "node", None)
+        worker = node.gateway.id if node is not None else telemetry.worker_id()
+        metrics = [
+            metric
+            for name, value in entry["properties"]
+            for metric in flatten_metrics(name, value)
+        ]
+        self.db.add_result(
+            self.run_id,
+            report.nodeid,
+            entry["outcome"],
+            round(entry["duration_s"], 4),
+            worker=worker,
+            profile=self.profiles.get(report.nodeid, os.environ.get(PROFILE_ENV, "default")),
+            metrics=metrics,
+        )
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.db.add_spans(self.run_id, telemetry.load_events(self.run_id))
+        self.db.finish_run(self.run_id, exitstatus)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("results db", "SQLite test results history")
+    group.addoption(
+        "--results-db",
+        default=str(DEFAULT_DB_PATH),
+        help="SQLite file that stores outcomes, durations and metrics across runs",
+    )
+    group.addoption(
+        "--no-results-db",
+        action="store_true",
+        default=False,
+        help="Don't record this run in the results database",
+    )
+
+
+def pytest_configure(config):
+    # xdist workers send their reports to the controller, which does the writing
+    if hasattr(config, "workerinput") or config.getoption("--no-results-db"):
+        return
+    if config.getoption("collectonly"):
+        return
+    db = ResultsDB(config.getoption("--results-db"))
+    db.start_run(telemetry.run_id(), workers=_worker_count(config))
+    config.pluginmanager.register(ResultsRecorder(db, telemetry.run_id()), "results_recorder")
+
+
+def pytest_unconfigure(config):
+    recorder = config.pluginmanager.get_plugin("results_recorder")
+    if recorder is not None:
+        config.pluginmanager.unregister(recorder)
+        recorder.db.close()
+
+
+def _worker_count(config):
+    numprocesses = getattr(config.option, "numprocesses", None)
+    return numprocesses if isinstance(numprocesses, int) else 0
+
+
+def _print_rows(rows, as_json):
+    if as_json:
+        print(json.dumps(rows, indent=2))
+        return
+    if not rows:
+        print("No matching results")
+        return
+    columns = list(rows[0])
+    widths = {
+        column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns
+    }
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    print("  ".join("-" * widths[column] for column in columns))
+    for row in rows:
+        print("  ".join(str(row[column]).ljust(widths[column]) for column in columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the test results history")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH))
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    slowest = commands.add_parser("slowest", help="slowest tests over recent runs")
+    slowest.add_argument("--runs", type=int, default=50)
+    slowest.add_argument("--limit", type=int, default=20)
+
+    p95 = commands.add_parser("p95", help="p95 of a span action or metric over time")
+    target = p95.add_mutually_exclusive_group(required=True)
+    target.add_argument("--action", help="page-object action, e.g. open_cart_panel")
+    target.add_argument("--metric", help="recorded metric, e.g. journey.Open cart")
+    p95.add_argument("--by", choices=["day", "run"], default="day")
+
+    regressions = commands.add_parser("regressions", help="tests that got slower")
+    regressions.add_argument("--threshold", type=float, default=0.3)
+    regressions.add_argument("--recent-runs", type=int, default=5)
+    regressions.add_argument("--baseline-runs", type=int, default=50)
+
+    flaky = commands.add_parser("flaky", help="tests that both passed and failed")
+    flaky.add_argument("--runs", type=int, default=50)
+
+    args = parser.parse_args(argv)
+    if not Path(args.db).exists():
+        print(f"No results database at {args.db}", file=sys.stderr)
+        return 1
+    db = ResultsDB(args.db)
+    try:
+        if args.command == "slowest":
+            rows = db.slowest(args.runs, args.limit)
+        elif args.command == "p95":
+            rows = db.p95_by_period(action=args.action, metric=args.metric, by=args.by)
+        elif args.command == "regressions":
+            rows = db.regressions(args.threshold, args.recent_runs, args.baseline_runs)
+        else:
+            rows = db.flaky(args.runs)
+    finally:
+        db.close()
+    _print_rows(rows, args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Parsing for Server-Timing response headers"""
+import re
+
+_PARAM = re.compile(r'\s*([\w-]+)\s*(?:=\s*("(?:[^"\\]|\\.)*"|[^;,]*))?')
+
+
+def parse_server_timing(header):
+    """Return {metric name: {"dur": float | None, "desc": str | None}}"""
+    metrics = {}
+    if not header:
+        return metrics
+    for entry in header.split(","):
+        parts = entry.split(";")
+        name = parts[0].strip()
+        if not name:
+            continue
+        metric = {"dur": None, "desc": None}
+        for part in parts[1:]:
+            match = _PARAM.match(part)
+            if not match:
+                continue
+            key, value = match.group(1).lower(), (match.group(2) or "").strip()
+            if value.startswith('"') and value.endswith('"'):
+                value = value[1:-1]
+            if key == "dur":
+                try:
+                    metric["dur"] = float(value)
+                except ValueError:
+                    pass
+            elif key == "desc":
+                metric["desc"] = value
+        metrics[name] = metric
+    return metrics
+
+
+def durations(header):
+    """Return {metric name: duration in ms} for metrics that carry a dur"""
+    return {
+        name: metric["dur"]
+        for name, metric in parse_server_timing(header).items()
+        if metric["dur"] is not None
+    }
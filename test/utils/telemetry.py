@@ -0,0 +1,294 @@
+"""Structured JSON-lines telemetry for the test suite.
+
+Every page-object action is recorded as a timed span and every log record from
+the test packages as a log event. Each xdist worker appends to its own file,
+``logs/events-<run id>-<worker id>.jsonl``, so output is never interleaved.
+
+Spans nest: an action called from another action records its caller as
+``parent``, and each span's ``self_ms`` excludes the time spent in its
+children, so time is ranked where it was actually spent.
+
+Rank the slowest actions of the latest run with::
+
+    python -m utils.telemetry
+    python -m utils.telemetry --run 20251019-120000 --limit 30
+"""
+import argparse
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import pytest
+from tests.constants import LOGS_DIR
+
+RUN_ID_ENV = "TEST_RUN_ID"
+# Set on each node of a distributed run (utils.distributed)
+NODE_ID_ENV = "TEST_NODE_ID"
+LOGGED_PACKAGES = ("pages", "models", "utils", "tests")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_lock = threading.Lock()
+_stream = None
+_stream_path = None
+
+
+def run_id():
+    if not os.environ.get(RUN_ID_ENV):
+        os.environ[RUN_ID_ENV] = time.strftime("%Y%m%d-%H%M%S")
+    return os.environ[RUN_ID_ENV]
+
+
+def worker_id():
+    return os.environ.get("PYTEST_XDIST_WORKER") or os.environ.get(NODE_ID_ENV, "main")
+
+
+def current_test_id():
+    """Node ID of the running test, as exported by pytest"""
+    current = os.environ.get("PYTEST_CURRENT_TEST", "")
+    return current.rsplit(" ", 1)[0] if current else None
+
+
+def events_path():
+    return LOGS_DIR / f"events-{run_id()}-{worker_id()}.jsonl"
+
+
+def emit(event):
+    """Append one event to this worker's JSON-lines file"""
+    global _stream, _stream_path
+    event.setdefault("ts", time.time())
+    event.setdefault("run", run_id())
+    event.setdefault("worker", worker_id())
+    event.setdefault("test", current_test_id())
+    line = json.dumps(event, default=str, ensure_ascii=False)
+    with _lock:
+        path = events_path()
+        if _stream is None or _stream_path != path:
+            if _stream is not None:
+                _stream.close()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _stream = open(path, "a", encoding="utf-8", buffering=1)
+            _stream_path = path
+        _stream.write(line + "\n")
+
+
+def close():
+    global _stream, _stream_path
+    with _lock:
+        if _stream is not None:
+            _stream.close()
+        _stream = None
+        _stream_path = None
+
+
+def selector_of(locator):
+    """Best-effort selector string for a Playwright Locator"""
+    impl = getattr(locator, "_impl_obj", None)
+    return getattr(impl, "_selector", None) or repr(locator)
+
+
+@contextlib.contextmanager
+def span(action, selector=None, **fields):
+    """Time a block of work and emit it as a span event"""
+    parent = _current_span.get()
+    current = {"action": action, "children_ms": 0.0}
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield fields
+    except BaseException as error:
+        outcome = f"error:{type(error).__name__}"
+        raise
+    finally:
+        _current_span.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if parent is not None:
+            parent["children_ms"] += duration_ms
+        emit(
+            {
+                "type": "span",
+                "action": action,
+                "selector": selector,
+                "duration_ms": round(duration_ms, 3),
+                "self_ms": round(max(0.0, duration_ms - current["children_ms"]), 3),
+                "outcome": outcome,
+                "parent": parent["action"] if parent is not None else None,
+                **fields,
+            }
+        )
+
+
+def action(locator_attr=None):
+    """Decorate a page-object method so each call is recorded as a span.
+
+    ``locator_attr`` names the locator attribute the method acts on so its
+    selector is included in the span.
+    """
+
+    def decorator(method):
+        name = method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            selector = None
+            if locator_attr:
+                selector = selector_of(getattr(self, locator_attr))
+            with span(name, selector=selector):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class JsonLinesHandler(logging.Handler):
+    """Logging handler that writes records as telemetry log events"""
+
+    def emit(self, record):
+        current = _current_span.get()
+        try:
+            emit(
+                {
+                    "type": "log",
+                    "level": record.levelname,
+                    "logger": record.name,
+                    "message": record.getMessage(),
+                    "span": current["action"] if current is not None else None,
+                }
+            )
+        except Exception:
+            self.handleError(record)
+
+
+def pytest_configure(config):
+    # Workers inherit the controller's environment, so they share its run id
+    run_id()
+    handler = JsonLinesHandler()
+    for name in LOGGED_PACKAGES:
+        logger = logging.getLogger(name)
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+    config._telemetry_handler = handler
+
+
+def pytest_unconfigure(config):
+    handler = getattr(config, "_telemetry_handler", None)
+    if handler is not None:
+        for name in LOGGED_PACKAGES:
+            logging.getLogger(name).removeHandler(handler)
+    close()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    started = time.perf_counter()
+    outcome = yield
+    emit(
+        {
+            "type": "span",
+            "action": "test",
+            "selector": None,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "outcome": "ok" if outcome.excinfo is None else "error",
+            "parent": None,
+            "test": item.nodeid,
+        }
+    )
+
+
+def load_events(run=None, directory=LOGS_DIR):
+    """Load every worker's events for a run (the latest run by default)"""
+    files = sorted(directory.glob("events-*.jsonl"))
+    if not files:
+        return []
+    if run is None:
+        run = max(path.name[len("events-"):].rsplit("-", 1)[0] for path in files)
+    events = []
+    for path in directory.glob(f"events-{run}-*.jsonl"):
+        with open(path, encoding="utf-8") as stream:
+            events.extend(json.loads(line) for line in stream if line.strip())
+    return events
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(events, limit=20):
+    """Rank span actions by self time spent across the run.
+
+    A nested action's time is also inside its caller's duration, so ranking
+    by duration would count it twice; self time counts it once. Spans
+    recorded without ``self_ms`` count their whole duration.
+    """
+    durations = defaultdict(list)
+    self_times = defaultdict(float)
+    failures = defaultdict(int)
+    for event in events:
+        if event.get("type") != "span" or event.get("action") == "test":
+            continue
+        durations[event["action"]].append(event["duration_ms"])
+        self_times[event["action"]] += event.get("self_ms", event["duration_ms"])
+        if event.get("outcome") != "ok":
+            failures[event["action"]] += 1
+    rows = [
+        {
+            "action": name,
+            "count": len(values),
+            "self_ms": round(self_times[name], 1),
+            "total_ms": round(sum(values), 1),
+            "mean_ms": round(sum(values) / len(values), 1),
+            "p95_ms": round(percentile(values, 0.95), 1),
+            "max_ms": round(max(values), 1),
+            "errors": failures[name],
+        }
+        for name, values in durations.items()
+    ]
+    rows.sort(key=lambda row: row["self_ms"], reverse=True)
+    return rows[:limit]
+
+
+def format_summary(rows):
+    header = (
+        f"{'action':<50} {'count':>6} {'self ms':>11} {'total ms':>11} "
+        f"{'mean':>8} {'p95':>8} {'max':>8} {'err':>4}"
+    )
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['action'][:50]:<50} {row['count']:>6} {row['self_ms']:>11.1f} "
+            f"{row['total_ms']:>11.1f} {row['mean_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+            f"{row['max_ms']:>8.1f} {row['errors']:>4}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank the slowest page-object actions")
+    parser.add_argument("--run", help="run id (defaults to the latest run)")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    events = load_events(args.run)
+    if not events:
+        print(f"No telemetry events found in {LOGS_DIR}", file=sys.stderr)
+        return 1
+    rows = summarize(events, args.limit)
+    print(json.dumps(rows, indent=2) if args.json else format_summary(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Per-test timeouts planned from each test's duration history.
+
+Instead of a flat 60 s for every test, each test gets ``p99 × margin`` of its
+passing durations in the results database (``utils.results_db``), clamped to
+a floor and a ceiling. Tests with too little history keep the ``timeout``
+from pytest.ini. A hung test then fails in a few multiples of its normal
+duration and frees its xdist worker, while a slow journey keeps the headroom
+its history shows it needs.
+
+The plan is applied as a ``pytest.mark.timeout`` (when pytest-timeout is
+installed) and as the Playwright default timeout of the test's ``page``.
+Explicit ``@pytest.mark.timeout`` markers always win.
+"""
+import math
+from pathlib import Path
+
+import pytest
+from utils.results_db import DEFAULT_DB_PATH, item_durations, item_profile
+from utils.telemetry import percentile
+
+planned_timeout_key = pytest.StashKey()
+
+
+def plan_timeout(durations, margin=3.0, floor=10.0, ceiling=300.0, min_samples=5):
+    """Seconds to allow a test with these past durations, or None without enough history"""
+    if len(durations) < min_samples:
+        return None
+    planned = percentile(durations, 0.99) * margin
+    return float(min(ceiling, max(floor, math.ceil(planned))))
+
+
+def playwright_timeout_ms(item, default_ms):
+    """Playwright default timeout for a test: never longer than its planned timeout"""
+    planned = item.stash.get(planned_timeout_key, None)
+    if planned is None:
+        return default_ms
+    return min(default_ms, int(planned * 1000))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("adaptive timeouts", "per-test timeouts from duration history")
+    group.addoption(
+        "--adaptive-timeouts",
+        choices=["on", "off"],
+        default="on",
+        help="Derive each test's timeout from its historical durations",
+    )
+    group.addoption(
+        "--timeout-margin",
+        type=float,
+        default=3.0,
+        help="Multiply each test's p99 duration by this margin",
+    )
+    group.addoption(
+        "--timeout-floor",
+        type=float,
+        default=10.0,
+        help="Never plan a timeout shorter than this many seconds",
+    )
+    group.addoption(
+        "--timeout-ceiling",
+        type=float,
+        default=300.0,
+        help="Never plan a timeout longer than this many seconds",
+    )
+    group.addoption(
+        "--timeout-min-samples",
+        type=int,
+        default=5,
+        help="Passing runs needed before a test gets a planned timeout",
+    )
+    group.addoption(
+        "--timeout-history-runs",
+        type=int,
+        default=50,
+        help="How many recent runs of history to plan from",
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    if config.getoption("--adaptive-timeouts") == "off":
+        return
+    db_path = Path(config.getoption("--results-db", str(DEFAULT_DB_PATH)))
+    if not db_path.exists():
+        return
+
+    history = item_durations(db_path, items, config.getoption("--timeout-history-runs"))
+
+    has_timeout_plugin = config.pluginmanager.hasplugin("timeout")
+    planned = 0
+    for item in items:
+        if item.get_closest_marker("timeout") is not None:
+            continue
+        seconds = plan_timeout(
+            history.get((item_profile(item), item.nodeid), []),
+            margin=config.getoption("--timeout-margin"),
+            floor=config.getoption("--timeout-floor"),
+            ceiling=config.getoption("--timeout-ceiling"),
+            min_samples=config.getoption("--timeout-min-samples"),
+        )
+        if seconds is None:
+            continue
+        item.stash[planned_timeout_key] = seconds
+        item.user_properties.append(("planned_timeout_s", seconds))
+        if has_timeout_plugin:
+            item.add_marker(pytest.mark.timeout(seconds))
+        planned += 1
+    config.stash[planned_timeout_key] = (planned, len(items))
+
+
+def pytest_report_collectionfinish(config, items):
+    planned, total = config.stash.get(planned_timeout_key, (0, 0))
+    if total:
+        return f"adaptive timeouts: {planned}/{total} tests planned from history"
+    return None
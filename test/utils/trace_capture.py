@@ -0,0 +1,190 @@
+"""Chromium performance traces of slow UI tests, summarized in the report.
+
+A test's duration says nothing about whether the time went to React
+rendering, script compilation, style and layout, or waiting on the network.
+UI tests on Chromium are traced (CDP ``Tracing`` with V8's sampling
+profiler) when they are
+
+* marked ``@pytest.mark.slow``, or
+* over budget: their median passing duration in the results database
+  (``utils.results_db``) is above ``--trace-budget`` seconds.
+
+Other tests aren't traced and pay nothing. When a traced test's call phase
+ends, its trace is parsed into top JS functions by self time, long tasks,
+and main-thread time per category, including forced style recalcs and
+layouts. The summary is added to the test report as a "Browser trace"
+section, a ``browser_trace`` property and, with pytest-html, an extra. The
+raw trace goes to ``reports/traces/`` and opens in DevTools or Perfetto.
+
+    pytest --trace-tests all          # trace every Chromium UI test
+    pytest --trace-budget 5
+"""
+import gzip
+import json
+import re
+import statistics
+from pathlib import Path
+
+import pytest
+from tests.constants import REPORTS_DIR
+from utils.results_db import DEFAULT_DB_PATH, item_durations, item_profile
+from utils.tracing import PROFILE_CATEGORIES, CdpTracer, format_trace_summary, summarize_trace
+
+TRACE_REPORTS_DIR = REPORTS_DIR / "traces"
+# Ring buffer size; long tests keep the most recent part of their trace
+TRACE_BUFFER_KB = 64 * 1024
+trace_reason_key = pytest.StashKey()
+trace_capture_key = pytest.StashKey()
+
+
+def trace_reason(item, durations, budget_s):
+    """Why a test should be traced, or None"""
+    if item.get_closest_marker("slow") is not None:
+        return "marked slow"
+    if durations:
+        median = statistics.median(durations)
+        if median > budget_s:
+            return f"median {median:.1f}s over the {budget_s:g}s budget"
+    return None
+
+
+def traceable(item):
+    """UI tests whose page runs in Chromium, the only engine with CDP tracing"""
+    callspec = getattr(item, "callspec", None)
+    browser = callspec.params.get("browser_name") if callspec else None
+    return "page" in item.fixturenames and browser == "chromium"
+
+
+def _trace_path(nodeid, suffix):
+    return TRACE_REPORTS_DIR / (re.sub(r"[^\w.-]+", "_", nodeid) + suffix)
+
+
+class TraceCapture:
+    """Records a page's trace from test setup until the call phase ends"""
+
+    def __init__(self, page, reason, top=10):
+        self.reason = reason
+        self.top = top
+        self.summary = None
+        self.error = None
+        self.tracer = CdpTracer(page, PROFILE_CATEGORIES, buffer_size_kb=TRACE_BUFFER_KB)
+        self.tracer.start()
+
+    def finish(self, nodeid):
+        """Stop tracing, save the raw trace and return its summary"""
+        if self.summary is not None or self.error is not None:
+            return self.summary
+        try:
+            events = self.tracer.stop(timeout=30.0)
+        except Exception as error:
+            # The page may have crashed or closed along with the test
+            self.error = f"{type(error).__name__}: {error}"
+            return None
+        finally:
+            self.tracer.detach()
+        self.summary = {"reason": self.reason, **summarize_trace(events, self.top)}
+        TRACE_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+        trace_path = _trace_path(nodeid, ".trace.json.gz")
+        with gzip.open(trace_path, "wt", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": events}, trace_file)
+        self.summary["trace"] = str(trace_path)
+        _trace_path(nodeid, ".summary.json").write_text(
+            json.dumps(self.summary, indent=2), encoding="utf-8"
+        )
+        return self.summary
+
+    def close(self):
+        if self.summary is None and self.error is None:
+            self.tracer.detach()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("browser traces", "performance traces of slow UI tests")
+    group.addoption(
+        "--trace-tests",
+        choices=["auto", "all", "off"],
+        default="auto",
+        help="Trace Chromium UI tests (auto: slow-marked and over-budget tests only)",
+    )
+    group.addoption(
+        "--trace-budget",
+        type=float,
+        default=15.0,
+        help="Trace tests whose median passing duration exceeds this many seconds",
+    )
+    group.addoption(
+        "--trace-top",
+        type=int,
+        default=10,
+        help="JS functions to list in each trace summary",
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    mode = config.getoption("--trace-tests")
+    if mode == "off":
+        return
+    candidates = [item for item in items if traceable(item)]
+    history = {}
+    db_path = Path(config.getoption("--results-db", str(DEFAULT_DB_PATH)))
+    if mode == "auto" and candidates and db_path.exists():
+        history = item_durations(db_path, candidates)
+    budget = config.getoption("--trace-budget")
+    flagged = 0
+    for item in candidates:
+        if mode == "all":
+            reason = "--trace-tests all"
+        else:
+            reason = trace_reason(
+                item, history.get((item_profile(item), item.nodeid)), budget
+            )
+        if reason:
+            item.stash[trace_reason_key] = reason
+            flagged += 1
+    config.stash[trace_reason_key] = flagged
+
+
+def pytest_report_collectionfinish(config, items):
+    flagged = config.stash.get(trace_reason_key, 0)
+    if flagged:
+        return f"browser traces: {flagged} tests will be traced"
+    return None
+
+
+@pytest.fixture(autouse=True)
+def slow_test_trace(request):
+    """Trace the page of tests flagged slow or over budget; None for the rest"""
+    reason = request.node.stash.get(trace_reason_key, None)
+    if reason is None:
+        yield None
+        return
+    capture = TraceCapture(
+        request.getfixturevalue("page"), reason, request.config.getoption("--trace-top")
+    )
+    request.node.stash[trace_capture_key] = capture
+    yield capture
+    capture.close()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    capture = item.stash.get(trace_capture_key, None)
+    if report.when != "call" or capture is None:
+        return
+
+    summary = capture.finish(item.nodeid)
+    if summary is None:
+        report.sections.append(("Browser trace", f"No trace: {capture.error}"))
+        return
+    text = f"Traced because {summary['reason']}; raw trace: {summary['trace']}\n"
+    text += format_trace_summary(summary)
+    report.sections.append(("Browser trace", text))
+    report.user_properties.append(("browser_trace", summary))
+    pytest_html = item.config.pluginmanager.getplugin("html")
+    if pytest_html is not None:
+        extras = getattr(report, "extras", [])
+        extras.append(pytest_html.extras.text(text, name="Browser trace"))
+        report.extras = extras
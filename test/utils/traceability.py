@@ -0,0 +1,231 @@
+"""Requirement traceability: ``@pytest.mark.req`` markers against documents/.
+
+Tests declare the requirements they assert::
+
+    @pytest.mark.req("CART-LIMIT")
+    def test_documented_cart_states(self, state_machine, ecommerce_page, ops, expected_total): ...
+
+A marker claims coverage, so it goes only on tests (or parameters, through
+``pytest.param(..., marks=...)``) whose assertions check the rule; a test
+that only looks around leaves its requirement a gap.
+
+Requirement IDs come from the requirements index of
+``utils.requirements_pipeline``: ``<!-- req: ID -->`` annotations and
+use-case IDs in ``documents/REQUIREMENTS.md``. The index is brought up to
+date incrementally at collection time (a few milliseconds when the documents
+haven't changed). Every run then reports:
+
+* requirements with no marked test (gaps), with candidate tests whose names
+  and docstrings share keywords with the requirement's own line (or, for a
+  heading ID, with its section);
+* markers naming IDs that don't exist.
+
+The full report goes to ``reports/traceability.json``.
+
+Impact selection runs only the tests tied to given or changed requirements::
+
+    pytest --req CART-LIMIT --req QTY-LIMIT
+    pytest --req-changed-since origin/main     # requirements edited since a git ref
+"""
+import json
+import math
+import re
+import subprocess
+import time
+
+import pytest
+from tests.constants import REPORTS_DIR
+from utils.requirements_pipeline import (
+    DOCUMENTS_DIR,
+    RequirementsPipeline,
+    link_tests,
+    requirement_hashes,
+    split_sections,
+)
+
+REQUIREMENTS_DOCUMENT = "REQUIREMENTS.md"
+TRACEABILITY_REPORT_PATH = REPORTS_DIR / "traceability.json"
+# Section numbers like "1.3.2" may be used in markers but aren't reported as gaps
+_SECTION_NUMBER = re.compile(r"^\d+(?:\.\d+)+$")
+traceability_key = pytest.StashKey()
+
+
+def candidate_ranking(tests):
+    """A function ordering linked tests by the rarity of the words they share.
+
+    "cart" is in half the suite, "persistence" in one test; a candidate that
+    shares the rare word is the better guess.
+    """
+    keywords = {test["nodeid"]: set(test["keywords"]) for test in tests}
+    counts = {}
+    for words in keywords.values():
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+    weight = {word: math.log((len(keywords) + 1) / count) for word, count in counts.items()}
+
+    def rank(nodeids, words):
+        def score(nodeid):
+            return sum(weight[word] for word in keywords.get(nodeid, set()) & set(words))
+
+        return sorted(nodeids, key=lambda nodeid: (-score(nodeid), nodeid))
+
+    return rank
+
+
+def requirement_catalog(index, document=REQUIREMENTS_DOCUMENT):
+    """{requirement ID: {section, line, hash, suggested tests}} from the pipeline index.
+
+    An annotated requirement's suggestions come from its own line; sharing
+    the section's keywords would suggest every test of the section for each
+    of its bullets.
+    """
+    tests = [test for entry in index["test_files"].values() for test in entry["tests"]]
+    rank = candidate_ranking(tests)
+    catalog = {}
+    for key, entry in index["sections"].items():
+        if entry["document"] != document:
+            continue
+        for requirement_id, digest in entry["requirement_hashes"].items():
+            words = entry["requirement_keywords"].get(requirement_id)
+            if words is None:
+                suggested = entry["tests"]
+            else:
+                suggested = rank(
+                    link_tests({"requirement_ids": [requirement_id], "keywords": words}, tests),
+                    words,
+                )
+            catalog[requirement_id] = {
+                "section": key,
+                "title": entry["title"],
+                "line": entry["line"],
+                "hash": digest,
+                "suggested": suggested,
+            }
+    return catalog
+
+
+def marked_requirements(item):
+    return [
+        requirement_id
+        for marker in item.iter_markers("req")
+        for requirement_id in marker.args
+    ]
+
+
+def coverage_report(catalog, items):
+    """Which requirements the collected tests cover, and where the gaps are"""
+    covered = {}
+    unknown = {}
+    for item in items:
+        for requirement_id in marked_requirements(item):
+            target = covered if requirement_id in catalog else unknown
+            target.setdefault(requirement_id, []).append(item.nodeid)
+    traceable = [
+        requirement_id for requirement_id in catalog if not _SECTION_NUMBER.match(requirement_id)
+    ]
+    gaps = {
+        requirement_id: catalog[requirement_id]["suggested"]
+        for requirement_id in traceable
+        if requirement_id not in covered
+    }
+    return {"traceable": sorted(traceable), "covered": covered, "gaps": gaps, "unknown": unknown}
+
+
+def changed_requirements(catalog, ref, documents_dir=DOCUMENTS_DIR,
+                         document=REQUIREMENTS_DOCUMENT):
+    """IDs whose text differs from (or didn't exist at) the given git ref"""
+    path = (documents_dir / document).resolve()
+    relative = path.relative_to(path.parent.parent).as_posix()
+    result = subprocess.run(
+        ["git", "show", f"{ref}:{relative}"],
+        cwd=path.parent.parent,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise pytest.UsageError(f"--req-changed-since: {result.stderr.strip()}")
+    before = {}
+    for section in split_sections(result.stdout, document):
+        before.update(requirement_hashes(section))
+    return {
+        requirement_id
+        for requirement_id, entry in catalog.items()
+        if before.get(requirement_id) != entry["hash"]
+    }
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("traceability", "requirement markers and impact selection")
+    group.addoption(
+        "--req",
+        action="append",
+        default=[],
+        metavar="ID",
+        help="Only run tests marked with this requirement ID (repeatable)",
+    )
+    group.addoption(
+        "--req-changed-since",
+        default=None,
+        metavar="REF",
+        help="Only run tests for requirements changed since this git ref",
+    )
+    group.addoption(
+        "--req-strict",
+        action="store_true",
+        default=False,
+        help="Fail collection when a marker names an unknown requirement ID",
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    started = time.perf_counter()
+    pipeline = RequirementsPipeline()
+    pipeline.run()
+    catalog = requirement_catalog(pipeline.load_index())
+    report = coverage_report(catalog, items)
+    if report["unknown"] and config.getoption("--req-strict"):
+        raise pytest.UsageError(
+            f"Unknown requirement IDs in req markers: {', '.join(sorted(report['unknown']))}"
+        )
+
+    selected_ids = set(config.getoption("--req"))
+    ref = config.getoption("--req-changed-since")
+    if ref:
+        changed = changed_requirements(catalog, ref)
+        report["changed_since"] = {"ref": ref, "requirements": sorted(changed)}
+        selected_ids |= changed
+    if selected_ids or ref:
+        selected, deselected = [], []
+        for item in items:
+            target = selected if selected_ids & set(marked_requirements(item)) else deselected
+            target.append(item)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+        report["selected"] = sorted(selected_ids)
+
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    config.stash[traceability_key] = report
+    if not hasattr(config, "workerinput") and not config.getoption("collectonly"):
+        TRACEABILITY_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        TRACEABILITY_REPORT_PATH.write_text(json.dumps(report, indent=2))
+
+
+def pytest_report_collectionfinish(config, items):
+    report = config.stash.get(traceability_key, None)
+    if report is None:
+        return None
+    lines = [
+        f"requirements: {len(report['covered'])}/{len(report['traceable'])} covered by req "
+        f"markers ({report['elapsed_ms']} ms)"
+    ]
+    for requirement_id, suggested in sorted(report["gaps"].items()):
+        hint = f" (candidates: {', '.join(suggested[:3])})" if suggested else ""
+        lines.append(f"  gap: {requirement_id}{hint}")
+    for requirement_id, nodeids in sorted(report["unknown"].items()):
+        lines.append(f"  unknown requirement {requirement_id} in {nodeids[0]}")
+    if "changed_since" in report:
+        changed = ", ".join(report["changed_since"]["requirements"]) or "none"
+        lines.append(f"  changed since {report['changed_since']['ref']}: {changed}")
+    return lines
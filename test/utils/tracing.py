@@ -0,0 +1,346 @@
+"""Chromium DevTools tracing helpers"""
+import time
+from collections import defaultdict
+
+DEFAULT_CATEGORIES = [
+    "devtools.timeline",
+    "v8",
+    "v8.execute",
+    "disabled-by-default-devtools.timeline",
+]
+
+# Trace events that represent the browser compiling or running page scripts
+SCRIPT_EVENTS = {
+    "EvaluateScript",
+    "v8.compile",
+    "v8.compileModule",
+    "v8.evaluateModule",
+    "v8.produceCache",
+    "FunctionCall",
+}
+
+
+class CdpTracer:
+    """Records a DevTools trace for one page through a CDP session"""
+
+    def __init__(self, page, categories=None, buffer_size_kb=None):
+        self.page = page
+        self.categories = categories or DEFAULT_CATEGORIES
+        self.buffer_size_kb = buffer_size_kb
+        self.cdp = page.context.new_cdp_session(page)
+        self.events = []
+        self._complete = False
+        self.cdp.on("Tracing.dataCollected", self._on_data)
+        self.cdp.on("Tracing.tracingComplete", self._on_complete)
+
+    def _on_data(self, params):
+        self.events.extend(params["value"])
+
+    def _on_complete(self, params):
+        self._complete = True
+
+    def start(self):
+        self.events = []
+        self._complete = False
+        trace_config = {"includedCategories": self.categories}
+        if self.buffer_size_kb:
+            # A ring buffer: a long test keeps its most recent events
+            trace_config["recordMode"] = "recordContinuously"
+            trace_config["traceBufferSizeInKb"] = self.buffer_size_kb
+        self.cdp.send(
+            "Tracing.start",
+            {"traceConfig": trace_config, "transferMode": "ReportEvents"},
+        )
+        return self
+
+    def stop(self, timeout=10.0):
+        """Stop tracing and wait for every buffered event to arrive"""
+        self.cdp.send("Tracing.end")
+        deadline = time.monotonic() + timeout
+        while not self._complete and time.monotonic() < deadline:
+            # Sync Playwright only dispatches CDP events while it is waiting
+            self.page.wait_for_timeout(50)
+        return self.events
+
+    def detach(self):
+        try:
+            self.cdp.detach()
+        except Exception:
+            pass
+
+
+def main_thread_ids(events):
+    """Return (pid, tid) pairs of renderer main threads in a trace"""
+    return {
+        (event["pid"], event["tid"])
+        for event in events
+        if event.get("ph") == "M"
+        and event.get("name") == "thread_name"
+        and event.get("args", {}).get("name") == "CrRendererMain"
+    }
+
+
+def _event_url(event):
+    data = event.get("args", {}).get("data", {}) or {}
+    return data.get("url") or event.get("args", {}).get("fileName") or ""
+
+
+def script_evaluation_ms(events):
+    """Sum compile and evaluation time on renderer main threads, per script URL.
+
+    Nested script events (e.g. a FunctionCall inside EvaluateScript) are only
+    counted once by skipping events that start inside an already counted one.
+    """
+    main_threads = main_thread_ids(events)
+    per_url = defaultdict(float)
+    complete = sorted(
+        (
+            event
+            for event in events
+            if event.get("ph") == "X"
+            and event.get("name") in SCRIPT_EVENTS
+            and (not main_threads or (event["pid"], event["tid"]) in main_threads)
+        ),
+        key=lambda event: (event["pid"], event["tid"], event["ts"]),
+    )
+    covered_until = {}
+    for event in complete:
+        thread = (event["pid"], event["tid"])
+        end = event["ts"] + event.get("dur", 0)
+        if event["ts"] < covered_until.get(thread, 0):
+            continue
+        covered_until[thread] = end
+        per_url[_event_url(event) or "(inline)"] += event.get("dur", 0) / 1000.0
+    return dict(per_url)
+
+
+# DEFAULT_CATEGORIES plus task boundaries and V8's sampling profiler
+# (ProfileChunk events), for main-thread cost summaries
+PROFILE_CATEGORIES = [
+    *DEFAULT_CATEGORIES,
+    "toplevel",
+    "blink.user_timing",
+    "disabled-by-default-v8.cpu_profiler",
+]
+
+# What main-thread trace events spend their time on; anything else is "other"
+EVENT_CATEGORIES = {
+    "scripting": {
+        "FunctionCall",
+        "EvaluateScript",
+        "v8.evaluateModule",
+        "v8.run",
+        "V8.Execute",
+        "TimerFire",
+        "EventDispatch",
+        "FireAnimationFrame",
+        "FireIdleCallback",
+        "RunMicrotasks",
+        "XHRReadyStateChange",
+    },
+    "compile": {"v8.compile", "v8.compileModule", "v8.parseOnBackground", "v8.produceCache"},
+    "parse_html": {"ParseHTML", "ParseAuthorStyleSheet"},
+    "style": {"UpdateLayoutTree", "RecalculateStyles"},
+    "layout": {"Layout", "UpdateLayerTree", "PrePaint"},
+    "paint": {"Paint", "PaintImage", "Layerize", "Commit", "CompositeLayers", "Decode Image"},
+    "gc": {"MinorGC", "MajorGC", "V8.GCScavenger", "V8.GCCompactor", "BlinkGC.AtomicPhase"},
+}
+CATEGORY_OF = {name: category for category, names in EVENT_CATEGORIES.items() for name in names}
+TASK_EVENTS = {"RunTask", "ThreadControllerImpl::RunTask"}
+LONG_TASK_MS = 50
+# Profiler nodes that aren't code running on behalf of the page
+IDLE_FRAMES = {"(root)", "(idle)"}
+
+
+def complete_events(events, threads=None):
+    """Duration events as "X" events, pairing "B"/"E" ones, on the given threads"""
+    complete = []
+    open_events = defaultdict(list)
+    for event in sorted(events, key=lambda event: event.get("ts", 0)):
+        thread = (event.get("pid"), event.get("tid"))
+        if threads and thread not in threads:
+            continue
+        phase = event.get("ph")
+        if phase == "X":
+            complete.append(event)
+        elif phase == "B":
+            open_events[thread].append(event)
+        elif phase == "E" and open_events[thread]:
+            begin = open_events[thread].pop()
+            complete.append({**begin, "ph": "X", "dur": event["ts"] - begin["ts"]})
+    return complete
+
+
+def main_thread_costs(events):
+    """Self time per category, style/layout work and tasks on renderer main threads.
+
+    Self time is an event's duration minus that of the events nested in it, so
+    a Layout inside a FunctionCall counts as layout, not scripting. Style
+    recalcs and layouts nested in script were forced synchronously by it.
+    """
+    categories = defaultdict(float)
+    style_layout = {kind: {"count": 0, "forced": 0, "ms": 0.0} for kind in ("style", "layout")}
+    tasks = []
+    by_thread = defaultdict(list)
+    complete = complete_events(events, main_thread_ids(events))
+    for event in complete:
+        by_thread[(event["pid"], event["tid"])].append(event)
+
+    def close(frame):
+        self_ms = max(0, frame["duration"] - frame["children"]) / 1000.0
+        categories[frame["category"]] += self_ms
+        if frame["task"] is not None:
+            frame["task"]["breakdown"][frame["category"]] += self_ms
+        if frame["category"] in style_layout:
+            style_layout[frame["category"]]["ms"] += self_ms
+
+    for thread_events in by_thread.values():
+        thread_events.sort(key=lambda event: (event["ts"], -event.get("dur", 0)))
+        stack = []
+        for event in thread_events:
+            start, duration = event["ts"], event.get("dur", 0)
+            while stack and stack[-1]["end"] <= start:
+                close(stack.pop())
+            parent = stack[-1] if stack else None
+            category = CATEGORY_OF.get(event["name"], "other")
+            frame = {
+                "end": start + duration,
+                "duration": duration,
+                "children": 0,
+                "category": category,
+                "in_script": category == "scripting" or bool(parent and parent["in_script"]),
+                "task": parent["task"] if parent else None,
+            }
+            if parent:
+                parent["children"] += min(duration, parent["end"] - start)
+            if frame["task"] is None and event["name"] in TASK_EVENTS:
+                frame["task"] = {"ts": start, "duration": duration, "breakdown": defaultdict(float)}
+                tasks.append(frame["task"])
+            if category in style_layout:
+                style_layout[category]["count"] += 1
+                style_layout[category]["forced"] += bool(parent and parent["in_script"])
+            stack.append(frame)
+        while stack:
+            close(stack.pop())
+
+    started = min((event["ts"] for event in complete), default=0)
+    ended = max((event["ts"] + event.get("dur", 0) for event in complete), default=0)
+    return {
+        "categories": dict(categories),
+        "style_layout": style_layout,
+        "tasks": tasks,
+        "started_us": started,
+        "duration_ms": (ended - started) / 1000.0,
+    }
+
+
+def long_tasks(tasks, started_us=0, threshold_ms=LONG_TASK_MS, limit=5):
+    """Tasks over threshold_ms: totals, blocking time and the longest ones"""
+    long = sorted(
+        (task for task in tasks if task["duration"] / 1000.0 > threshold_ms),
+        key=lambda task: -task["duration"],
+    )
+    return {
+        "count": len(long),
+        "total_ms": round(sum(task["duration"] for task in long) / 1000.0, 1),
+        "blocking_ms": round(
+            sum(task["duration"] / 1000.0 - threshold_ms for task in long), 1
+        ),
+        "longest": [
+            {
+                "start_ms": round((task["ts"] - started_us) / 1000.0, 1),
+                "duration_ms": round(task["duration"] / 1000.0, 1),
+                "breakdown": {
+                    category: round(ms, 1)
+                    for category, ms in sorted(task["breakdown"].items(), key=lambda kv: -kv[1])
+                    if ms >= 1
+                },
+            }
+            for task in long[:limit]
+        ],
+    }
+
+
+def function_self_times(events):
+    """Self time per (function, url, line) from the sampling profiler's ProfileChunks"""
+    frames = {}
+    samples = defaultdict(list)
+    deltas = defaultdict(list)
+    for event in events:
+        if event.get("name") != "ProfileChunk":
+            continue
+        profile = (event.get("pid"), event.get("id"))
+        data = event.get("args", {}).get("data", {})
+        cpu_profile = data.get("cpuProfile", {})
+        for node in cpu_profile.get("nodes", []):
+            frames[(profile, node["id"])] = node.get("callFrame", {})
+        samples[profile].extend(cpu_profile.get("samples", []))
+        deltas[profile].extend(data.get("timeDeltas", []))
+
+    per_function = defaultdict(float)
+    for profile, node_ids in samples.items():
+        gaps = deltas[profile]
+        # timeDeltas[i] is the gap before sample i, so a sample lasts until the next
+        for index, node_id in enumerate(node_ids[:-1]):
+            frame = frames.get((profile, node_id))
+            if frame is None or frame.get("functionName") in IDLE_FRAMES:
+                continue
+            if index + 1 >= len(gaps):
+                break
+            key = (
+                frame.get("functionName") or "(anonymous)",
+                frame.get("url", ""),
+                frame.get("lineNumber", -1) + 1,
+            )
+            per_function[key] += max(0, gaps[index + 1]) / 1000.0
+    return dict(per_function)
+
+
+def summarize_trace(events, top=10):
+    """Compact summary of where a trace's main-thread time went"""
+    costs = main_thread_costs(events)
+    functions = function_self_times(events)
+    return {
+        "duration_ms": round(costs["duration_ms"], 1),
+        "main_thread_ms": {
+            category: round(ms, 1)
+            for category, ms in sorted(costs["categories"].items(), key=lambda kv: -kv[1])
+        },
+        "style_layout": {
+            kind: {**entry, "ms": round(entry["ms"], 1)}
+            for kind, entry in costs["style_layout"].items()
+        },
+        "long_tasks": long_tasks(costs["tasks"], costs["started_us"]),
+        "top_functions": [
+            {"function": function, "url": url, "line": line, "self_ms": round(ms, 1)}
+            for (function, url, line), ms in sorted(functions.items(), key=lambda kv: -kv[1])[:top]
+        ],
+    }
+
+
+def format_trace_summary(summary):
+    categories = ", ".join(
+        f"{category} {ms:.0f} ms" for category, ms in summary["main_thread_ms"].items() if ms >= 1
+    )
+    style, layout = summary["style_layout"]["style"], summary["style_layout"]["layout"]
+    tasks = summary["long_tasks"]
+    lines = [
+        f"Main thread over {summary['duration_ms']:.0f} ms: {categories or 'idle'}",
+        f"Style recalcs: {style['count']} ({style['forced']} forced) {style['ms']:.0f} ms; "
+        f"layouts: {layout['count']} ({layout['forced']} forced) {layout['ms']:.0f} ms",
+        f"Long tasks: {tasks['count']}, {tasks['total_ms']:.0f} ms total, "
+        f"{tasks['blocking_ms']:.0f} ms blocking",
+    ]
+    for task in tasks["longest"]:
+        breakdown = ", ".join(f"{category} {ms:.0f} ms" for category, ms in task["breakdown"].items())
+        lines.append(
+            f"  at {task['start_ms']:>8.0f} ms  {task['duration_ms']:>6.0f} ms  {breakdown}"
+        )
+    if summary["top_functions"]:
+        lines.append("Top JS functions by self time:")
+        for function in summary["top_functions"]:
+            source = ""
+            if function["url"]:
+                source = f"  {function['url'].rsplit('/', 1)[-1]}:{function['line']}"
+            lines.append(f"  {function['self_ms']:>8.1f} ms  {function['function']}{source}")
+    return "\n".join(lines)
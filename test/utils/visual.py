@@ -0,0 +1,249 @@
+"""Perceptual visual regression checks for storefront regions.
+
+Screenshots of an element are compared with a baseline PNG under
+``data/visual_baselines/`` in two stages:
+
+1. A 64-bit difference hash (dHash) of the screenshot against the hash stored
+   in the baseline's PNG metadata. Reading it only parses the PNG header, so a
+   layout-breaking change fails without decoding the baseline at all.
+2. If the hashes are close, a NumPy pixel diff. Pixels whose largest channel
+   difference exceeds a tolerance form a diff mask, which is summarized for
+   the whole element and for named regions inside it (one per product card,
+   cart row, ...) so a failure says *where* things changed.
+
+A diff image is written to ``reports/visual/`` only when a check fails.
+A missing baseline fails the check: baselines are recorded, reviewed and
+committed with ``--update-visual-baselines``, which also rewrites existing
+ones. Otherwise a fresh checkout would pass without comparing anything.
+
+Requires the ``visual`` extra (numpy and Pillow).
+"""
+import io
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from PIL import Image, PngImagePlugin
+from tests.constants import REPORTS_DIR, TEST_ROOT
+
+BASELINE_DIR = TEST_ROOT / "data" / "visual_baselines"
+VISUAL_REPORTS_DIR = REPORTS_DIR / "visual"
+HASH_KEY = "dhash"
+
+
+@dataclass(frozen=True)
+class Region:
+    """A named rectangle in element coordinates"""
+
+    name: str
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+@dataclass
+class VisualResult:
+    name: str
+    status: str  # "match", "created", "updated", "missing" or "mismatch"
+    distance: int = 0
+    diff_ratio: float = 0.0
+    changed_regions: dict = field(default_factory=dict)
+    reason: str = ""
+    diff_path: str = None
+    compare_ms: float = 0.0
+
+    @property
+    def ok(self):
+        return self.status in ("match", "created", "updated")
+
+    def __str__(self):
+        text = f"{self.name}: {self.status}"
+        if self.reason:
+            text += f" ({self.reason})"
+        if self.changed_regions:
+            regions = ", ".join(
+                f"{name} {ratio:.1%}" for name, ratio in self.changed_regions.items()
+            )
+            text += f"; changed regions: {regions}"
+        if self.diff_path:
+            text += f"; diff: {self.diff_path}"
+        return text
+
+
+def load_png(png):
+    return np.asarray(Image.open(io.BytesIO(png)).convert("RGB"))
+
+
+def dhash(pixels, size=8):
+    """Difference hash: is each pixel of a downscaled grayscale copy brighter
+    than its left neighbour"""
+    gray = Image.fromarray(pixels).convert("L").resize((size + 1, size), Image.BILINEAR)
+    values = np.asarray(gray, dtype=np.int16)
+    bits = np.packbits(values[:, 1:] > values[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def diff_mask(baseline, actual, tolerance=16):
+    """Pixels whose largest channel difference exceeds tolerance"""
+    delta = np.abs(baseline.astype(np.int16) - actual.astype(np.int16))
+    return delta.max(axis=2) > tolerance
+
+
+def region_ratios(mask, regions, min_ratio=0.0):
+    """Share of changed pixels per region, for regions above min_ratio"""
+    ratios = {}
+    height, width = mask.shape
+    for region in regions:
+        x0, y0 = max(0, region.x), max(0, region.y)
+        x1, y1 = min(width, region.x + region.width), min(height, region.y + region.height)
+        if x1 <= x0 or y1 <= y0:
+            continue
+        ratio = float(mask[y0:y1, x0:x1].mean())
+        if ratio > min_ratio:
+            ratios[region.name] = ratio
+    return ratios
+
+
+def render_diff(baseline, actual, mask):
+    """The actual image faded out, with changed pixels in red"""
+    faded = (actual.astype(np.float32) * 0.3 + 255 * 0.7).astype(np.uint8)
+    faded[mask] = (255, 0, 0)
+    if baseline.shape == actual.shape:
+        return np.concatenate([baseline, faded, actual], axis=1)
+    return faded
+
+
+def read_baseline_hash(path):
+    """The stored dHash of a baseline, read from its PNG metadata only"""
+    with Image.open(path) as image:
+        value = image.info.get(HASH_KEY)
+        return (int(value, 16), image.size) if value else (None, image.size)
+
+
+def write_png(path, pixels, text=None):
+    """Write atomically so parallel workers never see half a baseline"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    info = PngImagePlugin.PngInfo()
+    for key, value in (text or {}).items():
+        info.add_text(key, value)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    Image.fromarray(pixels).save(temporary, format="PNG", pnginfo=info)
+    os.replace(temporary, path)
+
+
+class VisualBaselines:
+    def __init__(self, directory=BASELINE_DIR, diff_dir=VISUAL_REPORTS_DIR, update=False):
+        self.directory = directory
+        self.diff_dir = diff_dir
+        self.update = update
+
+    def path(self, name):
+        return self.directory / f"{name}.png"
+
+    def check(self, name, png, regions=(), hash_threshold=10, tolerance=16,
+              max_diff_ratio=0.001, max_region_ratio=0.01):
+        """Compare a PNG screenshot with the baseline called name"""
+        started = time.perf_counter()
+        actual = load_png(png)
+        actual_hash = dhash(actual)
+        path = self.path(name)
+        if self.update:
+            status = "updated" if path.exists() else "created"
+            write_png(path, actual, {HASH_KEY: f"{actual_hash:016x}"})
+            return VisualResult(name, status, compare_ms=_ms_since(started))
+        if not path.exists():
+            return VisualResult(
+                name, "missing", compare_ms=_ms_since(started),
+                reason=f"no baseline at {path}; record it with --update-visual-baselines",
+            )
+
+        baseline_hash, size = read_baseline_hash(path)
+        if size != (actual.shape[1], actual.shape[0]):
+            return self._mismatch(
+                name, started, None, actual, None, reason=f"size {size} -> {actual.shape[1::-1]}"
+            )
+        distance = hamming(actual_hash, baseline_hash) if baseline_hash is not None else 0
+        if distance > hash_threshold:
+            return self._mismatch(
+                name, started, None, actual, None, distance=distance,
+                reason=f"perceptual hash distance {distance} > {hash_threshold}",
+            )
+
+        baseline = load_png(path.read_bytes())
+        mask = diff_mask(baseline, actual, tolerance)
+        ratio = float(mask.mean())
+        changed = region_ratios(mask, regions, max_region_ratio)
+        if ratio <= max_diff_ratio and not changed:
+            return VisualResult(name, "match", distance, ratio, compare_ms=_ms_since(started))
+        return self._mismatch(
+            name, started, baseline, actual, mask, distance=distance, diff_ratio=ratio,
+            changed_regions=changed, reason=f"{ratio:.2%} of pixels changed",
+        )
+
+    def _mismatch(self, name, started, baseline, actual, mask, **details):
+        if mask is None:
+            # No pixel diff was computed; show the whole new image as changed
+            mask = np.ones(actual.shape[:2], dtype=bool)
+        diff_path = self.diff_dir / f"{name}-diff.png"
+        write_png(diff_path, render_diff(baseline if baseline is not None else actual, actual, mask))
+        return VisualResult(
+            name, "mismatch", diff_path=str(diff_path), compare_ms=_ms_since(started), **details
+        )
+
+
+def _ms_since(started):
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+class VisualChecker:
+    """Screenshots page elements and checks them against baselines"""
+
+    def __init__(self, page, browser_name, baselines):
+        self.page = page
+        self.browser_name = browser_name
+        self.baselines = baselines
+        self.results = []
+
+    def regions(self, element, locators):
+        """Regions for each match of each named locator, relative to element"""
+        origin = element.bounding_box()
+        regions = []
+        for name, locator in locators.items():
+            for index in range(locator.count()):
+                box = locator.nth(index).bounding_box()
+                if box is None:
+                    continue
+                regions.append(Region(
+                    f"{name}[{index}]",
+                    round(box["x"] - origin["x"]),
+                    round(box["y"] - origin["y"]),
+                    round(box["width"]),
+                    round(box["height"]),
+                ))
+        return regions
+
+    def assert_matches(self, name, element, mask=(), regions=None, **thresholds):
+        """Fail unless element looks like its baseline.
+
+        mask: locators painted over before the screenshot (dynamic content)
+        regions: {name: locator} areas to report changes for
+        """
+        element.scroll_into_view_if_needed()
+        png = element.screenshot(animations="disabled", caret="hide", mask=list(mask))
+        viewport = self.page.viewport_size or {}
+        baseline_name = (
+            f"{name}-{self.browser_name}-{viewport.get('width')}x{viewport.get('height')}"
+        )
+        result = self.baselines.check(
+            baseline_name, png, self.regions(element, regions or {}), **thresholds
+        )
+        self.results.append(result)
+        print(f"{'✅' if result.ok else '❌'} {result} in {result.compare_ms} ms")
+        assert result.ok, str(result)
+        return result
@@ -0,0 +1,309 @@
+"""Watch mode: rerun the tests affected by each save in a warm process.
+
+``python -m utils.watch`` keeps everything that makes a cold ``pytest`` call
+slow alive between runs:
+
+* the interpreter with pytest, Playwright and the plugins already imported;
+* a browser, as a shared launch-server (see ``utils.browser_server``) that
+  each run connects to instead of launching.
+
+Each test still gets a fresh context and passes the requirements gate
+itself: the gate is React state in the app, not something a saved storage
+state could carry over.
+
+It polls ``test/`` and ``app/`` for modified files, maps them to the affected
+test files and reruns just those with ``pytest.main`` in the same process.
+Project modules are dropped from ``sys.modules`` before each run so edits to
+``pages/``, ``utils/`` or the tests themselves are picked up, and each run
+gets its own telemetry run id.
+
+    python -m utils.watch                  # watch and rerun affected tests
+    python -m utils.watch -- -m ui -x      # extra pytest arguments after --
+"""
+import argparse
+import ast
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from tests.constants import TEST_ROOT
+from utils import telemetry
+from utils.browser_server import SharedBrowserServer
+
+APP_ROOT = TEST_ROOT.parent / "app"
+WARM_BROWSER_PLUGIN = "warm_browser"
+PROJECT_PACKAGES = ("pages", "models", "tests", "utils")
+IGNORED_DIRS = {"__pycache__", "node_modules", ".next", ".git", "reports", "logs", ".venv"}
+WATCHED_SUFFIXES = {".py", ".ini", ".js", ".jsx", ".css", ".json"}
+
+# Which suites exercise which part of the Next.js app
+APP_TEST_MAP = [
+    ("pages/api/", ["tests/api"]),
+    ("lib/", ["tests/api"]),
+    ("data/", ["tests/api", "tests/ui"]),
+    ("components/", ["tests/ui"]),
+    ("pages/", ["tests/ui", "tests/integration/test_cache_headers.py"]),
+    ("styles/", ["tests/ui"]),
+    ("next.config.js", ["tests/integration/test_cache_headers.py"]),
+]
+# Changes to these rerun everything
+GLOBAL_FILES = {"pytest.ini", "tests/conftest.py", "tests/constants.py"}
+
+
+def snapshot(roots):
+    """{path: mtime} for every watched file under roots"""
+    mtimes = {}
+    for root in roots:
+        if not root.exists():
+            continue
+        for directory, dirnames, filenames in os.walk(root):
+            dirnames[:] = [name for name in dirnames if name not in IGNORED_DIRS]
+            for filename in filenames:
+                path = Path(directory) / filename
+                if path.suffix in WATCHED_SUFFIXES:
+                    try:
+                        mtimes[path] = path.stat().st_mtime
+                    except OSError:
+                        pass
+    return mtimes
+
+
+def changed_files(before, after):
+    return sorted(
+        path for path in set(before) | set(after) if before.get(path) != after.get(path)
+    )
+
+
+def _module_name(path, test_root):
+    relative = path.relative_to(test_root).with_suffix("")
+    parts = list(relative.parts)
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def import_graph(test_root):
+    """{module name: set of project modules it imports} for .py files in test_root"""
+    graph = {}
+    for path in snapshot([test_root]):
+        if path.suffix != ".py":
+            continue
+        try:
+            tree = ast.parse(path.read_text(encoding="utf-8"))
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            continue
+        imported = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                imported.add(node.module)
+                imported.update(f"{node.module}.{alias.name}" for alias in node.names)
+            elif isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == "pytest_plugins"
+                for target in node.targets
+            ):
+                # Plugins named in pytest_plugins are imports too
+                imported.update(
+                    element.value
+                    for element in ast.walk(node.value)
+                    if isinstance(element, ast.Constant) and isinstance(element.value, str)
+                )
+        graph[_module_name(path, test_root)] = {
+            name for name in imported if name.split(".")[0] in PROJECT_PACKAGES
+        }
+    return graph
+
+
+def _relative_to(path, root):
+    """path relative to root as a posix string, or None if it lies outside root"""
+    try:
+        return path.relative_to(root).as_posix()
+    except ValueError:
+        return None
+
+
+def affected_tests(changed, test_root=TEST_ROOT, app_root=APP_ROOT, graph=None):
+    """Pytest targets (paths relative to test_root) affected by changed files"""
+    targets = set()
+    changed_modules = set()
+    for path in changed:
+        path = Path(path)
+        relative = _relative_to(path, app_root)
+        if relative is not None:
+            if relative.startswith("test/"):
+                continue  # the app's own jest tests
+            for prefix, suites in APP_TEST_MAP:
+                if relative.startswith(prefix):
+                    targets.update(suites)
+                    break
+            continue
+        relative = _relative_to(path, test_root)
+        if relative is None:
+            continue
+        if relative in GLOBAL_FILES:
+            return ["tests"]
+        if path.name == "conftest.py":
+            targets.add(path.parent.relative_to(test_root).as_posix())
+        elif path.suffix == ".py":
+            changed_modules.add(_module_name(path, test_root))
+
+    if changed_modules:
+        graph = graph if graph is not None else import_graph(test_root)
+        dependents = {}
+        for module, imports in graph.items():
+            for name in imports:
+                dependents.setdefault(name, set()).add(module)
+        affected = set(changed_modules)
+        frontier = list(changed_modules)
+        while frontier:
+            for dependent in dependents.get(frontier.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    frontier.append(dependent)
+        for module in affected:
+            parts = module.split(".")
+            if parts[0] != "tests":
+                continue
+            if parts[-1].startswith("test_"):
+                targets.add("/".join(parts) + ".py")
+            elif parts[-1] == "conftest":
+                # Fixtures reach tests without an import in the test module
+                if "/".join(parts) + ".py" in GLOBAL_FILES:
+                    return ["tests"]
+                targets.add("/".join(parts[:-1]))
+
+    # Drop files already covered by a selected directory
+    return sorted(
+        target
+        for target in targets
+        if not any(
+            target != other and target.startswith(other.rstrip("/") + "/") for other in targets
+        )
+    )
+
+
+def purge_project_modules(keep=(__name__,)):
+    """Forget imported project modules so the next run imports fresh code"""
+    for name in list(sys.modules):
+        if name.split(".")[0] in PROJECT_PACKAGES and name not in keep:
+            del sys.modules[name]
+
+
+class WarmBrowserPlugin:
+    """Registered into each in-process pytest run; tests/conftest.py uses it
+    to connect to the warm browser server"""
+
+    def __init__(self, server):
+        # pluggy registers plugin objects under their __name__
+        self.__name__ = WARM_BROWSER_PLUGIN
+        self.server = server
+
+
+def new_run_id(previous=None):
+    """Start a new telemetry run; ids have one-second resolution, so wait
+    for the clock to move on rather than reuse the previous run's id"""
+    while True:
+        os.environ.pop(telemetry.RUN_ID_ENV, None)
+        current = telemetry.run_id()
+        if current != previous:
+            return current
+        time.sleep(0.05)
+
+
+class Watcher:
+    def __init__(self, browser_name, launch_options, pytest_args, interval=0.3):
+        self.browser_name = browser_name
+        self.pytest_args = pytest_args
+        self.interval = interval
+        self.server = SharedBrowserServer("watch", browser_name, launch_options)
+        self.run_id = None
+
+    def warm_up(self):
+        started = time.perf_counter()
+        self.server.ensure_running()
+        print(f"🔥 Browser warm in {time.perf_counter() - started:.1f}s")
+
+    def run(self, targets):
+        purge_project_modules()
+        # A run id left in the environment would make every rerun append to
+        # one run in the results database and its events file
+        self.run_id = new_run_id(self.run_id)
+        plugin = WarmBrowserPlugin(self.server)
+        args = [*targets, "--browser", self.browser_name, *self.pytest_args]
+        started = time.perf_counter()
+        exit_code = pytest.main(args, plugins=[plugin])
+        elapsed = time.perf_counter() - started
+        status = "✅" if exit_code in (pytest.ExitCode.OK, pytest.ExitCode.NO_TESTS_COLLECTED) else "❌"
+        print(f"{status} {' '.join(targets)} finished in {elapsed:.2f}s (exit {int(exit_code)})")
+        return exit_code
+
+    def watch(self, roots):
+        print(f"👀 Watching {', '.join(str(root) for root in roots)} (Ctrl+C to stop)")
+        mtimes = snapshot(roots)
+        while True:
+            time.sleep(self.interval)
+            current = snapshot(roots)
+            changed = changed_files(mtimes, current)
+            if not changed:
+                continue
+            # Let editors finish writing before running
+            time.sleep(self.interval)
+            current = snapshot(roots)
+            changed = changed_files(mtimes, current)
+            mtimes = current
+
+            targets = affected_tests(changed)
+            names = ", ".join(str(path.relative_to(TEST_ROOT.parent)) for path in changed[:5])
+            if not targets:
+                print(f"💤 {names}: no affected tests")
+                continue
+            print(f"🔁 {names} -> {' '.join(targets)}")
+            self.run(targets)
+
+    def close(self):
+        self.server.shutdown()
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    pytest_args = []
+    if "--" in argv:
+        index = argv.index("--")
+        argv, pytest_args = argv[:index], argv[index + 1:]
+
+    parser = argparse.ArgumentParser(description="Rerun affected tests on save in a warm process")
+    parser.add_argument("--browser", default="chromium", choices=["chromium", "firefox", "webkit"])
+    parser.add_argument("--browser-channel", default="chrome")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--interval", type=float, default=0.3, help="polling interval in seconds")
+    parser.add_argument("--run-all", action="store_true", help="run the whole suite once at start")
+    args = parser.parse_args(argv)
+
+    launch_options = {"headless": not args.headed}
+    if args.browser == "chromium" and args.browser_channel:
+        launch_options["channel"] = args.browser_channel
+    # pytest.ini pins the browser and channel through addopts; use ours instead
+    addopts = "-v -ra --tb=short"
+    if "channel" in launch_options:
+        addopts += f" --browser-channel {launch_options['channel']}"
+    pytest_args = ["-o", f"addopts={addopts}", *pytest_args]
+
+    os.chdir(TEST_ROOT)
+    watcher = Watcher(args.browser, launch_options, pytest_args, args.interval)
+    try:
+        watcher.warm_up()
+        if args.run_all:
+            watcher.run(["tests"])
+        watcher.watch([TEST_ROOT, APP_ROOT])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())